@@ -0,0 +1,108 @@
+"""
+Асинхронный API клиент для Читай-город - ПАКЕТНЫЙ ПОИСК
+"""
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import settings
+from .base_client import ChitaiGorodAPIClient
+
+api_logger = logging.getLogger('api')
+
+
+class AsyncChitaiGorodAPIClient:
+    """Асинхронный клиент - те же методы и тот же формат ответа, что у ChitaiGorodAPIClient
+
+    Запросы выполняются синхронным клиентом в пуле потоков, поэтому весь
+    конвейер _request (заголовки, авторизация, адаптер) остаётся общим.
+    """
+
+    def __init__(self, use_auth=True, base_url=settings.API_BASE_URL, concurrency=10,
+                 cache=None, cassette=None, transport=None, latency=None):
+        self.client = ChitaiGorodAPIClient(use_auth=use_auth, base_url=base_url, cache=cache,
+                                           cassette=cassette, transport=transport, latency=latency)
+        self.concurrency = 0
+        self._executor = None
+        self._ensure_capacity(concurrency)
+
+    @property
+    def city_id(self):
+        return self.client.city_id
+
+    @city_id.setter
+    def city_id(self, value):
+        self.client.city_id = value
+
+    def _ensure_capacity(self, concurrency):
+        """Пул потоков и пул соединений не меньше требуемой параллельности"""
+        if concurrency <= self.concurrency:
+            return
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="api")
+
+        # Без этого requests держит только 10 соединений и лишние закрывает
+        if concurrency > self.client.transport.pool_size:
+            self.client.transport.mount(self.client.session, pool_size=concurrency)
+
+        self.concurrency = concurrency
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Контекст задачи (например, api.transport.send_guard) доступен и в потоке
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, lambda: context.run(func, *args, **kwargs))
+
+    async def search_products(self, phrase, page=1, per_page=20, compact=False, filters=None, city_id=None):
+        """Поиск товаров - результат как у ChitaiGorodAPIClient.search_products"""
+        return await self._call(self.client.search_products, phrase, page=page, per_page=per_page,
+                                compact=compact, filters=filters, city_id=city_id)
+
+    async def get_facets(self, phrase):
+        """Фасеты поиска - результат как у ChitaiGorodAPIClient.get_facets"""
+        return await self._call(self.client.get_facets, phrase)
+
+    async def get_popular_searches(self):
+        """Популярные запросы - результат как у ChitaiGorodAPIClient.get_popular_searches"""
+        return await self._call(self.client.get_popular_searches)
+
+    async def get_search_suggests(self, phrase):
+        """Подсказки поиска - результат как у ChitaiGorodAPIClient.get_search_suggests"""
+        return await self._call(self.client.get_search_suggests, phrase)
+
+    async def search_many(self, phrases, concurrency=None, page=1, per_page=20):
+        """Пакетный поиск - не более concurrency запросов одновременно
+
+        Возвращает результаты в порядке phrases. Сетевая ошибка по одной фразе
+        не прерывает пакет: на её месте будет {"ok": False, "error": ...}.
+        """
+        concurrency = concurrency or self.concurrency
+        self._ensure_capacity(concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(phrase):
+            async with semaphore:
+                try:
+                    return await self.search_products(phrase, page=page, per_page=per_page)
+                except requests.RequestException as e:
+                    api_logger.error(f"❌ Ошибка сети для '{phrase[:20]}': {e}")
+                    return {"ok": False, "error": str(e)}
+
+        phrases = list(phrases)
+        api_logger.info(f"📦 Пакетный поиск: {len(phrases)} фраз, параллельно {concurrency}")
+        return await asyncio.gather(*(one(phrase) for phrase in phrases))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.client.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,189 @@
+"""
+Токен авторизации: откуда взять, когда истекает, один на все процессы прогона
+
+Источники по порядку: переменная окружения settings.AUTH_TOKEN_ENV,
+файл settings.AUTH_TOKEN_FILE, config/tokens.py. Годится любой вид
+токена: "Bearer eyJ...", "Bearer%20eyJ..." или просто "eyJ...".
+
+    from api.auth import token_manager
+    token_manager.check(min_valid_for=1800)  # TokenError, если истечёт раньше
+    token_manager.authorization()            # "Bearer eyJ..." для заголовка
+
+Срок (exp) читается из JWT без сети и без проверки подписи. В прогоне с
+--workers (задан settings.AUTH_RUN_ENV) токен выбирается один раз и кладётся в
+settings.AUTH_TOKEN_CACHE (права 0600) под файловой блокировкой - процессы
+берут его оттуда, даже если источник поменяли посреди прогона. Без --workers
+токен на диск не пишется.
+"""
+import base64
+import json
+import os
+import threading
+import time
+
+from config import settings
+from .locking import file_lock
+
+
+class TokenError(Exception):
+    """Токена нет, он не JWT или истекает раньше, чем нужно"""
+
+
+def bare_token(token):
+    """'Bearer eyJ...' / 'Bearer%20eyJ...' / 'eyJ...' -> 'eyJ...'"""
+    token = (token or "").strip()
+    for prefix in ("Bearer%20", "Bearer "):
+        if token.startswith(prefix):
+            return token[len(prefix):].strip()
+    return token
+
+
+def decode_claims(token):
+    """Полезная нагрузка JWT (словарь) без проверки подписи"""
+    parts = bare_token(token).split(".")
+    if len(parts) != 3:
+        raise TokenError("Токен не похож на JWT (нужно три части через точку)")
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError as e:
+        raise TokenError(f"Не удалось прочитать полезную нагрузку JWT: {e}") from e
+    if not isinstance(claims, dict):
+        raise TokenError("Полезная нагрузка JWT - не объект")
+    return claims
+
+
+def _duration(seconds):
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.0f} мин"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.0f} ч"
+    return f"{seconds / 86400:.0f} дн"
+
+
+def describe(entry, now=None):
+    """Короткая строка для логов: источник и сколько осталось жить"""
+    if entry["exp"] is None:
+        return f"{entry['source']}, срок неизвестен"
+    left = entry["exp"] - (time.time() if now is None else now)
+    if left <= 0:
+        return f"{entry['source']}, истёк {_duration(-left)} назад"
+    return f"{entry['source']}, истекает через {_duration(left)}"
+
+
+class TokenManager:
+    """Выбор токена из источников, разбор exp и общий кэш на прогон
+
+    Запись о токене - словарь {"token", "exp", "source", "error"}:
+    exp - unix-время или None, error - почему срок не прочитан.
+    """
+
+    def __init__(self, env=settings.AUTH_TOKEN_ENV, path=settings.AUTH_TOKEN_FILE,
+                 cache_path=settings.AUTH_TOKEN_CACHE, run_env=settings.AUTH_RUN_ENV, fallback=None):
+        self.env = env
+        self.path = path
+        self.cache_path = cache_path
+        self.run_env = run_env
+        self.fallback = fallback  # None - config/tokens.py на момент вызова
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def _sources(self):
+        yield f"${self.env}", os.environ.get(self.env)
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                yield self.path, f.read()
+        except OSError:
+            pass
+        if self.fallback is not None:
+            yield "config/tokens.py", self.fallback
+        else:
+            from config import tokens
+            yield "config/tokens.py", getattr(tokens, "AUTH_TOKEN", "")
+
+    def resolve(self):
+        """Запись о токене из первого непустого источника (без кэша) или None"""
+        for source, raw in self._sources():
+            token = bare_token(raw)
+            if not token:
+                continue
+            entry = {"token": token, "exp": None, "source": source, "error": None}
+            try:
+                exp = decode_claims(token).get("exp")
+                entry["exp"] = int(exp) if exp is not None else None
+            except (TokenError, TypeError, ValueError) as e:
+                entry["error"] = str(e)
+            return entry
+        return None
+
+    def _cache_lock_path(self):
+        return self.cache_path + ".lock"
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, run, entry):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        # В кэше сам токен: файл читает только владелец
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"run": run, "entry": entry}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def current(self, refresh=False):
+        """Запись о токене этого прогона или None, если токена нет нигде
+
+        Без run_id (обычный запуск) - из источников, один раз на процесс.
+        С run_id (--workers) - из общего кэша; первый обратившийся процесс
+        выбирает токен и записывает его. refresh=True выбирает токен заново
+        и перезаписывает кэш.
+        """
+        with self._lock:
+            if self._entry is not None and not refresh:
+                return self._entry
+            run = os.environ.get(self.run_env)
+            if not run:
+                self._entry = self.resolve()
+                return self._entry
+            with file_lock(self._cache_lock_path()):
+                cached = self._read_cache()
+                if not refresh and cached and cached.get("run") == run:
+                    self._entry = cached["entry"]
+                else:
+                    self._entry = self.resolve()
+                    self._write_cache(run, self._entry)
+            return self._entry
+
+    def token(self):
+        """Токен без префикса Bearer или пустая строка"""
+        entry = self.current()
+        return entry["token"] if entry else ""
+
+    def authorization(self):
+        """Значение заголовка Authorization или None"""
+        token = self.token()
+        return f"Bearer {token}" if token else None
+
+    def check(self, min_valid_for=0, refresh=False, now=None):
+        """Запись о токене, если он проживёт ещё min_valid_for сек, иначе TokenError"""
+        entry = self.current(refresh=refresh)
+        if entry is None:
+            raise TokenError(f"Нет токена: ни в ${self.env}, ни в {self.path}, ни в config/tokens.py")
+        if entry["error"]:
+            raise TokenError(f"Токен из {entry['source']}: {entry['error']}")
+        if entry["exp"] is None:
+            return entry
+        left = entry["exp"] - (time.time() if now is None else now)
+        if left <= 0:
+            raise TokenError(f"Токен истёк ({describe(entry, now)}) - обновите его, см. README")
+        if left < min_valid_for:
+            raise TokenError(f"Токен истечёт посреди прогона ({describe(entry, now)}, "
+                             f"а прогону нужно ~{_duration(min_valid_for)}) - обновите его заранее")
+        return entry
+
+
+token_manager = TokenManager()
@@ -3,7 +3,12 @@ API клиент для Читай-город с адаптером ответо
 """
 import requests
 import logging
-from config import settings, tokens
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from .auth import token_manager
+from .books import BOOK_FIELDS, BookBatch
+from .transport import Transport
 
 # Создаем логгер только для важных событий API
 api_logger = logging.getLogger('api')
@@ -13,8 +18,36 @@ class ApiResponseAdapter:
     """Преобразует JSON:API в чистый формат"""
 
     @staticmethod
-    def adapt_search_response(api_response):
-        """Адаптирует ответ поиска"""
+    def _book_values(product_id, details):
+        """Поля книги в порядке api.books.BOOK_FIELDS"""
+        # Автор
+        authors = details.get("authors", [])
+        author = " ".join(filter(None, [
+            authors[0].get("lastName") if authors else "",
+            authors[0].get("firstName") if authors else "",
+            authors[0].get("middleName") if authors else ""
+        ])) if authors else "Неизвестный автор"
+
+        # Скидка
+        discount = details.get("discount")
+        discount_str = f"{discount}%" if discount else None
+
+        return (
+            product_id,
+            details.get("title", "Без названия"),
+            author,
+            details.get("price", 0),
+            details.get("oldPrice"),
+            discount_str,
+            details.get("status") == "canBuy",
+            details.get("category", {}).get("title", "Без категории"),
+            details.get("publisher", {}).get("title", ""),
+            float(details.get("rating", {}).get("count", "0.0")),
+        )
+
+    @staticmethod
+    def adapt_search_response(api_response, compact=False):
+        """Адаптирует ответ поиска (compact=True - книги в колоночном BookBatch)"""
         if "status" in api_response:
             return {"ok": False, "status": api_response["status"]}
 
@@ -24,7 +57,7 @@ class ApiResponseAdapter:
         data = api_response["data"]
         included = api_response.get("included", [])
 
-        # Собираем детали продуктов
+        # Ссылки на атрибуты продуктов (без копирования)
         products_details = {item["id"]: item.get("attributes", {})
                           for item in included if item.get("type") == "product"}
 
@@ -33,44 +66,57 @@ class ApiResponseAdapter:
         pagination = data.get("relationships", {}).get("products", {}).get("meta", {}).get("pagination", {})
 
         # Формируем книги
-        books = []
+        books = BookBatch() if compact else []
         for product_ref in products_data:
             product_id = product_ref.get("id")
             if product_id in products_details:
-                details = products_details[product_id]
-
-                # Автор
-                authors = details.get("authors", [])
-                author = " ".join(filter(None, [
-                    authors[0].get("lastName") if authors else "",
-                    authors[0].get("firstName") if authors else "",
-                    authors[0].get("middleName") if authors else ""
-                ])) if authors else "Неизвестный автор"
-
-                # Скидка
-                discount = details.get("discount")
-                discount_str = f"{discount}%" if discount else None
-
-                books.append({
-                    "id": product_id,
-                    "title": details.get("title", "Без названия"),
-                    "author": author,
-                    "price": details.get("price", 0),
-                    "old_price": details.get("oldPrice"),
-                    "discount": discount_str,
-                    "available": details.get("status") == "canBuy",
-                    "category": details.get("category", {}).get("title", "Без категории"),
-                    "publisher": details.get("publisher", {}).get("title", ""),
-                    "rating": float(details.get("rating", {}).get("count", "0.0"))
-                })
-
-        return {
+                values = ApiResponseAdapter._book_values(product_id, products_details[product_id])
+                if compact:
+                    books.append_values(*values)
+                else:
+                    books.append(dict(zip(BOOK_FIELDS, values)))
+
+        result = {
             "ok": True,
             "found": len(books),
             "total": pagination.get("total", len(books)),
             "books": books
         }
 
+        # Фасеты, если API вернул их вместе с выдачей
+        facets = ApiResponseAdapter._facets(included)
+        if facets:
+            result["facets"] = facets
+
+        return result
+
+    @staticmethod
+    def _facets(included):
+        """Фасеты из included: [{"name", "title", "values": [{"id", "title", "count"}]}]"""
+        return [
+            {
+                "name": item.get("attributes", {}).get("name") or item.get("id"),
+                "title": item.get("attributes", {}).get("title", ""),
+                "values": [
+                    {"id": value.get("id"), "title": value.get("title", ""), "count": value.get("count", 0)}
+                    for value in item.get("attributes", {}).get("values", [])
+                ],
+            }
+            for item in included if item.get("type") == "facet"
+        ]
+
+    @staticmethod
+    def adapt_facets_response(api_response):
+        """Адаптирует фасеты поиска"""
+        if "status" in api_response:
+            return {"ok": False, "status": api_response["status"]}
+
+        if "data" not in api_response:
+            return {"ok": False, "error": "No data"}
+
+        facets = ApiResponseAdapter._facets(api_response.get("included", []))
+        return {"ok": True, "count": len(facets), "facets": facets}
+
     @staticmethod
     def adapt_popular_searches_response(api_response):
         """Адаптирует популярные запросы"""
@@ -89,15 +135,50 @@ class ApiResponseAdapter:
 
         return {"ok": True, "count": len(phrases), "phrases": phrases}
 
+    @staticmethod
+    def adapt_suggests_response(api_response):
+        """Адаптирует подсказки поиска"""
+        if "status" in api_response:
+            return {"ok": False, "status": api_response["status"]}
+
+        if "data" not in api_response:
+            return {"ok": False, "error": "No data"}
+
+        phrases = [
+            item.get("attributes", {}).get("phraseText", "")
+            for item in api_response.get("included", [])
+            if item.get("type") == "searchPhraseSuggest" and item.get("attributes", {}).get("phraseText")
+        ]
+
+        return {"ok": True, "count": len(phrases), "phrases": phrases}
+
+    @staticmethod
+    def adapt_cart_short_response(api_response):
+        """Адаптирует краткую информацию о корзине"""
+        if "status" in api_response:
+            return {"ok": False, "status": api_response["status"]}
+
+        if "data" not in api_response:
+            return {"ok": False, "error": "No data"}
+
+        attributes = (api_response["data"] or {}).get("attributes", {})
+        return {"ok": True, "quantity": attributes.get("quantity", 0), "cost": attributes.get("cost", 0)}
+
 
 class ChitaiGorodAPIClient:
     """API клиент с адаптером - КОНТРОЛИРУЕМЫЕ ЛОГИ"""
 
-    def __init__(self, use_auth=True, base_url=settings.API_BASE_URL):
+    def __init__(self, use_auth=True, base_url=settings.API_BASE_URL, cache=None, cassette=None,
+                 transport=None, latency=None):
         self.base_url = base_url
         self.session = requests.Session()
+        self.transport = transport if transport is not None else Transport()
+        self.transport.mount(self.session)
         self.adapter = ApiResponseAdapter()
         self.city_id = settings.DEFAULT_CITY_ID
+        self.cache = cache  # api.cache.ResponseCache или None
+        self.cassette = cassette  # api.cassette.Cassette или None
+        self.latency = latency  # api.latency.LatencyStore или None
 
         # Заголовки
         self.session.headers.update({
@@ -106,13 +187,10 @@ class ChitaiGorodAPIClient:
             "Referer": f"{settings.BASE_URL}/",
         })
 
-        if use_auth and tokens.AUTH_TOKEN:
-            token = tokens.AUTH_TOKEN
-            if "Bearer%20" in token:
-                token = token.replace("Bearer%20", "Bearer ")
-            elif not token.startswith("Bearer "):
-                token = f"Bearer {token}"
-            self.session.headers.update({"Authorization": token})
+        if use_auth:
+            authorization = token_manager.authorization()
+            if authorization:
+                self.session.headers.update({"Authorization": authorization})
 
         # Логируем только факт создания клиента
         api_logger.info("🔧 API клиент инициализирован")
@@ -120,12 +198,33 @@ class ChitaiGorodAPIClient:
     def _request(self, method, endpoint, **kwargs):
         """Базовый запрос - ЛОГИРУЕМ ТОЛЬКО ВАЖНОЕ"""
         url = self.base_url + endpoint
-        kwargs.setdefault("timeout", settings.TIMEOUT)
+        kwargs.setdefault("timeout", (settings.CONNECT_TIMEOUT, settings.TIMEOUT))
 
         # Логируем только метод и эндпоинт (без деталей)
         api_logger.debug(f"📤 {method} {endpoint}")
 
-        response = self.session.request(method, url, **kwargs)
+        if self.cache is not None:
+            cached = self.cache.get(method, url, endpoint, kwargs.get("params"))
+            if cached is not None:
+                api_logger.debug(f"💾 Из кэша: {endpoint}")
+                return cached
+
+        body = kwargs.get("json", kwargs.get("data"))
+        if self.cassette is not None and self.cassette.replaying:
+            response = self.cassette.play(method, url, kwargs.get("params"), body)
+        else:
+            started = time.perf_counter()
+            response = self.transport.send(self.session, method, url, endpoint, **kwargs)
+            if self.latency is not None:
+                # Без ожидания лимита частоты и пауз между повторами - только сам запрос
+                seconds = getattr(response, "request_seconds", None)
+                self.latency.record_response(method, endpoint, kwargs.get("params"), response,
+                                             time.perf_counter() - started if seconds is None else seconds)
+            if self.cassette is not None:
+                self.cassette.record(method, url, kwargs.get("params"), response, body)
+
+        if self.cache is not None:
+            self.cache.put(method, url, endpoint, kwargs.get("params"), response)
 
         # Логируем только статус код (не весь ответ)
         if response.status_code == 200:
@@ -135,14 +234,20 @@ class ChitaiGorodAPIClient:
 
         return response
 
-    def search_products(self, phrase, page=1, per_page=20):
-        """Поиск товаров - ЛОГИРУЕМ РЕЗУЛЬТАТ"""
+    def search_products(self, phrase, page=1, per_page=20, compact=False, filters=None, city_id=None):
+        """Поиск товаров - ЛОГИРУЕМ РЕЗУЛЬТАТ (compact=True - книги в BookBatch)
+
+        filters - значения фасетов: {"categories": 2} -> filters[categories]=2
+        city_id - город только для этого запроса (по умолчанию self.city_id)
+        """
         params = {
-            "customerCityId": self.city_id,
+            "customerCityId": city_id or self.city_id,
             "products[page]": page,
             "products[per-page]": per_page,
             "phrase": phrase,
         }
+        for name, value in (filters or {}).items():
+            params[f"filters[{name}]"] = value
 
         # Логируем факт поиска
         api_logger.info(f"🔍 Поиск: '{phrase[:20]}...'")
@@ -150,7 +255,7 @@ class ChitaiGorodAPIClient:
         response = self._request("GET", settings.PUBLIC_API_ENDPOINTS["SEARCH_PRODUCT"], params=params)
 
         if response.status_code == 200:
-            result = self.adapter.adapt_search_response(response.json())
+            result = self.adapter.adapt_search_response(response.json(), compact=compact)
 
             # Логируем результат поиска
             if result.get("ok"):
@@ -163,6 +268,46 @@ class ChitaiGorodAPIClient:
             api_logger.error(f"❌ Ошибка API: {response.status_code}")
             return {"ok": False, "status": response.status_code}
 
+    def iter_search(self, phrase, per_page=20, max_pages=None):
+        """Ленивый обход всей выдачи - книга за книгой по всем products[page]
+
+        Следующая страница запрашивается в фоне, пока вызывающий код
+        обрабатывает текущую, поэтому в памяти не больше двух страниц.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-prefetch")
+        page = 1
+        future = executor.submit(self.search_products, phrase, page, per_page)
+
+        try:
+            while future is not None:
+                result = future.result()
+                future = None
+
+                if not result.get("ok"):
+                    api_logger.error(f"❌ Обход прерван на странице {page}: {result.get('status') or result.get('error')}")
+                    return
+
+                books = result.get("books", [])
+                total = result.get("total", 0)
+
+                # Последняя страница: короткая, пустая или дошли до total/max_pages
+                has_next = (
+                    len(books) == per_page
+                    and page * per_page < total
+                    and (max_pages is None or page < max_pages)
+                )
+                if has_next:
+                    page += 1
+                    future = executor.submit(self.search_products, phrase, page, per_page)
+
+                # Отдаём книги, пока следующая страница уже грузится
+                del result
+                yield from books
+        finally:
+            if future is not None:
+                future.cancel()
+            executor.shutdown(wait=False)
+
     def get_popular_searches(self):
         """Популярные запросы - ЛОГИРУЕМ РЕЗУЛЬТАТ"""
         api_logger.info("🔥 Запрос популярных поисков")
@@ -180,4 +325,63 @@ class ChitaiGorodAPIClient:
             return result
         else:
             api_logger.error(f"❌ Ошибка API: {response.status_code}")
-            return {"ok": False, "status": response.status_code}
\ No newline at end of file
+            return {"ok": False, "status": response.status_code}
+
+    def get_facets(self, phrase):
+        """Фасеты выдачи по фразе (категории, издательства...) со счётчиками товаров"""
+        params = {"customerCityId": self.city_id, "phrase": phrase}
+        response = self._request("GET", settings.PUBLIC_API_ENDPOINTS["FACET_SEARCH"], params=params)
+
+        if response.status_code == 200:
+            return self.adapter.adapt_facets_response(response.json())
+        api_logger.error(f"❌ Ошибка API: {response.status_code}")
+        return {"ok": False, "status": response.status_code}
+
+    def get_search_suggests(self, phrase):
+        """Подсказки к началу поисковой фразы (без логов - вызывается на каждое нажатие)"""
+        params = {"customerCityId": self.city_id, "phrase": phrase}
+        response = self._request("GET", settings.PUBLIC_API_ENDPOINTS["SEARCH_SUGGESTS"], params=params)
+
+        if response.status_code == 200:
+            return self.adapter.adapt_suggests_response(response.json())
+        api_logger.error(f"❌ Ошибка API: {response.status_code}")
+        return {"ok": False, "status": response.status_code}
+
+    def get_cart_short(self):
+        """Краткая информация о корзине (нужна авторизация)"""
+        response = self._request("GET", settings.PROTECTED_API_ENDPOINTS["CART_SHORT"])
+
+        if response.status_code == 200:
+            return self.adapter.adapt_cart_short_response(response.json())
+        api_logger.error(f"❌ Ошибка API: {response.status_code}")
+        return {"ok": False, "status": response.status_code}
+
+    def add_to_cart(self, product_id):
+        """Добавить товар в корзину (нужна авторизация)"""
+        api_logger.info(f"🛒 Добавление в корзину: {product_id}")
+
+        response = self._request("POST", settings.PROTECTED_API_ENDPOINTS["CART_PRODUCT"],
+                                 json={"id": int(product_id)})
+
+        if response.status_code != 200:
+            api_logger.error(f"❌ Ошибка API: {response.status_code}")
+            return {"ok": False, "status": response.status_code}
+
+        payload = response.json()
+        if "status" in payload:
+            api_logger.warning(f"❌ Товар не добавлен: {payload['status']}")
+            return {"ok": False, "status": payload["status"]}
+
+        api_logger.info("✅ Товар добавлен в корзину")
+        return {"ok": True, "id": str(product_id)}
+
+    def clear_cart(self):
+        """Очистить корзину (нужна авторизация)"""
+        api_logger.info("🗑️ Очистка корзины через API")
+
+        response = self._request("DELETE", settings.PROTECTED_API_ENDPOINTS["CART"])
+
+        if response.status_code in (200, 204):
+            return {"ok": True}
+        api_logger.error(f"❌ Ошибка API: {response.status_code}")
+        return {"ok": False, "status": response.status_code}
@@ -0,0 +1,190 @@
+"""
+Компактное представление книг из adapt_search_response - для больших выборок
+"""
+import math
+from array import array
+
+# Поля книги - те же ключи, что в словарях ApiResponseAdapter
+BOOK_FIELDS = ("id", "title", "author", "price", "old_price", "discount",
+               "available", "category", "publisher", "rating")
+
+
+def _discount_percent(discount):
+    """'15%' / 15 / None -> 15 / 0"""
+    if not discount:
+        return 0
+    if isinstance(discount, str):
+        discount = discount.rstrip("%")
+    return int(float(discount))
+
+
+class Book:
+    """Одна книга на __slots__ - в несколько раз легче словаря с 10 ключами"""
+
+    __slots__ = BOOK_FIELDS
+
+    def __init__(self, id, title, author, price, old_price, discount,
+                 available, category, publisher, rating):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.price = price
+        self.old_price = old_price
+        self.discount = discount
+        self.available = available
+        self.category = category
+        self.publisher = publisher
+        self.rating = rating
+
+    @classmethod
+    def from_dict(cls, book):
+        return cls(*(book.get(field) for field in BOOK_FIELDS))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in BOOK_FIELDS}
+
+    def get(self, field, default=None):
+        """Совместимость со словарём: book.get("title")"""
+        return getattr(self, field, default) if field in BOOK_FIELDS else default
+
+    def __getitem__(self, field):
+        if field not in BOOK_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __eq__(self, other):
+        if isinstance(other, Book):
+            return all(getattr(self, f) == getattr(other, f) for f in BOOK_FIELDS)
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Book(id={self.id!r}, title={self.title!r}, price={self.price!r})"
+
+
+class _Dictionary:
+    """Словарное кодирование повторяющихся строк (категория, издательство, автор)"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = array("I")
+        self._index = {}
+
+    def append(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+
+class BookBatch:
+    """Колоночное хранение книг: числа в array, повторяющиеся строки - словарём
+
+    Поддерживает len(), индексацию и итерацию (отдаёт Book), срезы
+    (новый BookBatch), а также агрегаты по цене и скидке без создания
+    объектов на каждую книгу.
+    """
+
+    def __init__(self, books=()):
+        self.ids = []
+        self.titles = []
+        self.authors = _Dictionary()
+        self.categories = _Dictionary()
+        self.publishers = _Dictionary()
+        self.prices = array("d")
+        self.old_prices = array("d")   # NaN - старой цены нет
+        self.discounts = array("B")    # проценты, 0 - скидки нет
+        self.available = bytearray()
+        self.ratings = array("f")
+        self.extend(books)
+
+    def append_values(self, id, title, author, price, old_price, discount,
+                      available, category, publisher, rating):
+        self.ids.append(id)
+        self.titles.append(title)
+        self.authors.append(author)
+        self.prices.append(float(price or 0))
+        self.old_prices.append(math.nan if old_price is None else float(old_price))
+        self.discounts.append(_discount_percent(discount))
+        self.available.append(1 if available else 0)
+        self.categories.append(category)
+        self.publishers.append(publisher)
+        self.ratings.append(float(rating or 0.0))
+
+    def append(self, book):
+        """Книга-словарь из адаптера или Book"""
+        if isinstance(book, Book):
+            self.append_values(*(getattr(book, f) for f in BOOK_FIELDS))
+        else:
+            self.append_values(*(book.get(f) for f in BOOK_FIELDS))
+
+    def extend(self, books):
+        for book in books:
+            self.append(book)
+        return self
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return BookBatch(self[j] for j in range(*i.indices(len(self))))
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("BookBatch index out of range")
+        old_price = self.old_prices[i]
+        discount = self.discounts[i]
+        price = self.prices[i]
+        return Book(
+            self.ids[i], self.titles[i], self.authors[i],
+            int(price) if price.is_integer() else price,
+            None if math.isnan(old_price) else (int(old_price) if old_price.is_integer() else old_price),
+            f"{discount}%" if discount else None,
+            bool(self.available[i]), self.categories[i], self.publishers[i],
+            round(self.ratings[i], 2),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    # ---------- Агрегаты ----------
+    def min_price(self):
+        return min(self.prices) if self.prices else None
+
+    def max_price(self):
+        return max(self.prices) if self.prices else None
+
+    def mean_price(self):
+        return math.fsum(self.prices) / len(self.prices) if self.prices else None
+
+    def price_stats(self):
+        return {
+            "count": len(self),
+            "min": self.min_price(),
+            "max": self.max_price(),
+            "mean": self.mean_price(),
+        }
+
+    def discount_distribution(self):
+        """{процент скидки: число книг}, 0 - без скидки"""
+        counts = [0] * 256
+        for discount in self.discounts:
+            counts[discount] += 1
+        return {percent: count for percent, count in enumerate(counts) if count}
+
+    def available_count(self):
+        return self.available.count(1)
+
+    def nbytes(self):
+        """Примерный размер числовых колонок в байтах"""
+        return sum(col.itemsize * len(col) for col in (
+            self.prices, self.old_prices, self.discounts, self.ratings,
+            self.authors.codes, self.categories.codes, self.publishers.codes,
+        )) + len(self.available)
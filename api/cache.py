@@ -0,0 +1,256 @@
+"""
+Кэш ответов API - TTL по эндпоинтам, LRU вытеснение, память или диск
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import settings
+
+api_logger = logging.getLogger('api')
+
+
+def response_to_dict(response, header_names=None):
+    """Ответ requests -> словарь для хранения (JSON-совместимый)"""
+    headers = response.headers
+    if header_names is not None:
+        headers = {name: headers[name] for name in header_names if name in headers}
+    return {
+        "status_code": response.status_code,
+        "headers": dict(headers),
+        "encoding": response.encoding,
+        "url": response.url,
+        "content": response.content.decode("utf-8", errors="surrogateescape"),
+    }
+
+
+def response_from_dict(value):
+    """Словарь из response_to_dict -> ответ requests"""
+    response = requests.Response()
+    response.status_code = value["status_code"]
+    response.headers = CaseInsensitiveDict(value["headers"])
+    response.encoding = value["encoding"]
+    response.url = value["url"]
+    response._content = value["content"].encode("utf-8", errors="surrogateescape")
+    return response
+
+
+class CacheStats:
+    """Статистика попаданий в кэш"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits=0, misses=0, expired=0, evictions=0):
+        """Клиент общий для потоков (предвыборка страниц, пул AsyncChitaiGorodAPIClient)"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.expired += expired
+            self.evictions += evictions
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hit_rate, 3),
+            }
+
+
+class MemoryCacheBackend:
+    """LRU в памяти с ограничением по числу записей и по байтам"""
+
+    def __init__(self, max_entries=settings.CACHE_MAX_ENTRIES, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает (expires_at, value) или None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, value, expires_at, size):
+        """Сохраняет запись, возвращает число вытесненных"""
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old[2]
+            self._data[key] = (expires_at, value, size)
+            self.size_bytes += size
+
+            evicted = 0
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self.size_bytes > self.max_bytes and len(self._data) > 1
+            ):
+                _, (_, _, old_size) = self._data.popitem(last=False)
+                self.size_bytes -= old_size
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCacheBackend:
+    """LRU в SQLite - переживает перезапуск pytest"""
+
+    def __init__(self, path=None, max_entries=settings.CACHE_MAX_ENTRIES):
+        self.path = path or os.path.join(settings.CACHE_DIR, "responses.sqlite3")
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            return row[0], json.loads(row[1])
+
+    def set(self, key, value, expires_at, size):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            evicted = max(0, count - self.max_entries)
+            if evicted:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (evicted,),
+                )
+            self._conn.commit()
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """Кэш для ChitaiGorodAPIClient._request
+
+    Кэшируются только успешные GET к эндпоинтам с ненулевым TTL
+    (settings.CACHE_TTLS). Защищённые эндпоинты не кэшируются никогда.
+    """
+
+    def __init__(self, backend=None, ttls=None):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.stats = CacheStats()
+
+        ttls = settings.CACHE_TTLS if ttls is None else ttls
+        self.ttls = {
+            settings.PUBLIC_API_ENDPOINTS[name]: ttl
+            for name, ttl in ttls.items()
+            if name in settings.PUBLIC_API_ENDPOINTS
+        }
+
+    @staticmethod
+    def make_key(method, url, params=None):
+        """Ключ: метод + полный URL + отсортированные параметры (включая customerCityId)"""
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return json.dumps([method.upper(), url, items], ensure_ascii=False)
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, 0)
+
+    def get(self, method, url, endpoint, params=None):
+        """Ответ из кэша или None"""
+        if method.upper() != "GET" or not self.ttl_for(endpoint):
+            return None
+
+        key = self.make_key(method, url, params)
+        entry = self.backend.get(key)
+        if entry is None:
+            self.stats.record(misses=1)
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            self.backend.delete(key)
+            self.stats.record(expired=1, misses=1)
+            return None
+
+        self.stats.record(hits=1)
+        return response_from_dict(value)
+
+    def put(self, method, url, endpoint, params, response):
+        if method.upper() != "GET" or response.status_code != 200:
+            return
+        ttl = self.ttl_for(endpoint)
+        if not ttl:
+            return
+
+        value = response_to_dict(response)
+        key = self.make_key(method, url, params)
+        self.stats.record(evictions=self.backend.set(key, value, time.time() + ttl, len(response.content)))
+
+    def clear(self):
+        self.backend.clear()
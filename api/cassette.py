@@ -0,0 +1,110 @@
+"""
+Кассеты: запись ответов API на диск и воспроизведение без сети
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from config import settings
+from .cache import ResponseCache, response_to_dict, response_from_dict
+
+api_logger = logging.getLogger('api')
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Из заголовков ответа храним только нужные адаптеру - кассета остаётся компактной
+_KEPT_HEADERS = ("Content-Type",)
+
+
+def body_digest(body):
+    """Стабильный sha256 тела запроса: json/словарь - с сортировкой ключей, строка/байты - как есть"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+                          default=str).encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+
+class CassetteMissError(LookupError):
+    """В кассете нет ответа на запрос"""
+
+
+class Cassette:
+    """Одна кассета = один файл .json.gz со списком ответов по ключу запроса
+
+    Заголовки запроса (в том числе Authorization) не сохраняются, тело
+    не-GET запроса входит в ключ хэшем. Повторные одинаковые запросы
+    воспроизводятся в порядке записи.
+    """
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.path = path
+        self.mode = mode
+        self.interactions = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+
+        if mode == REPLAY:
+            if not os.path.exists(path):
+                raise CassetteMissError(
+                    f"Нет кассеты {path} - запишите её: pytest --cassette-mode=record"
+                )
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                self.interactions = json.load(f)
+
+    @property
+    def replaying(self):
+        return self.mode == REPLAY
+
+    @staticmethod
+    def make_key(method, url, params=None, body=None):
+        """Ключ кэша; у не-GET запросов с телом (json/data) - ещё и хэш тела,
+        иначе POST с разными телами попали бы в одну запись
+        """
+        key = ResponseCache.make_key(method, url, params)
+        if body is not None and method.upper() != "GET":
+            key = json.dumps([*json.loads(key), body_digest(body)], ensure_ascii=False)
+        return key
+
+    def record(self, method, url, params, response, body=None):
+        entry = response_to_dict(response, header_names=_KEPT_HEADERS)
+        with self._lock:
+            self.interactions.setdefault(self.make_key(method, url, params, body), []).append(entry)
+
+    def play(self, method, url, params=None, body=None):
+        key = self.make_key(method, url, params, body)
+        with self._lock:
+            entries = self.interactions.get(key)
+            if not entries:
+                raise CassetteMissError(f"Нет записи для {method} {url} {params or ''} {body or ''} в {self.path}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+
+        return response_from_dict(entry)
+
+    def save(self):
+        """Сохраняет записанное (только в режиме record)"""
+        if self.mode != RECORD or not self.interactions:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(self.interactions, f, ensure_ascii=False, separators=(",", ":"))
+        api_logger.info(f"📼 Кассета записана: {self.path}")
+
+
+def cassette_path(nodeid, cassette_dir=settings.CASSETTE_DIR):
+    """Путь кассеты для теста: tests/test_api.py::Class::test -> <dir>/test_api/Class.test.json.gz"""
+    module, _, name = nodeid.partition("::")
+    module = os.path.splitext(os.path.basename(module))[0]
+    name = name.replace("::", ".")
+    for char in '[]/\\:*?"<>| ':
+        name = name.replace(char, "_")
+    return os.path.join(cassette_dir, module, f"{name}.json.gz")
@@ -0,0 +1,270 @@
+"""
+Инкрементальный обход каталога через SEARCH_PRODUCT в SQLite
+
+Запуск:
+    python -m api.crawler --base-url http://127.0.0.1:8080
+    python -m api.crawler --phrase роман --phrase детектив --per-page 100 --concurrency 16
+    python -m api.crawler --fresh          # начать обход заново, не продолжая прерванный
+
+Выдача каждой фразы из settings.CRAWL_PHRASES обходится постранично, все
+страницы - параллельно. Товары хранятся по id (одна строка на товар, сколько
+бы фраз его ни нашли). Для каждой страницы запоминается хэш её содержимого:
+если при следующем обходе хэш тот же, товары страницы не переписываются,
+у них только обновляется номер обхода. Каждая страница фиксируется в базе
+сразу, так что прерванный обход продолжается с недостающих страниц.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import requests
+
+from config import settings
+from .async_client import AsyncChitaiGorodAPIClient
+from .books import BOOK_FIELDS
+
+api_logger = logging.getLogger('api')
+
+PRODUCT_COLUMNS = BOOK_FIELDS  # id, title, author, price, old_price, discount, available, category, publisher, rating
+
+
+def page_hash(result):
+    """Хэш страницы выдачи: total и книги в порядке выдачи"""
+    content = json.dumps([result.get("total"), result["books"]], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class CatalogueStore:
+    """Товары каталога, страницы выдачи с хэшами и история обходов в SQLite"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.CATALOGUE_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " id TEXT PRIMARY KEY, title TEXT, author TEXT, price INTEGER, old_price INTEGER,"
+            " discount TEXT, available INTEGER, category TEXT, publisher TEXT, rating REAL,"
+            " first_crawl INTEGER NOT NULL, last_crawl INTEGER NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);"
+            "CREATE INDEX IF NOT EXISTS idx_products_publisher ON products(publisher);"
+            "CREATE INDEX IF NOT EXISTS idx_products_last_crawl ON products(last_crawl);"
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " phrase TEXT NOT NULL, city_id INTEGER NOT NULL, per_page INTEGER NOT NULL, page INTEGER NOT NULL,"
+            " hash TEXT NOT NULL, total INTEGER NOT NULL, product_ids TEXT NOT NULL,"
+            " crawl_id INTEGER NOT NULL, crawled_at REAL NOT NULL,"
+            " PRIMARY KEY (phrase, city_id, per_page, page));"
+            "CREATE INDEX IF NOT EXISTS idx_pages_crawl ON pages(crawl_id);"
+            "CREATE TABLE IF NOT EXISTS crawls ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, config TEXT NOT NULL,"
+            " started_at REAL NOT NULL, finished_at REAL);"
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    # ---------- Обходы ----------
+    def start_crawl(self, config, resume=True):
+        """id обхода: прерванный с тем же config (resume=True) или новый"""
+        config = json.dumps(config, ensure_ascii=False, sort_keys=True)
+        if resume:
+            row = self._conn.execute(
+                "SELECT id FROM crawls WHERE finished_at IS NULL AND config = ? ORDER BY id DESC LIMIT 1",
+                (config,),
+            ).fetchone()
+            if row:
+                return row[0], True
+        cursor = self._conn.execute("INSERT INTO crawls (config, started_at) VALUES (?, ?)",
+                                    (config, time.time()))
+        self._conn.commit()
+        return cursor.lastrowid, False
+
+    def finish_crawl(self, crawl_id):
+        self._conn.execute("UPDATE crawls SET finished_at = ? WHERE id = ?", (time.time(), crawl_id))
+        self._conn.commit()
+
+    def crawls(self):
+        """[(id, started_at, finished_at)] - последний в конце"""
+        return self._conn.execute("SELECT id, started_at, finished_at FROM crawls ORDER BY id").fetchall()
+
+    # ---------- Страницы ----------
+    def page(self, phrase, city_id, per_page, page):
+        """(хэш, total, crawl_id) сохранённой страницы или None"""
+        return self._conn.execute(
+            "SELECT hash, total, crawl_id FROM pages WHERE phrase = ? AND city_id = ? AND per_page = ? AND page = ?",
+            (phrase, city_id, per_page, page),
+        ).fetchone()
+
+    def save_page(self, crawl_id, phrase, city_id, per_page, page, result):
+        """Страница выдачи -> "changed" (товары переписаны) или "unchanged" (только отметка обхода)"""
+        digest = page_hash(result)
+        now = time.time()
+        stored = self.page(phrase, city_id, per_page, page)
+        ids = [book["id"] for book in result["books"]]
+        with self._conn:
+            if stored is not None and stored[0] == digest:
+                marks = ", ".join("?" * len(ids))
+                self._conn.execute(f"UPDATE products SET last_crawl = ? WHERE id IN ({marks})", [crawl_id, *ids])
+                status = "unchanged"
+            else:
+                self._upsert(crawl_id, result["books"], now)
+                status = "changed"
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (phrase, city_id, per_page, page, digest, result.get("total", 0), json.dumps(ids), crawl_id, now),
+            )
+        return status
+
+    def _upsert(self, crawl_id, books, now):
+        columns = ", ".join(PRODUCT_COLUMNS)
+        values = ", ".join("?" * len(PRODUCT_COLUMNS))
+        changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in PRODUCT_COLUMNS[1:])
+        updates = ", ".join(f"{c} = excluded.{c}" for c in PRODUCT_COLUMNS[1:])
+        self._conn.executemany(
+            f"INSERT INTO products ({columns}, first_crawl, last_crawl, updated_at) VALUES ({values}, ?, ?, ?)"
+            f" ON CONFLICT(id) DO UPDATE SET {updates}, last_crawl = excluded.last_crawl,"
+            f" updated_at = CASE WHEN {changed} THEN excluded.updated_at ELSE updated_at END",
+            [(*(book[c] for c in PRODUCT_COLUMNS), crawl_id, crawl_id, now) for book in books],
+        )
+
+    # ---------- Товары ----------
+    def product(self, product_id):
+        row = self._conn.execute(f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products WHERE id = ?",
+                                 (product_id,)).fetchone()
+        if row is None:
+            return None
+        product = dict(zip(PRODUCT_COLUMNS, row))
+        product["available"] = bool(product["available"])
+        return product
+
+    def iter_products(self, batch=10_000):
+        """Ряды товаров (поля BOOK_FIELDS) по возрастанию id, без загрузки всей таблицы"""
+        cursor = self._conn.execute(f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+
+    def count(self, crawl_id=None):
+        """Товаров всего или замеченных в обходе crawl_id"""
+        if crawl_id is None:
+            return self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        return self._conn.execute("SELECT COUNT(*) FROM products WHERE last_crawl = ?", (crawl_id,)).fetchone()[0]
+
+
+class CrawlStats:
+    """Счётчики одного обхода"""
+
+    def __init__(self, crawl_id, resumed):
+        self.crawl_id = crawl_id
+        self.resumed = resumed
+        self.pages_fetched = 0
+        self.pages_changed = 0
+        self.pages_unchanged = 0
+        self.pages_skipped = 0  # уже сохранены этим обходом до прерывания
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            "crawl_id": self.crawl_id,
+            "resumed": self.resumed,
+            "pages_fetched": self.pages_fetched,
+            "pages_changed": self.pages_changed,
+            "pages_unchanged": self.pages_unchanged,
+            "pages_skipped": self.pages_skipped,
+            "errors": self.errors,
+        }
+
+
+async def crawl(client, store, phrases=None, per_page=settings.CRAWL_PER_PAGE, max_pages=None, resume=True):
+    """Обход выдачи фраз в store -> CrawlStats
+
+    Страницы всех фраз запрашиваются параллельно (не больше client.concurrency
+    одновременно). Обход считается завершённым, только если все страницы
+    сохранены без ошибок; иначе следующий вызов с resume=True его продолжит.
+    """
+    phrases = list(phrases or settings.CRAWL_PHRASES)
+    city_id = client.city_id
+    config = {"phrases": phrases, "city_id": city_id, "per_page": per_page, "max_pages": max_pages}
+    crawl_id, resumed = store.start_crawl(config, resume=resume)
+    stats = CrawlStats(crawl_id, resumed)
+    semaphore = asyncio.Semaphore(client.concurrency)
+
+    async def one_page(phrase, number):
+        """Страница -> total выдачи или None, если страница не сохранена"""
+        stored = store.page(phrase, city_id, per_page, number)
+        if stored is not None and stored[2] == crawl_id:
+            stats.pages_skipped += 1
+            return stored[1]
+        async with semaphore:
+            try:
+                result = await client.search_products(phrase, page=number, per_page=per_page)
+            except requests.RequestException as e:
+                result = {"ok": False, "error": str(e)}
+        stats.pages_fetched += 1
+        if not result.get("ok"):
+            stats.errors.append((phrase, number, result.get("status") or result.get("error")))
+            return None
+        if store.save_page(crawl_id, phrase, city_id, per_page, number, result) == "changed":
+            stats.pages_changed += 1
+        else:
+            stats.pages_unchanged += 1
+        return result.get("total", 0)
+
+    async def one_phrase(phrase):
+        total = await one_page(phrase, 1)
+        if total is None:
+            return
+        pages = -(-total // per_page)
+        if max_pages is not None:
+            pages = min(pages, max_pages)
+        await asyncio.gather(*(one_page(phrase, number) for number in range(2, pages + 1)))
+
+    api_logger.info(f"🕷️ Обход {crawl_id}{' (продолжение)' if resumed else ''}: {len(phrases)} фраз")
+    await asyncio.gather(*(one_phrase(phrase) for phrase in phrases))
+    if not stats.errors:
+        store.finish_crawl(crawl_id)
+    return stats
+
+
+async def _run(args):
+    store = CatalogueStore(args.db)
+    try:
+        async with AsyncChitaiGorodAPIClient(use_auth=args.auth, base_url=args.base_url,
+                                             concurrency=args.concurrency) as client:
+            stats = await crawl(client, store, phrases=args.phrase or None, per_page=args.per_page,
+                                max_pages=args.max_pages, resume=not args.fresh)
+        return {**stats.as_dict(), "products": store.count(), "products_seen": store.count(stats.crawl_id)}
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Инкрементальный обход каталога Читай-город в SQLite")
+    parser.add_argument("--phrase", action="append", default=[], help="Фраза, можно несколько "
+                                                                     "(по умолчанию settings.CRAWL_PHRASES)")
+    parser.add_argument("--db", default=settings.CATALOGUE_DB)
+    parser.add_argument("--base-url", default=settings.API_BASE_URL)
+    parser.add_argument("--per-page", type=int, default=settings.CRAWL_PER_PAGE)
+    parser.add_argument("--max-pages", type=int, default=None, help="Не больше страниц на фразу")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--fresh", action="store_true", help="Не продолжать прерванный обход")
+    parser.add_argument("--auth", action="store_true", help="Слать токен (окружение, .auth_token или config/tokens.py)")
+    args = parser.parse_args()
+
+    report = asyncio.run(_run(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    raise SystemExit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
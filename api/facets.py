@@ -0,0 +1,154 @@
+"""
+Фасетный поиск: фасеты фразы, параллельная выгрузка товаров по каждому значению, обратный индекс
+
+Запуск:
+    python -m api.facets --phrase роман --base-url http://127.0.0.1:8080
+    python -m api.facets --phrase детектив --concurrency 32 --per-page 100
+
+По индексу фильтры проверяются локально: index.query(categories=2, publishers=[1, 3])
+вместо HTTP-запроса на каждую комбинацию. mismatches() - значения, у которых
+число товаров в выдаче не совпало со счётчиком из FACET_SEARCH.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+import requests
+
+from config import settings
+from .async_client import AsyncChitaiGorodAPIClient
+
+api_logger = logging.getLogger('api')
+
+
+class FacetIndex:
+    """Обратный индекс: (фасет, значение) -> множество id товаров
+
+    Значения фасетов хранятся строками, так что 2 и "2" - одно значение.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.titles = {}
+        self.expected = {}
+        self.errors = []
+
+    def add(self, facet, value, product_ids, title=None, expected=None):
+        key = (facet, str(value))
+        self.postings.setdefault(key, set()).update(product_ids)
+        if title is not None:
+            self.titles[key] = title
+        if expected is not None:
+            self.expected[key] = expected
+
+    def products(self, facet, value):
+        return frozenset(self.postings.get((facet, str(value)), ()))
+
+    def query(self, **filters):
+        """Товары под всеми фильтрами: между фасетами - И, внутри списка значений - ИЛИ"""
+        result = None
+        for facet, values in filters.items():
+            if not isinstance(values, (list, tuple, set, frozenset)):
+                values = [values]
+            matched = set().union(*(self.products(facet, value) for value in values))
+            result = matched if result is None else result & matched
+            if not result:
+                break
+        return result if result is not None else set().union(*self.postings.values())
+
+    def counts(self, facet):
+        """{значение: число товаров} по фасету"""
+        return {value: len(ids) for (name, value), ids in self.postings.items() if name == facet}
+
+    def mismatches(self):
+        """[(фасет, значение, счётчик FACET_SEARCH, товаров в индексе)] для расхождений"""
+        return [
+            (facet, value, expected, len(self.postings.get((facet, value), ())))
+            for (facet, value), expected in sorted(self.expected.items())
+            if expected != len(self.postings.get((facet, value), ()))
+        ]
+
+    def __len__(self):
+        return len(set().union(*self.postings.values())) if self.postings else 0
+
+
+async def build_facet_index(client, phrase, facets=None, per_page=100, max_pages=None):
+    """Фасеты фразы и товары по каждому значению -> FacetIndex
+
+    Запросы всех значений и всех их страниц идут параллельно (не больше
+    client.concurrency одновременно). facets - имена фасетов для выгрузки
+    (по умолчанию все). Ошибки по отдельным значениям попадают в index.errors.
+    """
+    index = FacetIndex()
+    result = await client.get_facets(phrase)
+    if not result.get("ok"):
+        index.errors.append(("facets", None, result.get("status") or result.get("error")))
+        return index
+
+    semaphore = asyncio.Semaphore(client.concurrency)
+
+    async def page(filters, number):
+        async with semaphore:
+            try:
+                return await client.search_products(phrase, page=number, per_page=per_page, filters=filters)
+            except requests.RequestException as e:
+                return {"ok": False, "error": str(e)}
+
+    async def one_value(facet, value):
+        filters = {facet["name"]: value["id"]}
+        first = await page(filters, 1)
+        if not first.get("ok"):
+            index.errors.append((facet["name"], value["id"], first.get("status") or first.get("error")))
+            return
+        pages = -(-first.get("total", 0) // per_page)
+        if max_pages is not None:
+            pages = min(pages, max_pages)
+        rest = await asyncio.gather(*(page(filters, number) for number in range(2, pages + 1)))
+
+        product_ids = []
+        for response in (first, *rest):
+            if not response.get("ok"):
+                index.errors.append((facet["name"], value["id"], response.get("status") or response.get("error")))
+                continue
+            product_ids.extend(book["id"] for book in response["books"])
+        index.add(facet["name"], value["id"], product_ids, title=value.get("title"),
+                  expected=value.get("count") if max_pages is None else None)
+
+    selected = [f for f in result["facets"] if facets is None or f["name"] in facets]
+    api_logger.info(f"🧩 Фасеты '{phrase}': {sum(len(f['values']) for f in selected)} значений")
+    await asyncio.gather(*(one_value(facet, value) for facet in selected for value in facet["values"]))
+    return index
+
+
+async def _run(args):
+    async with AsyncChitaiGorodAPIClient(use_auth=args.auth, base_url=args.base_url,
+                                         concurrency=args.concurrency) as client:
+        index = await build_facet_index(client, args.phrase, facets=args.facet or None, per_page=args.per_page)
+    facet_names = sorted({facet for facet, _ in index.postings})
+    return {
+        "phrase": args.phrase,
+        "products": len(index),
+        "counts": {facet: index.counts(facet) for facet in facet_names},
+        "mismatches": index.mismatches(),
+        "errors": index.errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Фасетный индекс выдачи Читай-город")
+    parser.add_argument("--phrase", required=True)
+    parser.add_argument("--base-url", default=settings.API_BASE_URL)
+    parser.add_argument("--facet", action="append", default=[], help="Только эти фасеты, можно несколько")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--auth", action="store_true", help="Слать токен (окружение, .auth_token или config/tokens.py)")
+    args = parser.parse_args()
+
+    report = asyncio.run(_run(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    raise SystemExit(1 if report["mismatches"] or report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Гистограмма задержек - общая для нагрузочного прогона, лимита частоты и подсказок
+"""
+import threading
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Лог-линейная гистограмма в микросекундах (как HdrHistogram, ~1% точности)
+
+    Память не зависит от числа замеров, гистограммы можно складывать.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _bucket(self, value):
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        return shift, value >> shift
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        bucket = self._bucket(value)
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.total += 1
+            self.max = max(self.max, value)
+            self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        with self._lock:
+            for bucket, count in other.counts.items():
+                self.counts[bucket] = self.counts.get(bucket, 0) + count
+            self.total += other.total
+            self.max = max(self.max, other.max)
+            if other.min is not None:
+                self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, percent):
+        """Значение перцентиля в миллисекундах (верхняя граница корзины)"""
+        if not self.total:
+            return 0.0
+        rank = max(1, -(-self.total * percent // 100))
+        seen = 0
+        for shift, sub in sorted(self.counts, key=lambda b: (b[1] + 1) << b[0]):
+            seen += self.counts[(shift, sub)]
+            if seen >= rank:
+                return min(((sub + 1) << shift) - 1, self.max) / 1000
+        return self.max / 1000
+
+    def as_dict(self):
+        return {
+            "count": self.total,
+            "min_ms": (self.min or 0) / 1000,
+            "max_ms": self.max / 1000,
+            **{f"p{p:g}_ms": round(self.percentile(p), 3) for p in PERCENTILES},
+        }
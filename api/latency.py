@@ -0,0 +1,197 @@
+"""
+История задержек API между прогонами и поиск регрессий
+
+Каждый сетевой запрос ChitaiGorodAPIClient._request (не из кэша и не из
+кассеты) пишется в SQLite: эндпоинт, запрос, статус, задержка, размер ответа.
+
+    python -m api.latency                 # регрессии последнего прогона
+    python -m api.latency --window 20 --threshold 4
+
+Базовая линия - медианы прошлых прогонов (скользящее окно). Регрессия -
+медиана текущего прогона выше медианы базовой линии больше чем на
+threshold * 1.4826 * MAD и при этом не меньше чем на min_increase.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from urllib.parse import urlencode
+
+from config import settings
+
+MAD_SCALE = 1.4826  # MAD -> стандартное отклонение для нормального распределения
+METRICS = ("latency_ms", "bytes")
+
+
+def new_run_id():
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+
+
+def query_key(params):
+    """Запрос в истории - параметры в каноническом порядке"""
+    return urlencode(sorted((params or {}).items()))
+
+
+def robust_threshold(baseline, threshold, min_increase):
+    """Граница регрессии для ряда медиан базовой линии"""
+    median = statistics.median(baseline)
+    mad = statistics.median(abs(x - median) for x in baseline)
+    return median, max(median + threshold * MAD_SCALE * mad, median * (1 + min_increase))
+
+
+class LatencyStore:
+    """Ряды задержек и размеров ответов по (эндпоинт, запрос, прогон)
+
+    Записи копятся в памяти и сбрасываются в базу пачками по flush_every и
+    в close(), поэтому замер почти не влияет на сам запрос. Несколько
+    процессов (--workers) пишут в одну базу с общим run_id.
+    """
+
+    def __init__(self, path=None, run_id=None, flush_every=100):
+        self.path = path or settings.LATENCY_DB
+        self.run_id = run_id or new_run_id()
+        self.flush_every = flush_every
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            " run_id TEXT NOT NULL, recorded_at REAL NOT NULL, endpoint TEXT NOT NULL,"
+            " query TEXT NOT NULL, method TEXT NOT NULL, status INTEGER NOT NULL,"
+            " latency_ms REAL NOT NULL, bytes INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_series ON samples(endpoint, query, run_id)")
+        self._conn.commit()
+
+    def record(self, method, endpoint, params, status, seconds, size):
+        row = (self.run_id, time.time(), endpoint, query_key(params), method, status, seconds * 1000, size)
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.flush_every:
+                self._flush_locked()
+
+    def record_response(self, method, endpoint, params, response, seconds):
+        self.record(method, endpoint, params, response.status_code, seconds, len(response.content))
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self._conn.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+        self._conn.commit()
+        self._pending = []
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def runs(self):
+        """Прогоны в порядке первой записи, последний - в конце"""
+        self.flush()
+        rows = self._conn.execute(
+            "SELECT run_id FROM samples GROUP BY run_id ORDER BY MIN(rowid)"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def run_medians(self, run_ids, metric="latency_ms"):
+        """{(эндпоинт, запрос): {run_id: медиана}} - только успешные ответы"""
+        if metric not in METRICS:
+            raise ValueError(f"Неизвестная метрика: {metric}")
+        self.flush()
+        marks = ", ".join("?" * len(run_ids))
+        rows = self._conn.execute(
+            f"SELECT endpoint, query, run_id, {metric} FROM samples"
+            f" WHERE status < 400 AND run_id IN ({marks})",
+            list(run_ids),
+        ).fetchall()
+        values = {}
+        for endpoint, query, run_id, value in rows:
+            values.setdefault((endpoint, query), {}).setdefault(run_id, []).append(value)
+        return {key: {run: statistics.median(v) for run, v in per_run.items()}
+                for key, per_run in values.items()}
+
+    def compare(self, run_id=None, window=settings.LATENCY_BASELINE_RUNS,
+                threshold=settings.LATENCY_MAD_THRESHOLD, min_increase=settings.LATENCY_MIN_INCREASE,
+                min_runs=settings.LATENCY_MIN_BASELINE_RUNS, metrics=METRICS, per_query=True):
+        """Регрессии прогона run_id (по умолчанию - последнего) против window прошлых
+
+        per_query=False - сравнение по эндпоинтам целиком (все запросы вместе).
+        Ряды, у которых меньше min_runs прошлых прогонов, не проверяются.
+        """
+        runs = self.runs()
+        run_id = run_id or (runs[-1] if runs else None)
+        if run_id not in runs:
+            return []
+        baseline_runs = runs[:runs.index(run_id)][-window:]
+        if len(baseline_runs) < min_runs:
+            return []
+
+        regressions = []
+        for metric in metrics:
+            medians = self.run_medians(baseline_runs + [run_id], metric)
+            if not per_query:
+                medians = _by_endpoint(medians)
+            for (endpoint, query), per_run in sorted(medians.items()):
+                baseline = [per_run[r] for r in baseline_runs if r in per_run]
+                if run_id not in per_run or len(baseline) < min_runs:
+                    continue
+                median, limit = robust_threshold(baseline, threshold, min_increase)
+                current = per_run[run_id]
+                if current > limit:
+                    regressions.append({
+                        "endpoint": endpoint, "query": query, "metric": metric,
+                        "current": round(current, 3), "baseline": round(median, 3),
+                        "limit": round(limit, 3), "baseline_runs": len(baseline),
+                    })
+        return regressions
+
+
+def _by_endpoint(medians):
+    """Медианы запросов эндпоинта -> медиана эндпоинта в каждом прогоне"""
+    grouped = {}
+    for (endpoint, _), per_run in medians.items():
+        for run_id, value in per_run.items():
+            grouped.setdefault((endpoint, ""), {}).setdefault(run_id, []).append(value)
+    return {key: {run: statistics.median(v) for run, v in per_run.items()} for key, per_run in grouped.items()}
+
+
+def format_regressions(regressions):
+    lines = []
+    for r in regressions:
+        unit = "мс" if r["metric"] == "latency_ms" else "байт"
+        query = f" [{r['query']}]" if r["query"] else ""
+        lines.append(f"{r['endpoint']}{query} {r['metric']}: {r['current']:g} {unit} "
+                     f"(база {r['baseline']:g}, граница {r['limit']:g}, прогонов {r['baseline_runs']})")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Регрессии задержек API по истории прогонов")
+    parser.add_argument("--db", default=settings.LATENCY_DB)
+    parser.add_argument("--run", default=None, help="Прогон (по умолчанию - последний)")
+    parser.add_argument("--window", type=int, default=settings.LATENCY_BASELINE_RUNS)
+    parser.add_argument("--threshold", type=float, default=settings.LATENCY_MAD_THRESHOLD)
+    parser.add_argument("--by-endpoint", action="store_true", help="Сравнивать эндпоинты целиком")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    store = LatencyStore(args.db)
+    regressions = store.compare(args.run, window=args.window, threshold=args.threshold,
+                                per_query=not args.by_endpoint)
+    store.close()
+    print(json.dumps(regressions, ensure_ascii=False, indent=2) if args.json
+          else format_regressions(regressions) or "Регрессий нет")
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
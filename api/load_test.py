@@ -0,0 +1,182 @@
+"""
+Нагрузочный прогон search_products - пропускная способность, ошибки, перцентили
+
+Запуск:
+    python -m api.load_test --base-url http://127.0.0.1:8080 --duration 30 --concurrency 32
+    python -m api.load_test --rps 200 --duration 60 --query "Лев Толстой:3" --query детектив
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import settings
+from .base_client import ChitaiGorodAPIClient
+from .histogram import LatencyHistogram
+from .transport import Transport
+
+api_logger = logging.getLogger('api')
+
+
+class QueryMix:
+    """Взвешенный набор фраз: [("Лев Толстой", 3), ("детектив", 1)]"""
+
+    def __init__(self, weighted_phrases, seed=None):
+        self.phrases = [phrase for phrase, _ in weighted_phrases]
+        self.weights = [weight for _, weight in weighted_phrases]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, specs, seed=None):
+        """Фразы из командной строки: 'фраза' или 'фраза:вес'"""
+        weighted = []
+        for spec in specs:
+            phrase, _, weight = spec.rpartition(":")
+            if phrase and weight.isdigit():
+                weighted.append((phrase, int(weight)))
+            else:
+                weighted.append((spec, 1))
+        return cls(weighted, seed=seed)
+
+    def next(self):
+        with self._lock:
+            return self._random.choices(self.phrases, self.weights)[0]
+
+
+class LoadTestRunner:
+    """Гоняет search_products по смеси запросов заданное время
+
+    rps задан - открытая модель: запросы уходят по расписанию, задержка
+    считается от запланированного момента (без coordinated omission).
+    Иначе - закрытая модель: concurrency потоков шлют запросы подряд.
+    Повторы и circuit breaker выключены - меряем сам сервис.
+    """
+
+    def __init__(self, query_mix, duration=10.0, concurrency=8, rps=None,
+                 use_auth=False, base_url=settings.API_BASE_URL, per_page=20):
+        self.query_mix = query_mix
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rps = rps
+        self.use_auth = use_auth
+        self.base_url = base_url
+        self.per_page = per_page
+
+        self.histogram = LatencyHistogram()
+        self.outcomes = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = ChitaiGorodAPIClient(use_auth=self.use_auth, base_url=self.base_url,
+                                          transport=Transport(retries=0, failure_threshold=None))
+            self._local.client = client
+        return client
+
+    def _count(self, outcome):
+        with self._lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def _one(self, scheduled_at=None):
+        phrase = self.query_mix.next()
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            result = self._client().search_products(phrase, per_page=self.per_page)
+            if result.get("ok"):
+                outcome = "200"
+            else:
+                outcome = str(result.get("status") or result.get("error", "error"))
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        self.histogram.record(time.perf_counter() - start)
+        self._count(outcome)
+
+    def _run_closed(self, deadline):
+        def worker():
+            while time.perf_counter() < deadline:
+                self._one()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _run_open(self, started, deadline):
+        interval = 1.0 / self.rps
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load") as executor:
+            sent = 0
+            while True:
+                scheduled_at = started + sent * interval
+                if scheduled_at >= deadline:
+                    break
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._one, scheduled_at)
+                sent += 1
+
+    def run(self):
+        """Прогон и отчёт (словарь, готовый для json.dumps)"""
+        api_logger.info(
+            f"🚀 Нагрузка: {self.duration} сек, "
+            f"{f'{self.rps} RPS' if self.rps else f'{self.concurrency} потоков'}"
+        )
+        started = time.perf_counter()
+        deadline = started + self.duration
+        if self.rps:
+            self._run_open(started, deadline)
+        else:
+            self._run_closed(deadline)
+        elapsed = time.perf_counter() - started
+
+        errors = {k: v for k, v in self.outcomes.items() if k != "200"}
+        return {
+            "mode": "open" if self.rps else "closed",
+            "target_rps": self.rps,
+            "concurrency": self.concurrency,
+            "duration_s": round(elapsed, 3),
+            "requests": self.histogram.total,
+            "throughput_rps": round(self.histogram.total / elapsed, 2) if elapsed else 0.0,
+            "success": self.outcomes.get("200", 0),
+            "errors": dict(sorted(errors.items())),
+            "latency": self.histogram.as_dict(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон поиска Читай-город")
+    parser.add_argument("--base-url", default=settings.API_BASE_URL)
+    parser.add_argument("--duration", type=float, default=10.0, help="Длительность, сек")
+    parser.add_argument("--concurrency", type=int, default=8, help="Потоков (макс. одновременных запросов)")
+    parser.add_argument("--rps", type=float, default=None, help="Целевой RPS (открытая модель)")
+    parser.add_argument("--query", action="append", default=[], help="'фраза' или 'фраза:вес', можно несколько")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--auth", action="store_true", help="Слать токен (окружение, .auth_token или config/tokens.py)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Куда сохранить JSON-отчёт")
+    args = parser.parse_args()
+
+    query_mix = QueryMix.parse(args.query or settings.TEST_DATA["SEARCH_PHRASES"], seed=args.seed)
+    report = LoadTestRunner(
+        query_mix, duration=args.duration, concurrency=args.concurrency, rps=args.rps,
+        use_auth=args.auth, base_url=args.base_url, per_page=args.per_page,
+    ).run()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
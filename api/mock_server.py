@@ -0,0 +1,445 @@
+"""
+Локальный эмулятор web-agr.chitai-gorod.ru - JSON:API без выхода в интернет
+
+Запуск:
+    python -m api.mock_server --port 8080 --latency 0.05 --error-rate 0.01 --catalogue-size 50000
+
+Клиент:
+    ChitaiGorodAPIClient(base_url="http://127.0.0.1:8080")
+"""
+import argparse
+import asyncio
+import functools
+import json
+import random
+import threading
+import zlib
+from collections import namedtuple
+from urllib.parse import urlsplit, parse_qsl
+
+from config import settings
+
+AUTHORS = [
+    ("Толстой", "Лев", "Николаевич"),
+    ("Достоевский", "Фёдор", "Михайлович"),
+    ("Пушкин", "Александр", "Сергеевич"),
+    ("Чехов", "Антон", "Павлович"),
+    ("Булгаков", "Михаил", "Афанасьевич"),
+    ("Кристи", "Агата", ""),
+    ("Акунин", "Борис", ""),
+    ("Маринина", "Александра", ""),
+    ("Лукьяненко", "Сергей", "Васильевич"),
+    ("Стругацкий", "Аркадий", "Натанович"),
+]
+TITLES = [
+    "Война и мир", "Анна Каренина", "Преступление и наказание", "Идиот",
+    "Евгений Онегин", "Капитанская дочка", "Вишнёвый сад", "Мастер и Маргарита",
+    "Убийство в Восточном экспрессе", "Азазель", "Ночной дозор", "Пикник на обочине",
+]
+CATEGORIES = [
+    (1, "Классическая проза"), (2, "Детектив"), (3, "Фантастика"),
+    (4, "Роман"), (5, "Поэзия"),
+]
+PUBLISHERS = [(1, "АСТ"), (2, "Эксмо"), (3, "Азбука"), (4, "Просвещение")]
+POPULAR_PHRASES = ["Лев Толстой", "детектив", "фантастика", "роман", "книга", "Гарри Поттер"]
+
+# Разобранный запрос к эмулятору: token - значение Authorization или ""
+MockRequest = namedtuple("MockRequest", "method path params body token")
+
+# Фасеты поиска: имя параметра filters[...] -> (заголовок, справочник значений, поле товара)
+FACETS = {
+    "categories": ("Категория", CATEGORIES, "category_id"),
+    "publishers": ("Издательство", PUBLISHERS, "publisher_id"),
+}
+
+
+class Catalogue:
+    """Детерминированный каталог товаров заданного размера
+
+    Кэши product и match - свои у каждого каталога и уходят вместе с ним.
+    """
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seed = seed
+        self.product = functools.lru_cache(maxsize=65536)(self._product)
+        self.match = functools.lru_cache(maxsize=1024)(self._match)
+
+    def _product(self, product_id):
+        rnd = random.Random(self.seed * 1_000_003 + product_id)
+        last, first, middle = AUTHORS[product_id % len(AUTHORS)]
+        category_id, category = CATEGORIES[product_id % len(CATEGORIES)]
+        publisher_id, publisher = PUBLISHERS[rnd.randrange(len(PUBLISHERS))]
+        title = TITLES[(product_id // len(AUTHORS)) % len(TITLES)]
+        price = rnd.randrange(150, 3000)
+        discount = rnd.choice([None, None, 5, 10, 15, 25])
+        return {
+            "id": product_id,
+            "title": f"{title}. Книга {product_id % 4 + 1}",
+            "authors": [{"lastName": last, "firstName": first, "middleName": middle}],
+            "price": price,
+            "oldPrice": round(price * 100 / (100 - discount)) if discount else None,
+            "discount": discount,
+            "category_id": category_id,
+            "category": {"id": category_id, "title": category},
+            "publisher_id": publisher_id,
+            "publisher": {"id": publisher_id, "title": publisher},
+            "rating": {"count": f"{rnd.uniform(3.0, 5.0):.1f}", "votes": rnd.randrange(0, 500)},
+            "search_text": f"книга {title} {last} {first} {category}".lower(),
+        }
+
+    def status(self, product_id, city_id):
+        """Наличие зависит от города - удобно для региональных проверок"""
+        return "canBuy" if zlib.crc32(f"{product_id}:{city_id}".encode()) % 5 else "notAvailable"
+
+    def regional_markup(self, product_id, city_id):
+        """Наценка города, %: вне города по умолчанию у каждого четвёртого товара 5-15%"""
+        if city_id == settings.DEFAULT_CITY_ID:
+            return 0
+        h = zlib.crc32(f"price:{product_id}:{city_id}".encode())
+        return 0 if h % 4 else 5 * (h // 4 % 3 + 1)
+
+    def _match(self, phrase, filters=()):
+        """id товаров по фразе (все слова фразы) и фильтрам фасетов"""
+        words = [w for w in phrase.lower().split() if w]
+        if not words:
+            return ()
+        facet_filters = [(FACETS[name][2], int(value)) for name, value in filters if name in FACETS]
+        found = []
+        for product_id in range(1, self.size + 1):
+            product = self.product(product_id)
+            if all(w in product["search_text"] for w in words) and \
+                    all(product[field] == value for field, value in facet_filters):
+                found.append(product_id)
+        return tuple(found)
+
+
+class MockApiServer:
+    """Асинхронный HTTP/1.1 сервер (keep-alive) с эндпоинтами из config.settings"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=500, retry_after=None, catalogue_size=1000, seed=0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after  # секунды для заголовка Retry-After в ответах 429/503
+        self.catalogue = Catalogue(catalogue_size, seed)
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._writers = set()
+        self.carts = {}  # токен -> {id товара: количество}
+
+        endpoints = {**settings.PUBLIC_API_ENDPOINTS, **settings.PROTECTED_API_ENDPOINTS}
+        self.routes = {
+            endpoints["SEARCH_PRODUCT"]: self.search_product,
+            endpoints["POPULAR_SEARCHES"]: self.popular_searches,
+            endpoints["SEARCH_SUGGESTS"]: self.search_suggests,
+            endpoints["FACET_SEARCH"]: self.facet_search,
+            endpoints["CART_SHORT"]: self.cart_short,
+            endpoints["CART"]: self.cart,
+            endpoints["CART_PRODUCT"]: self.cart_product,
+            endpoints["ORDERS"]: self.orders,
+            endpoints["ORDER_INFO"]: self.order_info,
+        }
+        self.protected = set(settings.PROTECTED_API_ENDPOINTS.values())
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def catalogue_size(self):
+        return self.catalogue.size
+
+    @catalogue_size.setter
+    def catalogue_size(self, size):
+        self.catalogue = Catalogue(size, self.catalogue.seed)
+
+    # ---------- Запуск ----------
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start(self):
+        """Запуск в фоновом потоке (для тестов)"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True, name="mock-api")
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            # keep-alive соединения сами не закроются
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    # ---------- HTTP ----------
+    async def _handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                raw_body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, headers, raw_body)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                retry_after = f"Retry-After: {self.retry_after}\r\n" \
+                    if status in (429, 503) and self.retry_after is not None else ""
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n{retry_after}"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def dispatch(self, method, target, headers, raw_body=b""):
+        self.requests += 1
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            return 400, {"status": 400, "title": "Bad Request"}
+        request = MockRequest(method, url.path, params, body, headers.get("authorization", ""))
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return 404, {"status": 404, "title": "Not Found"}
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status, {"status": self.error_status, "title": "Mock error"}
+        if url.path in self.protected and not request.token.startswith("Bearer "):
+            return 401, {"status": 401, "title": "Unauthorized"}
+        try:
+            return 200, handler(request)
+        except (TypeError, ValueError) as e:
+            # Нечисловые page / per-page / id / фильтры - ответ 400, а не обрыв соединения
+            return 400, {"status": 400, "title": "Bad Request", "detail": str(e)}
+
+    # ---------- Эндпоинты ----------
+    def _product_resource(self, product_id, city_id):
+        product = self.catalogue.product(product_id)
+        attributes = {k: v for k, v in product.items()
+                      if k not in ("id", "search_text", "category_id", "publisher_id")}
+        attributes["status"] = self.catalogue.status(product_id, city_id)
+        markup = self.catalogue.regional_markup(product_id, city_id)
+        if markup:
+            for key in ("price", "oldPrice"):
+                if attributes[key]:
+                    attributes[key] = round(attributes[key] * (100 + markup) / 100)
+        return {"id": str(product_id), "type": "product", "attributes": attributes}
+
+    def search_product(self, request):
+        params = request.params
+        phrase = params.get("phrase", "")
+        page = max(1, int(params.get("products[page]", 1)))
+        per_page = max(1, int(params.get("products[per-page]", 20)))
+        city_id = int(params.get("customerCityId", settings.DEFAULT_CITY_ID))
+        filters = tuple(sorted(
+            (name[len("filters["):-1], value) for name, value in params.items() if name.startswith("filters[")
+        ))
+
+        found = self.catalogue.match(phrase, filters)
+        page_ids = found[(page - 1) * per_page: page * per_page]
+        return {
+            "data": {
+                "type": "search",
+                "id": phrase,
+                "attributes": {"phrase": phrase},
+                "relationships": {
+                    "products": {
+                        "data": [{"id": str(pid), "type": "product"} for pid in page_ids],
+                        "meta": {"pagination": {
+                            "total": len(found), "current": page, "per-page": per_page,
+                            "total-pages": -(-len(found) // per_page),
+                        }},
+                    }
+                },
+            },
+            "included": [self._product_resource(pid, city_id) for pid in page_ids],
+        }
+
+    def popular_searches(self, request):
+        return {
+            "data": {
+                "type": "popularSearchPhrases",
+                "relationships": {"phrases": {"data": [
+                    {"id": str(i), "type": "popularSearchPhrase"} for i, _ in enumerate(POPULAR_PHRASES, 1)
+                ]}},
+            },
+            "included": [
+                {"id": str(i), "type": "popularSearchPhrase", "attributes": {"phraseText": text}}
+                for i, text in enumerate(POPULAR_PHRASES, 1)
+            ],
+        }
+
+    def search_suggests(self, request):
+        phrase = request.params.get("phrase", "").lower()
+        candidates = sorted({t for t in TITLES} | {a[0] for a in AUTHORS} | set(POPULAR_PHRASES))
+        suggests = [text for text in candidates if phrase and phrase in text.lower()][:10]
+        return {
+            "data": {
+                "type": "searchPhraseSuggests",
+                "relationships": {"phrases": {"data": [
+                    {"id": str(i), "type": "searchPhraseSuggest"} for i, _ in enumerate(suggests, 1)
+                ]}},
+            },
+            "included": [
+                {"id": str(i), "type": "searchPhraseSuggest", "attributes": {"phraseText": text}}
+                for i, text in enumerate(suggests, 1)
+            ],
+        }
+
+    def facet_search(self, request):
+        found = self.catalogue.match(request.params.get("phrase", ""))
+        included = []
+        for name, (title, values, field) in FACETS.items():
+            counts = {}
+            for pid in found:
+                value = self.catalogue.product(pid)[field]
+                counts[value] = counts.get(value, 0) + 1
+            included.append({
+                "id": name,
+                "type": "facet",
+                "attributes": {
+                    "title": title,
+                    "name": name,
+                    "values": [{"id": vid, "title": vtitle, "count": counts[vid]}
+                               for vid, vtitle in values if vid in counts],
+                },
+            })
+        return {
+            "data": {
+                "type": "facetSearch",
+                "relationships": {"facets": {"data": [{"id": f["id"], "type": "facet"} for f in included]}},
+            },
+            "included": included,
+        }
+
+    def _cart_items(self, request):
+        return self.carts.setdefault(request.token, {})
+
+    def cart_short(self, request):
+        items = self._cart_items(request)
+        cost = sum(self.catalogue.product(pid)["price"] * qty for pid, qty in items.items())
+        return {"data": {"type": "cartShort", "id": "cart",
+                         "attributes": {"quantity": sum(items.values()), "cost": cost}}}
+
+    def cart(self, request):
+        """GET - содержимое корзины, DELETE - очистка"""
+        items = self._cart_items(request)
+        if request.method == "DELETE":
+            items.clear()
+        return {
+            "data": {"type": "cart", "id": "cart", "relationships": {"products": {"data": [
+                {"id": str(pid), "type": "cartProduct"} for pid in items
+            ]}}},
+            "included": [
+                {"id": str(pid), "type": "cartProduct",
+                 "attributes": {"productId": pid, "quantity": qty,
+                                "title": self.catalogue.product(pid)["title"]}}
+                for pid, qty in items.items()
+            ],
+        }
+
+    def cart_product(self, request):
+        """POST {"id": ...} - добавить товар в корзину"""
+        product_id = int((request.body or {}).get("id", 0))
+        if not 1 <= product_id <= self.catalogue.size:
+            return {"status": 404, "title": "Product not found"}
+        items = self._cart_items(request)
+        items[product_id] = items.get(product_id, 0) + 1
+        return {"data": {"type": "cartProduct", "id": str(product_id),
+                         "attributes": {"productId": product_id, "quantity": items[product_id]}}}
+
+    def orders(self, request):
+        return {"data": [], "meta": {"pagination": {"total": 0, "current": 1}}}
+
+    def order_info(self, request):
+        return {"data": None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный эмулятор API Читай-город")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа, сек")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, сек")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов с ошибкой (0..1)")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--retry-after", type=int, default=None, help="Retry-After для ответов 429/503, сек")
+    parser.add_argument("--catalogue-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockApiServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after,
+        catalogue_size=args.catalogue_size, seed=args.seed,
+    )
+
+    async def run():
+        await server.serve()
+        print(f"🚀 Эмулятор API: {server.base_url}")
+        async with server._server:
+            await server._server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Ограничение частоты запросов к API - token bucket на эндпоинт и общий на все запросы
+
+    from api.rate_limit import RateLimiter, FileBackend
+    limiter = RateLimiter({"*": (20, 20), "SEARCH_PRODUCT": (10, 10)}, backend=FileBackend())
+    client = ChitaiGorodAPIClient(transport=Transport(rate_limiter=limiter))
+
+Лимит - (запросов в секунду, запас burst). Transport.send берёт разрешение
+перед каждой попыткой, в том числе перед повтором. Разрешение бронируется:
+корзина уходит в минус, а запрос ждёт, пока минус не покроется, - очередь
+без опроса и без потери пропускной способности. Ответ 429 ставит на паузу
+корзину эндпоинта (не общую '*') для всех потоков и процессов, а не только
+для повтора.
+
+MemoryBackend - общий для потоков одного процесса (и задач
+AsyncChitaiGorodAPIClient - они отправляют запросы через Transport в потоках),
+FileBackend - общий для процессов --workers (файл под блокировкой).
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from config import settings
+from .histogram import LatencyHistogram
+from .locking import file_lock
+
+GLOBAL = "*"
+
+
+def endpoint_path(name):
+    """'SEARCH_PRODUCT' -> путь эндпоинта; путь и '*' - как есть"""
+    return settings.PUBLIC_API_ENDPOINTS.get(name) or settings.PROTECTED_API_ENDPOINTS.get(name) or name
+
+
+def reserve(state, rate, burst, now, cost=1):
+    """Бронь cost токенов: (новое состояние [токены, время], сколько ждать, сек)"""
+    tokens, updated = state if state is not None else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate) - cost
+    return [tokens, now], (-tokens / rate if tokens < 0 else 0.0)
+
+
+class MemoryBackend:
+    """Состояние корзин в памяти процесса"""
+
+    def __init__(self):
+        self.states = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self.states
+
+
+class FileBackend:
+    """Состояние корзин в JSON-файле; чтение-изменение-запись под файловой блокировкой"""
+
+    def __init__(self, path=settings.RATE_LIMIT_STATE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock, file_lock(self.path) as f:
+            f.seek(0)
+            try:
+                states = json.loads(f.read() or b"{}")
+            except ValueError:
+                states = {}
+            yield states
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(states).encode())
+            f.flush()
+
+
+class RateLimitStats:
+    """Сколько запросов ждали лимита и сколько (гистограмма ожидания)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.histogram = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def record(self, wait):
+        with self._lock:
+            self.requests += 1
+            if wait > 0:
+                self.delayed += 1
+                self.wait_total += wait
+        if wait > 0:
+            self.histogram.record(wait)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "wait_total_s": round(self.wait_total, 3),
+            "wait": self.histogram.as_dict(),
+        }
+
+
+class RateLimiter:
+    """Token bucket: общий лимит '*' и лимиты отдельных эндпоинтов
+
+    limits - {"*" | имя из settings | путь: (в секунду, burst)}, по умолчанию
+    settings.RATE_LIMITS. Запрос ждёт, пока разрешат все его корзины.
+    stats - ожидание по эндпоинтам в этом процессе.
+    """
+
+    def __init__(self, limits=None, backend=None, sleep=time.sleep, clock=time.time):
+        limits = settings.RATE_LIMITS if limits is None else limits
+        self.limits = {endpoint_path(name): (float(rate), float(burst)) for name, (rate, burst) in limits.items()}
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.stats = {}
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _buckets(self, endpoint):
+        return [key for key in (GLOBAL, endpoint) if key in self.limits]
+
+    def reserve(self, endpoint, cost=1):
+        """Бронь разрешения без ожидания -> сколько ждать до запроса, сек"""
+        buckets = self._buckets(endpoint)
+        if not buckets:
+            return 0.0
+        now = self._clock()
+        wait = 0.0
+        with self.backend.transaction() as states:
+            for key in buckets:
+                rate, burst = self.limits[key]
+                states[key], bucket_wait = reserve(states.get(key), rate, burst, now, cost)
+                wait = max(wait, bucket_wait)
+        return wait
+
+    def _record(self, endpoint, wait):
+        with self._lock:
+            stats = self.stats.get(endpoint)
+            if stats is None:
+                stats = self.stats[endpoint] = RateLimitStats()
+        stats.record(wait)
+
+    def acquire(self, endpoint, cost=1):
+        """Дождаться разрешения (блокирует поток) -> сколько ждали, сек"""
+        wait = self.reserve(endpoint, cost)
+        if wait > 0:
+            self._sleep(wait)
+        self._record(endpoint, wait)
+        return wait
+
+    def penalize(self, endpoint, seconds):
+        """Сервер ответил 429: корзина эндпоинта не выдаёт разрешений ещё seconds сек
+
+        Общая корзина '*' не трогается - 429 одного эндпоинта не останавливает
+        остальные. False - у эндпоинта нет своего лимита, ставить на паузу нечего.
+        """
+        if endpoint == GLOBAL or endpoint not in self.limits:
+            return False
+        rate, burst = self.limits[endpoint]
+        now = self._clock()
+        with self.backend.transaction() as states:
+            tokens, _ = reserve(states.get(endpoint), rate, burst, now, cost=0)[0]
+            states[endpoint] = [min(tokens, -seconds * rate), now]
+        return True
+
+    def summary(self):
+        """{эндпоинт: статистика ожидания} + "total" по всем"""
+        with self._lock:
+            stats = dict(self.stats)
+        total = RateLimitStats()
+        for item in stats.values():
+            total.requests += item.requests
+            total.delayed += item.delayed
+            total.wait_total += item.wait_total
+            total.histogram.merge(item.histogram)
+        return {**{endpoint: item.as_dict() for endpoint, item in sorted(stats.items())}, "total": total.as_dict()}
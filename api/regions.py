@@ -0,0 +1,185 @@
+"""
+Региональные проверки: один набор запросов сразу во всех городах и матрица различий
+
+Запуск:
+    python -m api.regions --base-url http://127.0.0.1:8080
+    python -m api.regions --phrase "Лев Толстой" --city Москва --city Новосибирск --per-page 50
+
+Все пары (фраза, город) запрашиваются параллельно - город передаётся в каждом
+запросе (customerCityId), общий client.city_id не трогается. Результат -
+CityMatrix: по товару и городу (наличие, цена), по фразе и городу - total.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+import requests
+
+from config import settings
+from .async_client import AsyncChitaiGorodAPIClient
+
+api_logger = logging.getLogger('api')
+
+
+class CityMatrix:
+    """Наличие, цена и total по городам; ячейки в порядке self.cities
+
+    products: {id товара: [(доступен, цена) или None - нет в выдаче города]}
+    totals: {фраза: [total или None - ошибка запроса]}
+    windows: {фраза: ["full" - получена вся выдача, "partial" - только первая
+    страница, "error" или None - не запрашивалась]}
+
+    Отсутствие товара в городе достоверно, только если выдача города по фразе,
+    в которой товар нашёлся, получена целиком. Иначе товар мог просто не попасть
+    на первую страницу (ранжирование по городам разное) или запрос упал -
+    такие ячейки не сравниваются, ошибки лежат отдельно в errors.
+    """
+
+    def __init__(self, cities):
+        self.cities = list(cities)  # [(название, id)]
+        self.products = {}
+        self.titles = {}
+        self.totals = {}
+        self.windows = {}
+        self.found_by = {}  # id товара -> {фразы, в выдаче которых он есть}
+        self.errors = []
+
+    def add(self, phrase, column, result):
+        """Ответ search_products по фразе для города с индексом column"""
+        if phrase not in self.totals:
+            self.totals[phrase] = [None] * len(self.cities)
+            self.windows[phrase] = [None] * len(self.cities)
+        if not result.get("ok"):
+            self.windows[phrase][column] = "error"
+            self.errors.append((phrase, self.cities[column][0], result.get("status") or result.get("error")))
+            return
+        total = result.get("total", 0)
+        self.totals[phrase][column] = total
+        self.windows[phrase][column] = "full" if len(result["books"]) >= total else "partial"
+        for book in result["books"]:
+            cells = self.products.setdefault(book["id"], [None] * len(self.cities))
+            cells[column] = (book["available"], book["price"])
+            self.titles.setdefault(book["id"], book["title"])
+            self.found_by.setdefault(book["id"], set()).add(phrase)
+
+    def missing(self, product_id, column):
+        """Товара точно нет в выдаче города: его не вернула полная выдача хотя бы одной фразы"""
+        return self.products[product_id][column] is None and any(
+            self.windows[phrase][column] == "full" for phrase in self.found_by[product_id])
+
+    def differences(self):
+        """Товары и фразы, у которых города расходятся
+
+        [{"product_id", "title", "fields": ["available", "price", "missing"], "cities": {город: ячейка}}]
+        и {"phrase", "fields": ["total"], ...} для total. Города с ошибкой запроса
+        и неполной выдачей в сравнение не входят (ячейка None без "missing").
+        """
+        names = [name for name, _ in self.cities]
+        result = []
+        for product_id, cells in self.products.items():
+            present = [cell for cell in cells if cell is not None]
+            fields = [field for i, field in enumerate(("available", "price"))
+                      if len({cell[i] for cell in present}) > 1]
+            if any(self.missing(product_id, column) for column in range(len(cells))):
+                fields.append("missing")
+            if fields:
+                result.append({"product_id": product_id, "title": self.titles[product_id], "fields": fields,
+                               "cities": dict(zip(names, cells))})
+        for phrase, totals in self.totals.items():
+            if len({total for total in totals if total is not None}) > 1:
+                result.append({"phrase": phrase, "fields": ["total"], "cities": dict(zip(names, totals))})
+        return result
+
+    def as_dict(self):
+        names = [name for name, _ in self.cities]
+        return {
+            "cities": names,
+            "totals": self.totals,
+            "products": {product_id: [list(cell) if cell else None for cell in cells]
+                         for product_id, cells in self.products.items()},
+            "windows": self.windows,
+            "differences": self.differences(),
+            "errors": self.errors,
+        }
+
+    def format_table(self, only_differences=True):
+        """Текстовая таблица: товар | город1 | город2 ...; '≠' - города расходятся
+
+        '—' - товара точно нет в городе, '?' - неизвестно (ошибка или неполная выдача)
+        """
+        differing = {d["product_id"] for d in self.differences() if "product_id" in d}
+        lines = ["   | товар                          | " + " | ".join(f"{name[:14]:>14}" for name, _ in self.cities)]
+        for product_id, cells in self.products.items():
+            if only_differences and product_id not in differing:
+                continue
+            marker = "≠" if product_id in differing else " "
+            values = [f"{'✓' if cell[0] else '✗'} {cell[1]}" if cell is not None
+                      else "—" if self.missing(product_id, column) else "?"
+                      for column, cell in enumerate(cells)]
+            lines.append(f" {marker} | {self.titles[product_id][:30]:<30} | "
+                         + " | ".join(f"{value:>14}" for value in values))
+        return "\n".join(lines)
+
+
+async def compare_cities(client, phrases, cities=None, per_page=20):
+    """Одни и те же фразы во всех городах параллельно -> CityMatrix
+
+    cities - {название: customerCityId}, по умолчанию TEST_DATA["CITIES"].
+    Одновременно идёт не больше client.concurrency запросов.
+    """
+    cities = cities or settings.TEST_DATA["CITIES"]
+    matrix = CityMatrix(cities.items())
+    semaphore = asyncio.Semaphore(client.concurrency)
+
+    async def one(phrase, column, city_id):
+        async with semaphore:
+            try:
+                result = await client.search_products(phrase, per_page=per_page, city_id=city_id)
+            except requests.RequestException as e:
+                result = {"ok": False, "error": str(e)}
+        matrix.add(phrase, column, result)
+
+    phrases = list(phrases)
+    api_logger.info(f"🗺️ Города: {len(matrix.cities)} x {len(phrases)} фраз")
+    await asyncio.gather(*(one(phrase, column, city_id)
+                           for phrase in phrases for column, (_, city_id) in enumerate(matrix.cities)))
+    return matrix
+
+
+async def _run(args):
+    cities = settings.TEST_DATA["CITIES"]
+    if args.city:
+        cities = {name: cities[name] if name in cities else int(name) for name in args.city}
+    async with AsyncChitaiGorodAPIClient(use_auth=args.auth, base_url=args.base_url,
+                                         concurrency=args.concurrency) as client:
+        return await compare_cities(client, args.phrase or settings.TEST_DATA["TEST_PRODUCTS"],
+                                    cities=cities, per_page=args.per_page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение выдачи Читай-город по городам")
+    parser.add_argument("--phrase", action="append", default=[], help="Фраза, можно несколько")
+    parser.add_argument("--city", action="append", default=[],
+                        help="Город из TEST_DATA['CITIES'] или customerCityId, можно несколько")
+    parser.add_argument("--base-url", default=settings.API_BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--auth", action="store_true", help="Слать токен (окружение, .auth_token или config/tokens.py)")
+    parser.add_argument("--json", action="store_true", help="Полная матрица в JSON вместо таблицы")
+    args = parser.parse_args()
+
+    matrix = asyncio.run(_run(args))
+    if args.json:
+        print(json.dumps(matrix.as_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(matrix.format_table())
+        for phrase, totals in matrix.totals.items():
+            print(f"   {phrase}: " + ", ".join(f"{name} {total}" for (name, _), total in zip(matrix.cities, totals)))
+        for phrase, city, error in matrix.errors:
+            print(f"❌ {city}, '{phrase}': {error} - город не сравнивался")
+    raise SystemExit(1 if matrix.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
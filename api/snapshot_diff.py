@@ -0,0 +1,243 @@
+"""
+Что изменилось в каталоге между двумя снимками: цены, скидки, наличие
+
+Снимок - CSV с полями api.books.BOOK_FIELDS, строки по возрастанию id
+(так его пишет export из базы api/crawler.py). Сравнение - один проход
+слиянием двух отсортированных потоков: в памяти только текущие строки,
+так что размер снимков не ограничен. Несортированный CSV можно
+отсортировать внешней сортировкой (sort) - кусками по chunk_rows строк.
+
+    python -m api.snapshot_diff export snapshots/2026-10-18.csv        # из .catalogue.sqlite3
+    python -m api.snapshot_diff diff snapshots/old.csv snapshots/new.csv --output changes.jsonl
+    python -m api.snapshot_diff diff snapshots/old.csv .catalogue.sqlite3 --kind price_drop
+    python -m api.snapshot_diff sort unsorted.csv sorted.csv
+
+Отчёт - JSON Lines, по изменению на строку, пишется по мере сравнения.
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+
+from config import settings
+from .books import BOOK_FIELDS, _discount_percent
+
+ID, TITLE, PRICE, OLD_PRICE, DISCOUNT, AVAILABLE, RATING = (
+    BOOK_FIELDS.index(f) for f in ("id", "title", "price", "old_price", "discount", "available", "rating"))
+
+KINDS = ("price_drop", "new_discount", "became_available", "became_unavailable", "added", "removed")
+DEFAULT_KINDS = KINDS[:4]
+
+
+def _number(value):
+    if value in (None, ""):
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def normalize(values):
+    """Поля книги (строки CSV, ряд из базы или словарь адаптера) -> кортеж в порядке BOOK_FIELDS"""
+    if isinstance(values, dict):
+        values = [values.get(field) for field in BOOK_FIELDS]
+    row = list(values)
+    row[ID] = str(row[ID])
+    row[PRICE] = _number(row[PRICE])
+    row[OLD_PRICE] = _number(row[OLD_PRICE])
+    row[DISCOUNT] = _discount_percent(row[DISCOUNT])
+    row[AVAILABLE] = row[AVAILABLE] not in (None, "", "0", 0, False, "False")
+    row[RATING] = float(row[RATING] or 0)
+    return tuple(row)
+
+
+# ---------- Снимки ----------
+def read_snapshot(path):
+    """Строки снимка по одной; ValueError, если id не по возрастанию или повторяется"""
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is not None and tuple(header) != BOOK_FIELDS:
+            raise ValueError(f"{path}: ожидались колонки {','.join(BOOK_FIELDS)}")
+        previous = None
+        for values in reader:
+            row = normalize(values)
+            if previous is not None and row[ID] <= previous:
+                raise ValueError(f"{path}: id не по возрастанию ({previous!r} -> {row[ID]!r}), "
+                                 f"отсортируйте: python -m api.snapshot_diff sort")
+            previous = row[ID]
+            yield row
+
+
+def read_store(path):
+    """Строки текущего состояния базы api/crawler.py по возрастанию id"""
+    from .crawler import CatalogueStore
+
+    store = CatalogueStore(path)
+    try:
+        for values in store.iter_products():
+            yield normalize(values)
+    finally:
+        store.close()
+
+
+def open_snapshot(path):
+    """CSV-снимок или база обхода (.sqlite3) -> поток строк"""
+    return read_store(path) if path.endswith((".sqlite3", ".db")) else read_snapshot(path)
+
+
+def write_snapshot(rows, path):
+    """Строки (уже по возрастанию id) -> CSV; число записанных строк"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(BOOK_FIELDS)
+        for row in rows:
+            writer.writerow(["" if v is None else int(v) if isinstance(v, bool) else v for v in row])
+            count += 1
+    return count
+
+
+def _read_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for values in reader:
+            yield normalize(values)
+
+
+def sort_snapshot(src, dst, chunk_rows=100_000):
+    """Внешняя сортировка CSV по id: куски по chunk_rows строк -> слияние
+
+    При повторе id остаётся последняя строка. Возвращает число строк в dst.
+    """
+    key = lambda row: row[ID]
+    with tempfile.TemporaryDirectory(prefix="snapshot-sort-") as tmp:
+        chunks = []
+        chunk = []
+
+        def spill():
+            path = os.path.join(tmp, f"chunk-{len(chunks)}.csv")
+            write_snapshot(sorted(chunk, key=key), path)
+            chunks.append(path)
+            chunk.clear()
+
+        for row in _read_rows(src):
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                spill()
+        if chunk or not chunks:
+            spill()
+
+        def deduplicated():
+            # heapq.merge стабилен: при равных id строки идут в порядке кусков, то есть файла
+            pending = None
+            for row in heapq.merge(*(_read_rows(path) for path in chunks), key=key):
+                if pending is not None and pending[ID] != row[ID]:
+                    yield pending
+                pending = row
+            if pending is not None:
+                yield pending
+
+        return write_snapshot(deduplicated(), dst)
+
+
+# ---------- Сравнение ----------
+def _changes(old, new, min_drop):
+    changes = []
+    if old[PRICE] is not None and new[PRICE] is not None and new[PRICE] < old[PRICE] \
+            and old[PRICE] - new[PRICE] >= old[PRICE] * min_drop / 100:
+        changes.append(("price_drop", {"old": old[PRICE], "new": new[PRICE],
+                                       "percent": round((old[PRICE] - new[PRICE]) * 100 / old[PRICE], 1)}))
+    if new[DISCOUNT] and not old[DISCOUNT]:
+        changes.append(("new_discount", {"old": 0, "new": new[DISCOUNT]}))
+    if new[AVAILABLE] != old[AVAILABLE]:
+        changes.append(("became_available" if new[AVAILABLE] else "became_unavailable",
+                        {"old": old[AVAILABLE], "new": new[AVAILABLE]}))
+    return changes
+
+
+def diff(old_rows, new_rows, kinds=DEFAULT_KINDS, min_drop=0):
+    """Изменения между снимками по мере слияния: {"kind", "id", "title", "old", "new", ...}
+
+    old_rows, new_rows - строки normalize() по возрастанию id. min_drop -
+    минимальное снижение цены, %. added / removed (товар появился / пропал)
+    выдаются, только если указаны в kinds.
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(KINDS)
+    if unknown:
+        raise ValueError(f"Неизвестные виды изменений: {sorted(unknown)}")
+
+    old_iter, new_iter = iter(old_rows), iter(new_rows)
+    old, new = next(old_iter, None), next(new_iter, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[ID] < new[ID]):
+            if "removed" in kinds:
+                yield {"kind": "removed", "id": old[ID], "title": old[TITLE]}
+            old = next(old_iter, None)
+        elif old is None or new[ID] < old[ID]:
+            if "added" in kinds:
+                yield {"kind": "added", "id": new[ID], "title": new[TITLE], "price": new[PRICE],
+                       "available": new[AVAILABLE]}
+            new = next(new_iter, None)
+        else:
+            for kind, values in _changes(old, new, min_drop):
+                if kind in kinds:
+                    yield {"kind": kind, "id": new[ID], "title": new[TITLE], **values}
+            old, new = next(old_iter, None), next(new_iter, None)
+
+
+def write_report(changes, out):
+    """Изменения -> JSON Lines в out по мере поступления; Counter по видам"""
+    counts = Counter()
+    for change in changes:
+        out.write(json.dumps(change, ensure_ascii=False) + "\n")
+        counts[change["kind"]] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Изменения каталога Читай-город между снимками")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Снимок текущего состояния базы обхода в CSV")
+    export.add_argument("output")
+    export.add_argument("--db", default=settings.CATALOGUE_DB)
+
+    sort = commands.add_parser("sort", help="Отсортировать CSV-снимок по id")
+    sort.add_argument("src")
+    sort.add_argument("dst")
+    sort.add_argument("--chunk-rows", type=int, default=100_000)
+
+    compare = commands.add_parser("diff", help="Изменения между двумя снимками (CSV или .sqlite3)")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--kind", action="append", choices=KINDS, help="Виды изменений, можно несколько "
+                                                                      f"(по умолчанию {', '.join(DEFAULT_KINDS)})")
+    compare.add_argument("--min-drop", type=float, default=0, help="Минимальное снижение цены, %%")
+    compare.add_argument("--output", help="Куда писать JSON Lines (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"Строк: {write_snapshot(read_store(args.db), args.output)}")
+    elif args.command == "sort":
+        print(f"Строк: {sort_snapshot(args.src, args.dst, chunk_rows=args.chunk_rows)}")
+    else:
+        changes = diff(open_snapshot(args.old), open_snapshot(args.new),
+                       kinds=args.kind or DEFAULT_KINDS, min_drop=args.min_drop)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                counts = write_report(changes, out)
+        else:
+            counts = write_report(changes, sys.stdout)
+        print(json.dumps(dict(counts), ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Транспорт API клиента - пул соединений, повторы с backoff, circuit breaker
+"""
+import contextvars
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+api_logger = logging.getLogger('api')
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Эндпоинт временно отключён circuit breaker'ом - запрос не отправлялся"""
+
+
+class RequestCancelled(requests.RequestException):
+    """Запрос отменили до отправки (SendGuard.cancel) - в сеть он не ушёл"""
+
+
+class SendGuard:
+    """Отмена запроса, который ещё не ушёл в сеть
+
+    Ставится через send_guard.set(guard) в контексте вызова (asyncio-задача
+    передаёт контекст в поток AsyncChitaiGorodAPIClient). Transport.send
+    проверяет его перед каждой попыткой - после ожидания лимита частоты.
+    Запрос, уже ушедший в сеть, дорабатывает до конца.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.sent = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Отменить -> True, если запрос так и не отправлен"""
+        with self._lock:
+            self.cancelled = True
+            return not self.sent
+
+    def dispatch(self):
+        """Перед отправкой: RequestCancelled, если отменён, иначе отмечает отправку"""
+        with self._lock:
+            if self.cancelled:
+                raise RequestCancelled("Запрос отменён до отправки")
+            self.sent = True
+
+
+send_guard = contextvars.ContextVar("send_guard", default=None)
+
+
+class CircuitBreaker:
+    """Размыкается после failure_threshold неудач подряд на reset_timeout секунд
+
+    Потом пропускает один пробный запрос (half-open): успех замыкает цепь,
+    неудача снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=settings.CIRCUIT_RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._clock = clock
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Пробный запрос half-open так и не отправлен - пропустить следующий"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+                self._probe_in_flight = False
+
+
+def parse_retry_after(value):
+    """Retry-After: секунды или HTTP-дата -> секунды (или None)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+class Transport:
+    """Отправка запросов для ChitaiGorodAPIClient._request
+
+    - пул соединений pool_size (для параллельного использования клиента);
+    - повтор идемпотентных запросов на сетевых ошибках и retry_statuses
+      с экспоненциальной задержкой и полным jitter, с учётом Retry-After;
+    - circuit breaker на каждый эндпоинт: 5xx, сетевые ошибки и ответы
+      дольше slow_call_threshold считаются неудачей.
+    - rate_limiter (api.rate_limit.RateLimiter): разрешение перед каждой
+      попыткой, ответ 429 ставит эндпоинт на паузу для всех.
+    - send_guard (SendGuard) в контексте: отменённый запрос не отправляется.
+    failure_threshold=None отключает breaker, retries=0 - повторы.
+    response.request_seconds - время самого запроса последней попытки,
+    без ожидания лимита и пауз между повторами.
+    """
+
+    def __init__(self, pool_size=settings.POOL_SIZE, retries=settings.RETRY_ATTEMPTS,
+                 backoff=settings.RETRY_BACKOFF, backoff_max=settings.RETRY_BACKOFF_MAX,
+                 retry_statuses=settings.RETRY_STATUSES,
+                 failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+                 slow_call_threshold=settings.SLOW_CALL_THRESHOLD,
+                 rate_limiter=None, sleep=time.sleep):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+        self.rate_limiter = rate_limiter
+        self.breakers = {}
+        self._sleep = sleep
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def mount(self, session, pool_size=None):
+        """Подключает пул соединений нужного размера к сессии"""
+        if pool_size is not None:
+            self.pool_size = pool_size
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def breaker(self, endpoint):
+        if self.failure_threshold is None:
+            return None
+        with self._lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def backoff_delay(self, attempt, response=None):
+        """Задержка перед повтором attempt (0, 1, ...): Retry-After или full jitter"""
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return self._random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def send(self, session, method, url, endpoint, **kwargs):
+        breaker = self.breaker(endpoint)
+        retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        guard = send_guard.get()
+
+        for attempt in range(retries + 1):
+            if breaker is not None and not breaker.allow():
+                api_logger.warning(f"⛔ Circuit breaker разомкнут: {endpoint}")
+                raise CircuitOpenError(f"Circuit breaker разомкнут для {endpoint}")
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint)
+
+            if guard is not None:
+                try:
+                    guard.dispatch()
+                except RequestCancelled:
+                    if breaker is not None:
+                        breaker.release_probe()
+                    raise
+
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt == retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                api_logger.warning(f"🔄 Повтор {attempt + 1}/{retries} через {delay:.2f} сек: {type(e).__name__}")
+                self._sleep(delay)
+                continue
+
+            response.request_seconds = time.perf_counter() - started
+            if breaker is not None:
+                slow = self.slow_call_threshold is not None and \
+                    response.request_seconds > self.slow_call_threshold
+                if response.status_code >= 500 or slow:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            paused = None
+            if response.status_code == 429 and self.rate_limiter is not None:
+                # Пауза в корзинах - для всех потоков и процессов, повтор дождётся её в acquire
+                delay = self.backoff_delay(attempt, response)
+                if self.rate_limiter.penalize(endpoint, delay):
+                    paused = delay
+
+            if response.status_code not in self.retry_statuses or attempt == retries:
+                return response
+
+            delay = paused if paused is not None else self.backoff_delay(attempt, response)
+            api_logger.warning(f"🔄 Повтор {attempt + 1}/{retries} через {delay:.2f} сек: {response.status_code}")
+            response.close()
+            if paused is None:
+                self._sleep(delay)
@@ -0,0 +1,216 @@
+"""
+Подсказки поиска при наборе фразы - debounce, отмена устаревших запросов, переиспользование префиксов
+
+Запуск бенчмарка:
+    python -m api.typeahead --base-url http://127.0.0.1:8080
+    python -m api.typeahead --phrase "Лев Толстой" --phrase Достоевский --interval 0.08 --debounce 0.15
+
+Отчёт: задержка от нажатия до показа подсказок (p50/p90/p99), сколько запросов
+ушло в сеть, сколько нажатий отвечено локально по более короткому префиксу,
+сколько запросов отменено как устаревшие и сколько поглотил debounce.
+
+Отмена устаревшего запроса: если он ещё не ушёл в сеть (ждёт в пуле потоков
+или у лимита частоты), он не отправляется (dropped_unsent). Уже ушедший
+запрос дорабатывает в потоке до конца - занимает соединение пула, а его
+ответ выбрасывается.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from config import settings
+from .async_client import AsyncChitaiGorodAPIClient
+from .histogram import LatencyHistogram
+from .transport import SendGuard, Transport, send_guard
+
+api_logger = logging.getLogger('api')
+
+
+class TypeaheadStats:
+    """Счётчики набора и гистограмма задержки показа подсказок"""
+
+    def __init__(self):
+        self.keystrokes = 0
+        self.requests = 0
+        self.cache_hits = 0
+        self.prefix_hits = 0
+        self.cancelled = 0
+        self.dropped_unsent = 0
+        self.debounced = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+
+    def as_dict(self):
+        return {
+            "keystrokes": self.keystrokes,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "prefix_hits": self.prefix_hits,
+            "requests_saved_by_prefix": self.prefix_hits,
+            "cancelled_stale": self.cancelled,
+            "dropped_unsent": self.dropped_unsent,
+            "debounced": self.debounced,
+            "errors": self.errors,
+            "latency": self.histogram.as_dict(),
+        }
+
+
+class Typeahead:
+    """Подсказки к набираемой фразе поверх AsyncChitaiGorodAPIClient
+
+    Ответ с подсказками короче limit считается полным: подсказки к более
+    длинному префиксу - его подмножество (фраза содержит префикс), поэтому
+    они считаются локально, без запроса. Полный ответ (limit подсказок)
+    мог быть обрезан - такой префикс не переиспользуется. Если поиск
+    подсказок на сервере не по подстроке, reuse_prefixes=False.
+    """
+
+    def __init__(self, client, debounce=settings.SUGGEST_DEBOUNCE, min_chars=settings.SUGGEST_MIN_CHARS,
+                 limit=settings.SUGGEST_LIMIT, reuse_prefixes=True):
+        self.client = client
+        self.debounce = debounce
+        self.min_chars = min_chars
+        self.limit = limit
+        self.reuse_prefixes = reuse_prefixes
+        self.stats = TypeaheadStats()
+        self._suggests = {}  # префикс (lower) -> (подсказки, полный ли список)
+
+    def _local(self, key):
+        """Подсказки без запроса -> (фразы, "cache" | "prefix") или None"""
+        if key in self._suggests:
+            return self._suggests[key][0], "cache"
+        if not self.reuse_prefixes:
+            return None
+        for length in range(len(key) - 1, self.min_chars - 1, -1):
+            entry = self._suggests.get(key[:length])
+            if entry is not None and entry[1]:
+                return [phrase for phrase in entry[0] if key in phrase.lower()], "prefix"
+        return None
+
+    async def suggest(self, prefix):
+        """Подсказки к префиксу -> (фразы, источник: cache | prefix | network | error)"""
+        key = prefix.lower()
+        local = self._local(key)
+        if local is not None:
+            if local[1] == "cache":
+                self.stats.cache_hits += 1
+            else:
+                self.stats.prefix_hits += 1
+                self._suggests[key] = (local[0], True)
+            return local
+
+        self.stats.requests += 1
+        result = await self.client.get_search_suggests(prefix)
+        if not result.get("ok"):
+            self.stats.errors += 1
+            return [], "error"
+        phrases = result["phrases"]
+        self._suggests[key] = (phrases, len(phrases) < self.limit)
+        return phrases, "network"
+
+    async def _keystroke(self, prefix, pressed_at, state):
+        if len(prefix.strip()) < self.min_chars:
+            return {"prefix": prefix, "status": "skipped"}
+
+        # То, что можно посчитать локально, показываем сразу, без debounce
+        if self._local(prefix.lower()) is None:
+            await asyncio.sleep(self.debounce)
+            state["stage"] = "request"
+        token = send_guard.set(state["guard"])
+        try:
+            phrases, source = await self.suggest(prefix)
+        finally:
+            send_guard.reset(token)
+
+        latency = time.perf_counter() - pressed_at
+        self.stats.histogram.record(latency)
+        return {"prefix": prefix, "status": source, "latency_ms": round(latency * 1000, 3),
+                "suggests": phrases}
+
+    async def type(self, phrase, interval=0.08):
+        """Набор фразы по букве каждые interval сек -> записи по каждому нажатию
+
+        Новое нажатие отменяет незавершённую обработку предыдущего: ожидание
+        debounce (статус "debounced") или запрос ("cancelled", sent - успел
+        ли он уйти в сеть). Подсказки последнего нажатия дожидаются всегда.
+        """
+        started = time.perf_counter()
+        keystrokes = []
+        for i in range(1, len(phrase) + 1):
+            delay = started + (i - 1) * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if keystrokes and not keystrokes[-1][1].done():
+                keystrokes[-1][1].cancel()
+                keystrokes[-1][2]["guard"].cancel()
+            self.stats.keystrokes += 1
+            state = {"stage": "debounce", "guard": SendGuard()}
+            task = asyncio.create_task(self._keystroke(phrase[:i], time.perf_counter(), state))
+            keystrokes.append((phrase[:i], task, state))
+
+        await asyncio.gather(*(task for _, task, _ in keystrokes), return_exceptions=True)
+
+        records = []
+        for prefix, task, state in keystrokes:
+            if task.cancelled():
+                if state["stage"] == "request":
+                    sent = state["guard"].sent
+                    self.stats.cancelled += 1
+                    if not sent:
+                        # В сеть не ушёл - в requests не считаем
+                        self.stats.dropped_unsent += 1
+                        self.stats.requests -= 1
+                    records.append({"prefix": prefix, "status": "cancelled", "sent": sent})
+                else:
+                    self.stats.debounced += 1
+                    records.append({"prefix": prefix, "status": "debounced"})
+            elif task.exception() is not None:
+                self.stats.errors += 1
+                records.append({"prefix": prefix, "status": "error", "error": str(task.exception())})
+            else:
+                records.append(task.result())
+        return records
+
+
+async def benchmark(phrases, base_url=settings.API_BASE_URL, interval=0.08, debounce=settings.SUGGEST_DEBOUNCE,
+                    reuse_prefixes=True, use_auth=False):
+    """Набор фраз подряд одной сессией подсказок -> отчёт (словарь для json.dumps)"""
+    transport = Transport(retries=0, failure_threshold=None)
+    async with AsyncChitaiGorodAPIClient(use_auth=use_auth, base_url=base_url, transport=transport) as client:
+        typeahead = Typeahead(client, debounce=debounce, reuse_prefixes=reuse_prefixes)
+        for phrase in phrases:
+            records = await typeahead.type(phrase, interval=interval)
+            shown = records[-1].get("suggests", [])
+            api_logger.info(f"⌨️ '{phrase}': {len(shown)} подсказок")
+    return {"interval_s": interval, "debounce_s": debounce, "reuse_prefixes": reuse_prefixes,
+            "phrases": len(phrases), **typeahead.stats.as_dict()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подсказок поиска Читай-город при наборе")
+    parser.add_argument("--base-url", default=settings.API_BASE_URL)
+    parser.add_argument("--phrase", action="append", default=[], help="Фраза для набора, можно несколько")
+    parser.add_argument("--interval", type=float, default=0.08, help="Пауза между нажатиями, сек")
+    parser.add_argument("--debounce", type=float, default=settings.SUGGEST_DEBOUNCE)
+    parser.add_argument("--no-prefix-reuse", action="store_true", help="Каждый префикс - запрос в сеть")
+    parser.add_argument("--auth", action="store_true", help="Слать токен (окружение, .auth_token или config/tokens.py)")
+    parser.add_argument("--output", help="Куда сохранить JSON-отчёт")
+    args = parser.parse_args()
+
+    phrases = args.phrase or settings.TEST_DATA["TEST_PRODUCTS"]
+    report = asyncio.run(benchmark(
+        phrases, base_url=args.base_url, interval=args.interval, debounce=args.debounce,
+        reuse_prefixes=not args.no_prefix_reuse, use_auth=args.auth,
+    ))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,27 @@
 BASE_URL = "https://www.chitai-gorod.ru"
 API_BASE_URL = "https://web-agr.chitai-gorod.ru"
 TIMEOUT = 15
+CONNECT_TIMEOUT = 5
 DEFAULT_CITY_ID = 213  # Москва
 
+# Транспорт API: пул соединений, повторы, circuit breaker
+POOL_SIZE = 10
+RETRY_ATTEMPTS = 2  # повторов после первой попытки (только идемпотентные запросы)
+RETRY_BACKOFF = 0.5  # базовая задержка, растёт x2 с каждой попыткой (+ jitter)
+RETRY_BACKOFF_MAX = 10
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CIRCUIT_FAILURE_THRESHOLD = 5  # неудач подряд до размыкания
+CIRCUIT_RESET_TIMEOUT = 30  # сек до пробного запроса
+SLOW_CALL_THRESHOLD = 5  # сек: более долгий ответ считается неудачей
+
+# Ограничение частоты запросов (api/rate_limit.py, --api-rate-limit): (запросов в секунду, burst)
+RATE_LIMITS = {
+    "*": (20, 20),  # все эндпоинты вместе
+    "SEARCH_PRODUCT": (10, 10),
+    "SEARCH_SUGGESTS": (20, 20),
+}
+RATE_LIMIT_STATE = ".workers/rate_limit.json"  # состояние корзин, общее для процессов --workers
+
 # Пути API
 PUBLIC_API_ENDPOINTS = {
     "SEARCH_PRODUCT": "/web/api/v2/search/product",
@@ -19,10 +38,97 @@ PUBLIC_API_ENDPOINTS = {
 
 PROTECTED_API_ENDPOINTS = {
     "CART_SHORT": "/web/api/v1/cart/short",
+    "CART": "/web/api/v1/cart",
+    "CART_PRODUCT": "/web/api/v1/cart/product",
     "ORDERS": "/web/api/v2/orders",
     "ORDER_INFO": "/web/api/v2/order-info/by-last-order",
 }
 
+# Кэш ответов API: TTL в секундах по эндпоинтам (нет в списке - не кэшируется)
+CACHE_TTLS = {
+    "SEARCH_PRODUCT": 300,
+    "POPULAR_SEARCHES": 3600,
+    "SEARCH_SUGGESTS": 300,
+    "FACET_SEARCH": 300,
+}
+CACHE_MAX_ENTRIES = 1024
+CACHE_DIR = ".api_cache"
+
+# Кассеты API (запись/воспроизведение ответов)
+CASSETTE_DIR = "tests/cassettes"
+
+# Подсказки поиска (api/typeahead.py)
+SUGGEST_LIMIT = 10  # подсказок в ответе; меньше - список полный и годится для более длинных префиксов
+SUGGEST_MIN_CHARS = 2  # с какой длины префикса запрашивать подсказки
+SUGGEST_DEBOUNCE = 0.15  # сек тишины после нажатия перед запросом
+
+# История задержек API (api/latency.py, --api-latency)
+LATENCY_DB = ".api_latency.sqlite3"
+LATENCY_RUN_ENV = "API_LATENCY_RUN"  # общий run_id для процессов --workers
+LATENCY_BASELINE_RUNS = 20  # скользящее окно прошлых прогонов
+LATENCY_MIN_BASELINE_RUNS = 5  # меньше истории - ряд не проверяется
+LATENCY_MAD_THRESHOLD = 3.0  # граница: медиана + 3 * 1.4826 * MAD
+LATENCY_MIN_INCREASE = 0.2  # и не меньше +20% к медиане
+
+# Токен авторизации (api/auth.py): источники по порядку - окружение, файл, config/tokens.py
+AUTH_TOKEN_ENV = "CHITAI_GOROD_TOKEN"
+AUTH_TOKEN_FILE = ".auth_token"  # одна строка: "Bearer eyJ..." или просто "eyJ..."
+AUTH_TOKEN_CACHE = ".workers/auth_token.json"  # выбранный токен прогона, общий для процессов --workers
+AUTH_RUN_ENV = "AUTH_TOKEN_RUN"
+AUTH_TOKEN_MIN_VALIDITY = 300  # сек запаса сверх ожидаемой длительности прогона
+AUTH_TOKEN_RUN_MARGIN = 1.5  # ожидаемая длительность прогона x1.5
+
+# Снимок каталога (api/crawler.py)
+CATALOGUE_DB = ".catalogue.sqlite3"
+CRAWL_PHRASES = ["Лев Толстой", "роман", "книга", "детектив", "фантастика"]  # фразы для обхода выдачи
+CRAWL_PER_PAGE = 100
+
+# Cookie с токеном на сайте (значение вида "Bearer%20eyJ...")
+AUTH_COOKIE_NAME = "access-token"
+AUTH_COOKIE_DOMAIN = ".chitai-gorod.ru"
+
+# Браузер для UI тестов
+IMPLICIT_WAIT = 3
+DRIVER_POOL_SIZE = 1  # браузеров на процесс pytest
+WAIT_QUIET_MS = 300  # страница "успокоилась": столько мс без запросов к сайту
+WAIT_DOM_QUIET_MS = 300  # ... и без изменений структуры и текста DOM (None - DOM не ждём)
+WAIT_TRACKED_DOMAINS = ["chitai-gorod.ru"]  # запросы к ним (и поддоменам) ждём, к остальным - нет
+WAIT_POLL = 0.1  # частота опроса состояния страницы, сек
+
+# Облегчённый браузер (--browser-profile=lean)
+LEAN_BLOCKED_TYPES = ["Image", "Font", "Media"]
+LEAN_BLOCKED_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "mc.yandex.ru", "an.yandex.ru", "yandex.ru/ads", "top-fwz1.mail.ru",
+    "vk.com", "mindbox.ru", "criteo.com", "flocktory.com",
+]
+LEAN_ALLOWED_DOMAINS = ["chitai-gorod.ru"]
+# Типичный размер ресурса для оценки сэкономленного трафика, байт
+LEAN_TYPICAL_BYTES = {"Image": 40_000, "Font": 60_000, "Media": 500_000,
+                      "Stylesheet": 30_000, "Script": 80_000, "Other": 10_000}
+
+# Параллельный запуск (--workers)
+WORKERS_DIR = ".workers"  # профили браузеров, загрузки и логи процессов
+DURATIONS_FILE = ".test_durations.json"  # история длительностей для разбиения на шарды
+DEFAULT_TEST_DURATION = 1.0  # сек, для тестов без истории
+
+# Запасные селекторы: какой сработал на какой странице, только для диагностики (pages/locators.py)
+LOCATOR_REPORT_FILE = ".locator_report.json"
+
+# Трассировка шагов (--trace-steps), Chrome trace events
+TRACE_FILE = "traces/trace.json"
+
+# Производительность страниц (--perf-budget)
+PERF_BUDGET_FILE = "config/perf_budget.json"  # версионируемые бюджеты по типам страниц
+PERF_RESULTS_FILE = "perf/web_vitals.json"
+# Тип страницы -> регулярное выражение для пути URL (первое совпадение)
+PAGE_TYPES = {
+    "cart": r"^/cart",
+    "product": r"^/product/",
+    "search": r"^/search",
+    "home": r"^/?$",
+}
+
 # Тестовые данные
 TEST_DATA = {
     "SEARCH_PHRASES": ["Лев Толстой", "роман", "книга", "детектив", "фантастика"],
@@ -2,11 +2,16 @@ import pytest
 import logging
 import sys
 import os
+import json
 import time
 
 # Добавляем путь
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Параллельный запуск: pytest --workers N; трассировка шагов: pytest --trace-steps;
+# бюджеты производительности страниц: pytest --perf-budget=warn|fail
+pytest_plugins = ["support.parallel", "support.tracing", "support.web_vitals"]
+
 # Глобальная настройка логирования - МИНИМАЛЬНАЯ
 logging.basicConfig(
     level=logging.WARNING,  # По умолчанию только WARNING и ERROR
@@ -27,6 +32,7 @@ except ImportError:
 # Импортируем API клиент
 try:
     from api.base_client import ChitaiGorodAPIClient
+    from api.transport import Transport
 except ImportError:
     class ChitaiGorodAPIClient:
         def __init__(self, use_auth=True):
@@ -39,56 +45,258 @@ except ImportError:
             return {"ok": False, "error": "API client not loaded"}
 
 
+# ========== ОПЦИИ КОМАНДНОЙ СТРОКИ ==========
+def pytest_addoption(parser):
+    """Дополнительные опции запуска"""
+    parser.addoption(
+        "--api-cache",
+        choices=["none", "memory", "disk"],
+        default="none",
+        help="Кэш ответов API: none (по умолчанию), memory (на сессию), disk (между сессиями)",
+    )
+    parser.addoption(
+        "--cassette-mode",
+        choices=["none", "record", "replay"],
+        default="none",
+        help="Кассеты API: record - записать ответы, replay - прогон без сети",
+    )
+    parser.addoption(
+        "--api-latency",
+        choices=["none", "record", "compare"],
+        default="none",
+        help="История задержек API: none - не записывать (по умолчанию), record - записывать и "
+             "предупреждать о регрессиях, compare - регрессия роняет прогон",
+    )
+    parser.addoption(
+        "--api-rate-limit",
+        choices=["auto", "shared", "process", "off"],
+        default="auto",
+        help="Лимит частоты запросов API (settings.RATE_LIMITS): auto - process в обычном запуске, "
+             "shared с --workers (по умолчанию); shared - общий для процессов (файл под блокировкой), "
+             "process - в пределах процесса, off - без лимита",
+    )
+    parser.addoption(
+        "--token-check",
+        choices=["fail", "warn", "off"],
+        default="fail",
+        help="Срок токена до первого теста: fail - не начинать прогон, если токен истечёт посреди него "
+             "(по умолчанию), warn - только предупредить, off - не проверять",
+    )
+    parser.addoption(
+        "--driver-mode",
+        choices=["pool", "fresh"],
+        default="pool",
+        help="Браузер для UI тестов: pool - переиспользовать (по умолчанию), fresh - новый на каждый тест",
+    )
+    parser.addoption(
+        "--browser-profile",
+        choices=["full", "lean"],
+        default="full",
+        help="full - обычный Chrome, lean - headless без картинок, шрифтов и трекеров",
+    )
+
+
 # ========== ФИКСТУРЫ ==========
+@pytest.fixture(scope="session")
+def lean_profile(request):
+    """Настройки облегчённого браузера или None (см. --browser-profile)"""
+    if request.config.getoption("--browser-profile") != "lean":
+        return None
+
+    from support.lean_browser import LeanProfile
+
+    return LeanProfile()
+
+
+@pytest.fixture(scope="session")
+def driver_pool(lean_profile):
+    """Пул браузеров на всю сессию (см. --driver-mode)"""
+    from support.driver_pool import DriverPool, create_driver
+
+    pool = DriverPool(factory=lean_profile.create_driver if lean_profile else create_driver)
+    yield pool
+    pool.close()
+
+
+def _report_traffic(request, driver):
+    """Трафик теста в облегчённом режиме: в вывод, в allure и в user_properties"""
+    from support.lean_browser import traffic_report
+
+    report = traffic_report(driver)
+    request.node.user_properties.append(("traffic", report))
+    print(f"\n   📉 Трафик: {report['transferred_bytes'] / 1024:.0f} КБ, "
+          f"заблокировано {sum(report['blocked_requests'].values())} запросов, "
+          f"сэкономлено ~{report['estimated_saved_bytes'] / 1024:.0f} КБ")
+    try:
+        import allure
+        allure.attach(json.dumps(report, ensure_ascii=False, indent=2), name="Трафик теста",
+                      attachment_type=allure.attachment_type.JSON)
+    except ImportError:
+        pass
+
+
 @pytest.fixture(scope="function")
-def driver():
-    """WebDriver для UI тестов - БЕЗ ЛОГОВ И БЕЗ ОШИБОК CHROME"""
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-
-    options = Options()
-    options.add_argument("--start-maximized")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_experimental_option('excludeSwitches', ['enable-logging'])  # Убирает DevTools лог
-    options.add_argument('--log-level=3')  # Уровень логов: 0=INFO, 1=WARNING, 2=ERROR, 3=FATAL
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-
-    # Убираем лишние сообщения в консоль
-    options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
-    options.add_experimental_option('useAutomationExtension', False)
-
-    driver = webdriver.Chrome(options=options)
-    driver.implicitly_wait(3)
+def driver(request, lean_profile):
+    """WebDriver для UI тестов - из пула, между тестами только сброс состояния"""
+    from support.tracing import instrument_driver
+
+    if request.config.getoption("--driver-mode") == "fresh":
+        from support.driver_pool import create_driver
+
+        driver = instrument_driver(lean_profile.create_driver() if lean_profile else create_driver())
+        yield driver
+        if lean_profile:
+            _report_traffic(request, driver)
+        driver.quit()
+        return
+
+    pool = request.getfixturevalue("driver_pool")
+    driver = instrument_driver(pool.acquire())
+    if lean_profile:
+        driver.get_log("performance")  # трафик прошлых тестов и сброса не считаем
+    yield driver
+    if lean_profile:
+        _report_traffic(request, driver)
+    pool.release(driver)
 
+
+@pytest.fixture(scope="function")
+def auth_driver(driver):
+    """WebDriver, уже авторизованный на сайте (токен прогона в cookie, см. api/auth.py)"""
+    from api.auth import token_manager
+    from support.seeding import inject_auth_cookie
+
+    if not token_manager.token():
+        pytest.skip("Нет токена (окружение, .auth_token или config/tokens.py)")
+    inject_auth_cookie(driver)
     yield driver
 
-    driver.quit()
+
+@pytest.fixture(scope="function")
+def seeded_cart(auth_driver, api_client):
+    """Фабрика: seeded_cart(product_id=None, phrase=...) - товар в корзине через API, открыта /cart/
+
+    Без product_id берётся первая доступная книга по phrase. Возвращает CartPage.
+    После теста корзина очищается через API.
+    """
+    from config import settings
+    from pages.cart_page import CartPage
+    from support.seeding import find_product_id, seed_cart
+
+    def factory(product_id=None, phrase="Лев Толстой Война и мир"):
+        if product_id is None:
+            product_id = find_product_id(api_client, phrase)
+        seed_cart(api_client, [product_id])
+
+        auth_driver.get(f"{settings.BASE_URL}/cart/")
+        cart_page = CartPage(auth_driver)
+        cart_page.wait_for_page_load()
+        return cart_page
+
+    yield factory
+    api_client.clear_cart()
+
+
+@pytest.fixture(scope="session")
+def api_cache(request):
+    """Общий на сессию кэш ответов API (см. --api-cache)"""
+    mode = request.config.getoption("--api-cache")
+    if mode == "none":
+        yield None
+        return
+
+    from api.cache import ResponseCache, MemoryCacheBackend, DiskCacheBackend
+
+    backend = DiskCacheBackend() if mode == "disk" else MemoryCacheBackend()
+    cache = ResponseCache(backend=backend)
+    request.config.api_cache = cache
+    yield cache
+
+    if mode == "disk":
+        backend.close()
+
+
+@pytest.fixture(scope="session")
+def api_latency(request):
+    """Запись задержек и размеров ответов API в историю (см. --api-latency)"""
+    if request.config.getoption("--api-latency") == "none":
+        yield None
+        return
+
+    from api.latency import LatencyStore
+    from config import settings
+
+    store = LatencyStore(run_id=os.environ.get(settings.LATENCY_RUN_ENV))
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="session")
+def api_rate_limiter(request):
+    """Token bucket на запросы API всей сессии (см. --api-rate-limit)"""
+    mode = request.config.getoption("--api-rate-limit")
+    if mode == "off":
+        return None
+
+    from api.rate_limit import FileBackend, MemoryBackend, RateLimiter
+    from support.parallel import worker_count, worker_id
+
+    if mode == "auto":
+        # Процессы-исполнители запускаются без --workers, но лимит делят
+        parallel = worker_id() is not None or worker_count(request.config.getoption("--workers")) > 1
+        mode = "shared" if parallel else "process"
+    limiter = RateLimiter(backend=FileBackend() if mode == "shared" else MemoryBackend())
+    request.config.api_rate_limiter = limiter
+    return limiter
 
 
 @pytest.fixture(scope="function")
-def api_client():
+def api_cassette(request):
+    """Кассета текущего теста (см. --cassette-mode)"""
+    mode = request.config.getoption("--cassette-mode")
+    if mode == "none":
+        yield None
+        return
+
+    from api.cassette import Cassette, cassette_path
+
+    cassette = Cassette(cassette_path(request.node.nodeid), mode=mode)
+    yield cassette
+    cassette.save()
+
+
+@pytest.fixture(scope="function")
+def api_client(api_cache, api_cassette, api_latency, api_rate_limiter):
     """API клиент С авторизацией - БЕЗ ЛОГОВ"""
     try:
-        client = ChitaiGorodAPIClient(use_auth=True)
+        client = ChitaiGorodAPIClient(use_auth=True, cache=api_cache, cassette=api_cassette,
+                                      latency=api_latency, transport=Transport(rate_limiter=api_rate_limiter))
     except:
         client = ChitaiGorodAPIClient()
     yield client
 
 
 @pytest.fixture(scope="function")
-def api_client_no_auth():
+def api_client_no_auth(api_cache, api_cassette, api_latency, api_rate_limiter):
     """API клиент БЕЗ авторизации - БЕЗ ЛОГОВ"""
     try:
-        client = ChitaiGorodAPIClient(use_auth=False)
+        client = ChitaiGorodAPIClient(use_auth=False, cache=api_cache, cassette=api_cassette,
+                                      latency=api_latency, transport=Transport(rate_limiter=api_rate_limiter))
     except:
         client = ChitaiGorodAPIClient()
     yield client
 
 
+@pytest.fixture(scope="function")
+def mock_api_server():
+    """Локальный эмулятор web-agr для оффлайн API тестов (каталог из 30 товаров)"""
+    from api.mock_server import MockApiServer
+
+    server = MockApiServer(catalogue_size=30).start()
+    yield server
+    server.stop()
+
+
 # ========== ХУКИ ДЛЯ РАЗНЫХ ТЕСТОВ ==========
 def pytest_runtest_setup(item):
     """Настройка перед каждым тестом"""
@@ -108,6 +316,82 @@ def pytest_runtest_setup(item):
             logging.getLogger(logger_name).setLevel(logging.WARNING)
 
 
+def pytest_configure(config):
+    """Один run_id истории задержек API и один токен на весь прогон процессов --workers"""
+    from api.latency import new_run_id
+    from config import settings
+    from support.parallel import worker_count
+
+    config.addinivalue_line("markers", "auth: тест вызывает PROTECTED_API_ENDPOINTS - нужен живой токен")
+    if config.getoption("--api-latency") != "none":
+        os.environ.setdefault(settings.LATENCY_RUN_ENV, new_run_id())
+    # Общий кэш токена нужен только процессам --workers (они наследуют переменную)
+    if worker_count(config.getoption("--workers")) > 1:
+        os.environ.setdefault(settings.AUTH_RUN_ENV, new_run_id())
+
+
+# Тесты с этими фикстурами (или с меткой auth) ходят с токеном - только для них важен его срок
+AUTH_FIXTURES = {"auth_driver", "seeded_cart"}
+
+
+def _needs_token(item):
+    return bool(AUTH_FIXTURES & set(item.fixturenames)) or item.get_closest_marker("auth") is not None
+
+
+def pytest_collection_finish(session):
+    """Токен проверяется до первого теста: истечёт посреди прогона - прогон не начинаем"""
+    mode = session.config.getoption("--token-check")
+    from support.parallel import estimate_duration, worker_id
+
+    # Процессы --workers берут токен, уже проверенный главным процессом; replay сеть не трогает
+    if mode == "off" or worker_id() is not None or session.config.option.collectonly \
+            or session.config.getoption("--cassette-mode") == "replay":
+        return
+    nodeids = [item.nodeid for item in session.items if _needs_token(item)]
+    if not nodeids:
+        return
+
+    from api.auth import TokenError, describe, token_manager
+    from config import settings
+
+    expected = estimate_duration(nodeids, session.config.getoption("--workers"))
+    min_valid_for = expected * settings.AUTH_TOKEN_RUN_MARGIN + settings.AUTH_TOKEN_MIN_VALIDITY
+    try:
+        entry = token_manager.check(min_valid_for, refresh=True)
+    except TokenError as e:
+        if mode == "fail":
+            pytest.exit(f"🔑 {e}", returncode=pytest.ExitCode.USAGE_ERROR)
+        print(f"\n   ⚠️ 🔑 {e}")
+        return
+    print(f"\n   🔑 Токен: {describe(entry)}")
+
+
+def _check_latency(session):
+    """Регрессии задержек API этого прогона против истории прошлых -> строки для итогов
+
+    С --api-latency=compare регрессия меняет код выхода - до вывода итогов.
+    """
+    mode = session.config.getoption("--api-latency")
+    from config import settings
+    from support.parallel import worker_id
+
+    # В процессах --workers не сравниваем: прогон целиком виден только главному
+    if mode == "none" or worker_id() is not None or not os.path.exists(settings.LATENCY_DB):
+        return []
+
+    from api.latency import LatencyStore, format_regressions
+
+    store = LatencyStore(run_id=os.environ.get(settings.LATENCY_RUN_ENV))
+    regressions = store.compare(store.run_id)
+    store.close()
+    if not regressions:
+        return []
+    if mode == "compare":
+        session.exitstatus = 1
+    return [f"   🐢 Регрессии задержек API ({len(regressions)}):"] + \
+        [f"      {line}" for line in format_regressions(regressions).splitlines()]
+
+
 def pytest_sessionstart(session):
     """Вывод в начале тестовой сессии"""
     session.config.start_time = time.time()
@@ -128,6 +412,10 @@ def pytest_runtest_logstart(nodeid, location):
 
 def pytest_sessionfinish(session, exitstatus):
     """Вывод в конце тестовой сессии"""
+    # Сравнение задержек может уронить прогон - до баннера, чтобы он не противоречил коду выхода
+    latency_report = _check_latency(session)
+    exitstatus = session.exitstatus
+
     print("\n" + "=" * 70)
 
     if exitstatus == 0:
@@ -147,6 +435,25 @@ def pytest_sessionfinish(session, exitstatus):
     print(f"   ⏭️  Пропущено: {skipped}")
     print(f"   📊 Всего тестов: {passed + failed + skipped}")
 
+    # Кэш API
+    cache = getattr(session.config, 'api_cache', None)
+    if cache is not None:
+        cache_stats = cache.stats
+        print(f"   💾 Кэш API: {cache_stats.hits} попаданий, {cache_stats.misses} промахов "
+              f"({cache_stats.hit_rate:.0%})")
+
+    # Ожидание лимита частоты API
+    limiter = getattr(session.config, 'api_rate_limiter', None)
+    if limiter is not None:
+        total = limiter.summary()["total"]
+        if total["delayed"]:
+            print(f"   ⏳ Лимит API: ждали {total['delayed']} из {total['requests']} запросов, "
+                  f"всего {total['wait_total_s']:.2f} сек (p99 {total['wait']['p99_ms']:.0f} мс)")
+
+    # История задержек API
+    for line in latency_report:
+        print(line)
+
     # Время выполнения
     if hasattr(session.config, 'start_time'):
         duration = time.time() - session.config.start_time
@@ -1,8 +1,13 @@
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, JavascriptException
+from config import settings
+from support.tracing import tracer, instrument_class
+from support.web_vitals import collector as vitals
+from .checks import CHECK_SCRIPT, script_locator, to_script
+from .locators import first_located, locator_report
+from .waits import page_settled
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -10,31 +15,43 @@ logger = logging.getLogger(__name__)
 class BasePage:
     """Базовый класс с вашими методами - ИСПРАВЛЕННЫЙ"""
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Методы page object попадают в трассировку (--trace-steps)
+        instrument_class(cls)
+
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, 5)
 
+    def wait_for_settled(self, timeout=2, quiet_ms=settings.WAIT_QUIET_MS, dom_quiet_ms=settings.WAIT_DOM_QUIET_MS):
+        """Ожидание по событиям: readyState, гидрация Nuxt, тишина сети и DOM
+
+        Возвращается, как только страница успокоилась; timeout - верхняя граница.
+        """
+        condition = page_settled(quiet_ms, dom_quiet_ms)
+        try:
+            # JavascriptException - скрипт попал на смену документа при навигации
+            WebDriverWait(self.driver, timeout, poll_frequency=settings.WAIT_POLL,
+                          ignored_exceptions=(JavascriptException,)).until(condition)
+            return True
+        except TimeoutException:
+            logger.info(f"ℹ️ Страница не успокоилась за {timeout} сек: {condition.last_state}")
+            return False
+
     def wait_for_page_load(self, timeout=10):
-        """Ожидание загрузки страницы (ваш метод) С ДОПОЛНИТЕЛЬНЫМ ОЖИДАНИЕМ"""
+        """Ожидание загрузки страницы - до гидрации и затихания сети/DOM, не дольше timeout"""
         logger.info("⏳ Ожидание загрузки страницы...")
-        try:
-            # 1. Ждем readyState = complete
-            self.wait.until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+        if self.wait_for_settled(timeout=timeout):
             logger.info("✅ Страница загружена")
-
-            # 2. ДОБАВЛЯЕМ: Ждем минимум 1 секунду (как в вашем рабочем коде)
-            start = time.time()
-            WebDriverWait(self.driver, 2).until(lambda d: time.time() - start >= 1)
-
-        except TimeoutException:
+        else:
             logger.warning("⚠️ Страница не полностью загружена, продолжаем...")
+        # Замер Navigation/Resource Timing, LCP и CLS (--perf-budget)
+        vitals.collect(self.driver)
 
     def wait_one_second(self):
-        """Ожидание 1 секунды без time.sleep"""
-        start = time.time()
-        WebDriverWait(self.driver, 2).until(lambda d: time.time() - start >= 1)
+        """Оставлен для совместимости: ждёт успокоения страницы, но не дольше секунды"""
+        self.wait_for_settled(timeout=1)
         return True
 
     def safe_click(self, locator, description=""):
@@ -42,30 +59,92 @@ class BasePage:
         logger.info(f"🖱️ Попытка клика: {description}")
 
         for attempt in range(3):
-            try:
-                element = self.wait.until(EC.element_to_be_clickable(locator))
-                element.click()
-                logger.info(f"✅ Успешный клик: {description}")
-
-                # ДОБАВЛЯЕМ: Ожидание 1 секунду после клика (как в рабочем коде)
-                self.wait_one_second()
+            with tracer.span(f"safe_click: попытка {attempt + 1}", "retry", target=description):
+                try:
+                    with tracer.span("ожидание кликабельности", "wait"):
+                        element = self.wait.until(EC.element_to_be_clickable(locator))
+                    element.click()
+                    logger.info(f"✅ Успешный клик: {description}")
+
+                    # Ждём реакцию страницы на клик (запросы, перерисовка)
+                    self.wait_for_settled()
+
+                    return element
+
+                except StaleElementReferenceException:
+                    logger.warning(f"🔄 Попытка {attempt + 1}: элемент устарел")
+                    # DOM перерисовывается - ждём, пока затихнет
+                    self.wait_for_settled()
+
+                except TimeoutException:
+                    logger.error(f"❌ Элемент не найден: {description}")
+                    if attempt == 2:
+                        raise
+                    # Ожидание при повторной попытке
+                    self.wait_for_settled()
 
-                return element
+        raise TimeoutException(f"Не удалось кликнуть: {description}")
 
-            except StaleElementReferenceException:
-                logger.warning(f"🔄 Попытка {attempt + 1}: элемент устарел")
-                # Ожидание при повторной попытке
-                self.wait_one_second()
+    def find_first(self, name, candidates, timeout=5, clickable=True):
+        """Первый найденный из запасных селекторов -> (локатор, элемент)
+
+        Все кандидаты проверяются одним execute_script за опрос, строго в
+        порядке candidates; сработавший селектор записывается в отчёт под
+        именем "<Страница>.<name>". timeout - общий на всех кандидатов.
+        """
+        key = f"{type(self).__name__}.{name}"
+        condition = first_located(candidates, clickable=clickable)
+        locator, element = WebDriverWait(self.driver, timeout, poll_frequency=settings.WAIT_POLL,
+                                         ignored_exceptions=(JavascriptException,)).until(condition)
+        if locator != candidates[0]:
+            logger.warning(f"⚠️ {key}: сработал запасной селектор {locator[1]}")
+        locator_report.remember(key, locator)
+        return locator, element
+
+    def click_first(self, name, candidates, description=""):
+        """safe_click по первому найденному из запасных селекторов -> (локатор, элемент)"""
+        logger.info(f"🖱️ Попытка клика: {description}")
 
-            except TimeoutException:
-                logger.error(f"❌ Элемент не найден: {description}")
-                if attempt == 2:
+        for attempt in range(3):
+            with tracer.span(f"click_first: попытка {attempt + 1}", "retry", target=description):
+                try:
+                    with tracer.span("поиск селектора", "wait"):
+                        locator, element = self.find_first(name, candidates)
+                    element.click()
+                    logger.info(f"✅ Успешный клик: {description} ({locator[1]})")
+                    self.wait_for_settled()
+                    return locator, element
+
+                except StaleElementReferenceException:
+                    logger.warning(f"🔄 Попытка {attempt + 1}: элемент устарел")
+                    self.wait_for_settled()
+
+                except TimeoutException:
+                    # Таймаут уже общий на всех кандидатов - повторять нечего
+                    logger.error(f"❌ Элемент не найден: {description}")
                     raise
-                # Ожидание при повторной попытке
-                self.wait_one_second()
 
         raise TimeoutException(f"Не удалось кликнуть: {description}")
 
+    def check(self, *checks, within=None):
+        """Проверки из pages.checks одним execute_script -> [{"ok", ...}] в том же порядке
+
+        within - локатор контейнера (все совпадения): текст и элементы ищутся только в нём.
+        Контейнер не найден - все проверки с ok=False.
+        """
+        scope = script_locator(within) if within is not None else None
+        results = self.driver.execute_script(CHECK_SCRIPT, [to_script(c) for c in checks], scope)
+        if results is None:
+            return [{"ok": False, "error": f"Контейнер не найден: {within[1]}"} for _ in checks]
+        return results
+
+    def assert_in_page(self, *checks, within=None):
+        """check() и AssertionError с сообщениями всех непрошедших проверок"""
+        results = self.check(*checks, within=within)
+        failed = [f"{c['message']} ({r})" for c, r in zip(checks, results) if not r["ok"]]
+        assert not failed, "\n".join(failed)
+        return results
+
     def safe_find_element(self, by, selector, description=""):
         """Безопасный поиск элемента"""
         logger.info(f"🔍 Поиск элемента: {description}")
@@ -77,4 +156,7 @@ class BasePage:
             return element
         except TimeoutException:
             logger.error(f"❌ Элемент не найден: {description}")
-            raise
\ No newline at end of file
+            raise
+
+
+instrument_class(BasePage)
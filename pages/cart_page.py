@@ -4,7 +4,6 @@ from selenium.webdriver.support import expected_conditions as EC
 from .base_page import BasePage  # <-- ТОЧКА перед base_page!
 import allure
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +14,7 @@ class CartPage(BasePage):
     # Локаторы
     PLUS_BUTTON = (By.CSS_SELECTOR, ".chg-ui-input-number__input-control--increment")
     MINUS_BUTTON = (By.CSS_SELECTOR, ".chg-ui-input-number__input-control--decrement")
+    QUANTITY_INPUT = (By.CSS_SELECTOR, "input[type='number'], [class*='quantity'] input, [class*='input-number'] input")
     CLEAR_BUTTON = (By.CSS_SELECTOR, "#__nuxt > div > div.app-wrapper__content > div.app-wrapper__container > div > div > div > div.cart-page__head > div > div.cart-page__delete-many > span")
 
     def increase_quantity(self):
@@ -36,9 +36,8 @@ class CartPage(BasePage):
             plus_button.click()
             logger.info("✅ Количество увеличено на +1")
 
-            # 4. Ждем обновления - ВАЖНО!
-            start = time.time()
-            WebDriverWait(self.driver, 2).until(lambda d: time.time() - start >= 1)
+            # 4. Ждем обновления корзины (запрос и перерисовка) - ВАЖНО!
+            self.wait_for_settled()
 
             return True
         except Exception as e:
@@ -64,6 +63,9 @@ class CartPage(BasePage):
             minus_button.click()
             logger.info("✅ Количество уменьшено на -1")
 
+            # Ждем обновления корзины
+            self.wait_for_settled()
+
             return True
         except Exception as e:
             logger.warning(f"⚠️ Не удалось уменьшить количество: {e}")
@@ -73,45 +75,33 @@ class CartPage(BasePage):
         """Очистка корзины - ТОЧНО как в рабочем коде"""
         logger.info("🗑️ Очистка корзины")
 
-        try:
+        clear_selectors = [
             # ТОЧНЫЙ СЕЛЕКТОР из рабочего кода
-            clear_selector = "#__nuxt > div > div.app-wrapper__content > div.app-wrapper__container > div > div > div > div.cart-page__head > div > div.cart-page__delete-many > span"
+            self.CLEAR_BUTTON,
+            (By.CSS_SELECTOR, ".cart-page__delete-many span"),
+            # Альтернативный поиск (как в рабочем коде) - только элемент с самим текстом
+            (By.XPATH, "//*[contains(text(), 'Очистить корзину')]"),
+        ]
 
-            # Используем safe_click
-            self.safe_click(
-                (By.CSS_SELECTOR, clear_selector),
-                description="Кнопка 'Очистить корзину'"
-            )
-            logger.info("✅ Корзина очищена")
-
-            # Проверяем что корзина пуста
-            try:
-                WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((
-                        By.XPATH,
-                        "//*[contains(., 'корзина пуста') or contains(., 'Корзина пуста')]"
-                    ))
-                )
-                logger.info("✅ Подтверждение: корзина пуста")
-            except:
-                logger.info("ℹ️ Подтверждение очистки не найдено")
-
-            return True
+        try:
+            # Селекторы проверяются по порядку, сработавший попадает в отчёт
+            self.click_first("clear_button", clear_selectors, description="Кнопка 'Очистить корзину'")
         except Exception as e:
             logger.warning(f"⚠️ Не удалось очистить корзину: {e}")
+            return False
 
-            # Альтернативный поиск (как в рабочем коде)
-            try:
-                clear_elements = self.driver.find_elements(
-                    By.XPATH,
-                    "//*[contains(., 'Очистить корзину')]"
-                )
+        logger.info("✅ Корзина очищена")
 
-                if clear_elements:
-                    clear_elements[0].click()
-                    logger.info("✅ Корзина очищена (альтернативный поиск)")
-                    return True
-            except:
-                logger.info("ℹ️ Кнопка очистки не найдена")
+        # Проверяем что корзина пуста
+        try:
+            WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((
+                    By.XPATH,
+                    "//*[contains(., 'корзина пуста') or contains(., 'Корзина пуста')]"
+                ))
+            )
+            logger.info("✅ Подтверждение: корзина пуста")
+        except:
+            logger.info("ℹ️ Подтверждение очистки не найдено")
 
-            return False
\ No newline at end of file
+        return True
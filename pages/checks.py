@@ -0,0 +1,109 @@
+"""
+Проверки содержимого страницы внутри браузера вместо driver.page_source
+
+    from pages import checks
+
+    page.assert_in_page(
+        checks.text("Толстой", message="❌ Поиск не нашёл Толстого"),
+        checks.count(SearchPage.SEARCH_RESULTS),
+    )
+    page.check(checks.attribute((By.CSS_SELECTOR, "input[type='number']"), "value"))
+    page.check(checks.text("оформить", "в корзине"), within=(By.TAG_NAME, "button"))
+
+Все проверки выполняются одним execute_script, из браузера возвращается
+только маленький результат. Текст ищется в textContent (как в page_source,
+туда попадает и текст скриптов). XPath внутри within пишется от текущего
+узла: ".//button", а не "//button".
+"""
+from selenium.webdriver.common.by import By
+
+# arguments[0] - проверки, arguments[1] - [by, value] контейнера или null
+CHECK_SCRIPT = """
+var checks = arguments[0], scope = arguments[1];
+
+var find = function (root, locator) {
+    if (locator[0] === 'xpath') {
+        var snapshot = document.evaluate(locator[1], root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+        return nodes;
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(locator[1]));
+};
+
+var roots = scope ? find(document, scope) : [document.documentElement];
+if (!roots.length) { return null; }
+
+var all = function (locator) {
+    var found = [];
+    roots.forEach(function (root) { found = found.concat(find(root, locator)); });
+    return found;
+};
+
+var value = function (el, name) {
+    var v = el[name];  // как WebElement.get_attribute: сначала свойство, потом атрибут
+    if (v === undefined || v === null || typeof v === 'object' || typeof v === 'function') {
+        v = el.getAttribute(name);
+    }
+    return v === null ? null : String(v);
+};
+
+var text = null;
+return checks.map(function (c) {
+    if (c.kind === 'text') {
+        if (text === null) {
+            text = roots.map(function (root) { return root.textContent; }).join('\\n');
+        }
+        var haystack = c.case ? text : text.toLowerCase();
+        var matched = c.needles.filter(function (n) {
+            return haystack.indexOf(c.case ? n : n.toLowerCase()) >= 0;
+        });
+        return {ok: c.all ? matched.length === c.needles.length : matched.length > 0, matched: matched};
+    }
+    if (c.kind === 'count') {
+        var n = all(c.locator).length;
+        return {ok: n >= c.min && (c.max === null || n <= c.max), count: n};
+    }
+    var values = all(c.locator).map(function (el) { return value(el, c.name); });
+    var ok = values.some(function (v) {
+        return v !== null && (c.equals === null || v === c.equals)
+            && (c.contains === null || v.indexOf(c.contains) >= 0);
+    });
+    return {ok: ok, count: values.length, values: values.slice(0, 5)};
+});
+"""
+
+_SCRIPT_BY = {By.CSS_SELECTOR: "css", By.XPATH: "xpath", By.TAG_NAME: "css"}
+
+
+def script_locator(locator):
+    by, value = locator
+    if by not in _SCRIPT_BY:
+        raise ValueError(f"Поддерживаются только CSS, XPath и имя тега: {by}")
+    return [_SCRIPT_BY[by], value]
+
+
+def text(*needles, all=False, case=False, message=None):
+    """Текст найден: хотя бы одна из подстрок (all=True - все), без учёта регистра"""
+    return {"kind": "text", "needles": list(needles), "all": all, "case": case,
+            "message": message or f"Нет текста: {' / '.join(needles)}"}
+
+
+def count(locator, min=1, max=None, message=None):
+    """Число элементов по локатору в пределах [min, max]"""
+    return {"kind": "count", "locator": locator, "min": min, "max": max,
+            "message": message or f"Элементов {locator[1]} не в пределах [{min}, {max}]"}
+
+
+def attribute(locator, name, equals=None, contains=None, message=None):
+    """Хотя бы у одного элемента атрибут name есть (равен equals / содержит contains)"""
+    return {"kind": "attribute", "locator": locator, "name": name, "equals": equals, "contains": contains,
+            "message": message or f"Нет {locator[1]} с {name}={equals or contains or '*'}"}
+
+
+def to_script(check):
+    """Проверка в виде аргумента CHECK_SCRIPT"""
+    arg = {key: value for key, value in check.items() if key != "message"}
+    if "locator" in arg:
+        arg["locator"] = script_locator(arg["locator"])
+    return arg
@@ -0,0 +1,111 @@
+"""
+Поиск по нескольким запасным селекторам за один вызов execute_script
+
+Все кандидаты (CSS и XPath) проверяются в браузере за один проход, так что
+промах одного селектора больше не стоит отдельного таймаута. Кандидаты
+всегда проверяются в объявленном порядке приоритета. Какой селектор
+сработал на странице, записывается в settings.LOCATOR_REPORT_FILE - только
+для диагностики: видно, где основной селектор перестал находить элемент.
+"""
+import json
+import os
+import threading
+
+from selenium.webdriver.common.by import By
+
+from config import settings
+
+# arguments[0] - [[by, value], ...], arguments[1] - нужна ли кликабельность
+# Возвращает [индекс кандидата, элемент] первого подходящего или null
+RESOLVE_SCRIPT = """
+var candidates = arguments[0], clickable = arguments[1];
+
+var usable = function (el) {
+    if (!clickable) { return true; }
+    if (el.disabled || !el.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+};
+
+for (var i = 0; i < candidates.length; i++) {
+    var by = candidates[i][0], value = candidates[i][1], found = [];
+    try {
+        if (by === 'xpath') {
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (var j = 0; j < snapshot.snapshotLength; j++) { found.push(snapshot.snapshotItem(j)); }
+        } else {
+            found = document.querySelectorAll(value);
+        }
+    } catch (e) {
+        continue;  // невалидный селектор не мешает остальным
+    }
+    for (var k = 0; k < found.length; k++) {
+        if (usable(found[k])) { return [i, found[k]]; }
+    }
+}
+return null;
+"""
+
+_SCRIPT_BY = {By.CSS_SELECTOR: "css", By.XPATH: "xpath"}
+
+
+def _selector_key(locator):
+    by, value = locator
+    return f"{by}={value}"
+
+
+class LocatorReport:
+    """Какой селектор сработал на какой странице: {"SearchPage.first_book": "xpath=..."}
+
+    На порядок поиска не влияет. Файл перечитывается перед записью, поэтому
+    процессы --workers не затирают записи друг друга.
+    """
+
+    def __init__(self, path=settings.LOCATOR_REPORT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._winners = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def winner(self, key):
+        """Селектор, сработавший последним, или None"""
+        return self._winners.get(key)
+
+    def remember(self, key, locator):
+        selector = _selector_key(locator)
+        with self._lock:
+            if self._winners.get(key) == selector:
+                return
+            self._winners = {**self._load(), key: selector}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._winners, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class first_located:
+    """Условие для WebDriverWait: первый найденный кандидат -> (локатор, элемент)"""
+
+    def __init__(self, candidates, clickable=True):
+        unsupported = [by for by, _ in candidates if by not in _SCRIPT_BY]
+        if unsupported:
+            raise ValueError(f"Поддерживаются только CSS и XPath: {unsupported}")
+        self.candidates = list(candidates)
+        self.clickable = clickable
+        self._arg = [[_SCRIPT_BY[by], value] for by, value in self.candidates]
+
+    def __call__(self, driver):
+        found = driver.execute_script(RESOLVE_SCRIPT, self._arg, self.clickable)
+        if not found:
+            return False
+        index, element = found
+        return self.candidates[index], element
+
+
+locator_report = LocatorReport()
@@ -4,6 +4,7 @@ Page Object для страницы товара
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from .base_page import BasePage  # <-- ТОЧКА!
 import allure
 import logging
@@ -31,34 +32,29 @@ class ProductPage(BasePage):
             (By.XPATH, "//button[contains(., 'В корзину')]"),
         ]
 
-        for selector_type, selector_value in button_selectors:
-            try:
-                button = self.safe_click(
-                    (selector_type, selector_value),
-                    description=f"Кнопка по селектору {selector_value}"
-                )
-
-                button_text = button.text.lower()
-                logger.info(f"✅ Нажата кнопка: {button_text}")
+        try:
+            # Селекторы проверяются по порядку, сработавший попадает в отчёт
+            locator, _ = self.click_first("buy_button", button_selectors, description="Кнопка 'Купить'")
+        except TimeoutException:
+            logger.error("❌ Не удалось найти кнопку 'Купить'")
+            return False
 
-                # Ждем изменения кнопки
-                try:
-                    self.wait.until(
-                        EC.text_to_be_present_in_element(
-                            (By.CSS_SELECTOR, "button.product-buttons__main-action"),
-                            "Оформить"
-                        )
-                    )
-                    logger.info("✅ Кнопка изменилась на 'Оформить'")
-                except:
-                    logger.info("ℹ️ Кнопка не изменилась")
+        # Текст кнопки не читаем - после клика она перерисовывается в "Оформить"
+        logger.info(f"✅ Нажата кнопка по селектору: {locator[1]}")
 
-                return True
-            except:
-                continue
+        # Ждем изменения кнопки
+        try:
+            self.wait.until(
+                EC.text_to_be_present_in_element(
+                    (By.CSS_SELECTOR, "button.product-buttons__main-action"),
+                    "Оформить"
+                )
+            )
+            logger.info("✅ Кнопка изменилась на 'Оформить'")
+        except:
+            logger.info("ℹ️ Кнопка не изменилась")
 
-        logger.error("❌ Не удалось найти кнопку 'Купить'")
-        return False
+        return True
 
     @allure.step("Перейти к оформлению заказа")
     def proceed_to_checkout(self):
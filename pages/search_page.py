@@ -5,6 +5,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from .base_page import BasePage  # <-- ТОЧКА!
 import allure
 import logging
@@ -48,17 +49,12 @@ class SearchPage(BasePage):
             (By.CSS_SELECTOR, ".product-card a")
         ]
 
-        for selector_type, selector_value in book_selectors:
-            try:
-                self.safe_click(
-                    (selector_type, selector_value),
-                    description=f"Книга по селектору {selector_value}"
-                )
-                logger.info(f"✅ Нажата книга по селектору: {selector_value}")
+        try:
+            # Селекторы проверяются по порядку, сработавший попадает в отчёт
+            locator, _ = self.click_first("first_book", book_selectors, description="Книга 'Война и мир'")
+        except TimeoutException:
+            raise Exception("❌ Не удалось выбрать книгу")
 
-                self.wait_for_page_load()
-                return True
-            except:
-                continue
-
-        raise Exception("❌ Не удалось выбрать книгу")
\ No newline at end of file
+        logger.info(f"✅ Нажата книга по селектору: {locator[1]}")
+        self.wait_for_page_load()
+        return True
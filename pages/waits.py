@@ -0,0 +1,142 @@
+"""
+Ожидания по реальным событиям страницы вместо фиксированных пауз
+
+Скрипт-сторож считает:
+- незавершённые fetch/XHR к домену страницы и WAIT_TRACKED_DOMAINS и время
+  последней сетевой активности (сторонние счётчики и маяки не учитываются);
+- время последнего изменения структуры или текста DOM (MutationObserver, без атрибутов);
+- окончание гидрации Nuxt (#__nuxt).
+
+В Chrome сторож ставится при создании драйвера (install_watcher, CDP
+Page.addScriptToEvaluateOnNewDocument) и работает с начала каждого документа -
+до скриптов страницы, поэтому видит и запросы, ушедшие во время загрузки.
+Без CDP он внедряется первым вызовом page_settled: запросы, начатые раньше,
+он не видит.
+"""
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+from config import settings
+
+# Ставит сторожа, если его ещё нет в документе
+WATCHER_SCRIPT = """
+(function () {
+var w = window;
+if (w.__cgWait) {
+    return;
+}
+var s = w.__cgWait = {inflight: 0, lastActivity: Date.now(), lastMutation: Date.now()};
+var touch = function () { s.lastActivity = Date.now(); };
+
+// Только запросы к домену страницы и доменам сайта (WAIT_TRACKED_DOMAINS):
+// счётчики, маяки и долгие запросы сторонних сервисов не дали бы странице
+// успокоиться никогда
+var domains = __TRACKED_DOMAINS__;
+var tracked = function (url) {
+    try {
+        var target = new URL(url, location.href);
+        return target.origin === location.origin || domains.some(function (domain) {
+            return target.hostname === domain || target.hostname.endsWith('.' + domain);
+        });
+    } catch (e) {
+        return false;
+    }
+};
+
+if (w.fetch) {
+    var origFetch = w.fetch;
+    w.fetch = function (input) {
+        if (!tracked(input && input.url || input)) {
+            return origFetch.apply(this, arguments);
+        }
+        s.inflight++; touch();
+        return origFetch.apply(this, arguments).finally(function () { s.inflight--; touch(); });
+    };
+}
+
+var origOpen = XMLHttpRequest.prototype.open;
+XMLHttpRequest.prototype.open = function (method, url) {
+    this.__cgTracked = tracked(url);
+    return origOpen.apply(this, arguments);
+};
+var origSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function () {
+    if (this.__cgTracked) {
+        s.inflight++; touch();
+        this.addEventListener('loadend', function () { s.inflight--; touch(); }, {once: true});
+    }
+    return origSend.apply(this, arguments);
+};
+
+// Только изменения структуры и текста: атрибуты (анимации, карусели баннеров)
+// меняются постоянно. document, а не documentElement: до разбора страницы
+// <html> ещё может не быть
+new MutationObserver(function () { s.lastMutation = Date.now(); })
+    .observe(document, {childList: true, subtree: true, characterData: true});
+})();
+""".replace("__TRACKED_DOMAINS__", json.dumps(settings.WAIT_TRACKED_DOMAINS))
+
+# Один вызов execute_script: ставит сторожа, если его ещё нет, и возвращает состояние
+SETTLE_STATE_SCRIPT = WATCHER_SCRIPT + """
+var w = window;
+var hydrated = true;
+var root = document.getElementById('__nuxt');
+if (root || w.__NUXT__) {
+    if (w.$nuxt) {
+        hydrated = true;                                   // Nuxt 2: приложение смонтировано
+    } else if (root && root.__vue_app__) {
+        var props = root.__vue_app__.config && root.__vue_app__.config.globalProperties;
+        var nuxtApp = root.__vue_app__.$nuxt || (props && props.$nuxt);
+        hydrated = !nuxtApp || !nuxtApp.isHydrating;       // Nuxt 3
+    } else {
+        hydrated = false;
+    }
+}
+
+var now = Date.now();
+var s = w.__cgWait;
+return {
+    readyState: document.readyState,
+    hydrated: hydrated,
+    inflight: Math.max(0, s.inflight),
+    networkQuietMs: now - s.lastActivity,
+    domQuietMs: now - s.lastMutation
+};
+"""
+
+
+def install_watcher(driver):
+    """Сторож в каждом новом документе вкладки с самого начала загрузки (Chrome, CDP)
+
+    -> True, если поставлен; без CDP (не Chromium, Grid без CDP) - False,
+    сторож внедрится лениво.
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": WATCHER_SCRIPT})
+    except (AttributeError, WebDriverException):
+        return False
+    return True
+
+
+class page_settled:
+    """Условие для WebDriverWait: страница загружена, гидрирована, сеть и DOM затихли
+
+    quiet_ms - тишина сети, dom_quiet_ms - тишина DOM; None отключает проверку DOM.
+    """
+
+    def __init__(self, quiet_ms=settings.WAIT_QUIET_MS, dom_quiet_ms=settings.WAIT_DOM_QUIET_MS):
+        self.quiet_ms = quiet_ms
+        self.dom_quiet_ms = dom_quiet_ms
+        self.last_state = None
+
+    def __call__(self, driver):
+        state = driver.execute_script(SETTLE_STATE_SCRIPT)
+        self.last_state = state
+        return (
+            state["readyState"] == "complete"
+            and state["hydrated"]
+            and state["inflight"] == 0
+            and state["networkQuietMs"] >= self.quiet_ms
+            and (self.dom_quiet_ms is None or state["domQuietMs"] >= self.dom_quiet_ms)
+        )
@@ -0,0 +1,158 @@
+"""
+Пул WebDriver на сессию - браузер запускается один раз, между тестами только сброс состояния
+"""
+import logging
+import queue
+import threading
+
+from config import settings
+from .parallel import worker_id, worker_dir
+
+logger = logging.getLogger(__name__)
+
+# Что чистим в хранилищах сайта между тестами (CDP Storage.clearDataForOrigin)
+STORAGE_TYPES = "local_storage,session_storage,indexeddb,websql,cache_storage,service_workers"
+
+
+def build_chrome_options():
+    """Опции Chrome - БЕЗ ЛОГОВ И БЕЗ ОШИБОК CHROME"""
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--start-maximized")
+    options.add_argument('--log-level=3')  # Уровень логов: 0=INFO, 1=WARNING, 2=ERROR, 3=FATAL
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+
+    # Убираем лишние сообщения в консоль и DevTools лог
+    options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # Параллельный запуск: у каждого процесса свой профиль и каталог загрузок
+    if worker_id() is not None:
+        options.add_argument(f"--user-data-dir={worker_dir('profile')}")
+        options.add_experimental_option("prefs", {
+            "download.default_directory": worker_dir("downloads"),
+            "download.prompt_for_download": False,
+        })
+    return options
+
+
+def create_driver(options=None):
+    """Новый Chrome с настройками проекта и сторожем сети/DOM с начала каждой страницы"""
+    from selenium import webdriver
+    from pages.waits import install_watcher
+
+    driver = webdriver.Chrome(options=options or build_chrome_options())
+    driver.implicitly_wait(settings.IMPLICIT_WAIT)
+    install_watcher(driver)
+    return driver
+
+
+def is_alive(driver):
+    """Браузер отвечает на команды"""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def reset_driver(driver, origin=settings.BASE_URL):
+    """Чистое состояние без перезапуска: одна вкладка, без cookies и хранилищ
+
+    Анонимная корзина сайта привязана к cookies, поэтому очищается вместе с ними.
+    """
+    # Лишние вкладки
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    try:
+        # Chrome: чистим без перехода на сайт
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": STORAGE_TYPES})
+    except AttributeError:
+        # Не Chromium: чистим то, что видно с текущей страницы
+        driver.delete_all_cookies()
+        driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+
+    driver.get("about:blank")
+    driver.implicitly_wait(settings.IMPLICIT_WAIT)
+
+
+class DriverPool:
+    """Пул переиспользуемых браузеров
+
+    acquire() отдаёт живой браузер (создаёт новый, пока не достигнут size),
+    release() сбрасывает состояние и возвращает его в пул. Упавший браузер
+    или браузер, который не удалось сбросить, заменяется новым.
+    reset_hooks - дополнительные функции сброса driver -> None (например корзина через API).
+    """
+
+    def __init__(self, size=settings.DRIVER_POOL_SIZE, factory=create_driver, reset=reset_driver):
+        self.size = size
+        self.factory = factory
+        self.reset = reset
+        self.reset_hooks = []
+        self.launches = 0
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _launch(self):
+        driver = self.factory()
+        with self._lock:
+            self._all.append(driver)
+            self.launches += 1
+        logger.info(f"🚀 Запущен браузер #{self.launches}")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_launch = len(self._all) < self.size
+                if can_launch:
+                    return self._launch()
+                driver = self._idle.get(timeout=timeout)
+
+            if is_alive(driver):
+                return driver
+            logger.warning("⚠️ Браузер не отвечает - заменяем")
+            self._discard(driver)
+
+    def release(self, driver):
+        try:
+            for hook in self.reset_hooks:
+                hook(driver)
+            self.reset(driver)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сбросить браузер ({e}) - заменяем")
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
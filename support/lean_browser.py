@@ -0,0 +1,108 @@
+"""
+Облегчённый браузер: headless + блокировка картинок, шрифтов и трекеров через CDP
+
+    pytest tests/test_ui.py --browser-profile=lean
+
+Блокировка - Network.setBlockedURLs: по расширениям (типы ресурсов) и доменам.
+Трафик теста считается по performance-логу Chrome (события Network.*).
+"""
+import json
+import logging
+
+from config import settings
+from .driver_pool import build_chrome_options, create_driver
+
+logger = logging.getLogger(__name__)
+
+# Тип ресурса -> шаблоны URL для Network.setBlockedURLs
+TYPE_PATTERNS = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "Font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*"],
+    "Stylesheet": ["*.css*"],
+}
+
+
+def _domain_matches(domain, allowed):
+    return any(domain == a or domain.endswith("." + a) for a in allowed)
+
+
+class LeanProfile:
+    """Настройки облегчённого браузера
+
+    blocked_types - типы из TYPE_PATTERNS, blocked_domains - домены трекеров
+    и рекламы (с поддоменами), allowed_domains - домены, которые никогда не
+    блокируются по домену (блокировка по типу на них действует).
+    """
+
+    def __init__(self, blocked_types=settings.LEAN_BLOCKED_TYPES,
+                 blocked_domains=settings.LEAN_BLOCKED_DOMAINS,
+                 allowed_domains=settings.LEAN_ALLOWED_DOMAINS,
+                 headless=True):
+        unknown = set(blocked_types) - set(TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Неизвестные типы ресурсов: {sorted(unknown)}")
+        self.blocked_types = list(blocked_types)
+        self.blocked_domains = [d for d in blocked_domains if not _domain_matches(d, allowed_domains)]
+        self.allowed_domains = list(allowed_domains)
+        self.headless = headless
+
+    def patterns(self):
+        patterns = [p for t in self.blocked_types for p in TYPE_PATTERNS[t]]
+        for domain in self.blocked_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+    def build_options(self):
+        options = build_chrome_options()
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        if "Image" in self.blocked_types:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def install(self, driver):
+        """Включает блокировку в текущей вкладке (сохраняется между переходами)"""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns()})
+        return driver
+
+    def create_driver(self):
+        """Фабрика для DriverPool"""
+        return self.install(create_driver(self.build_options()))
+
+
+def traffic_report(driver):
+    """Трафик с прошлого вызова: байты, запросы, заблокированное по типам
+
+    Сэкономленные байты - оценка: число заблокированных запросов каждого типа
+    умножается на типичный размер из settings.LEAN_TYPICAL_BYTES.
+    """
+    requests_by_id = {}
+    transferred = 0
+    finished = 0
+    blocked = {}
+
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+
+        if method == "Network.requestWillBeSent":
+            requests_by_id[params["requestId"]] = params.get("type", "Other")
+        elif method == "Network.loadingFinished":
+            transferred += int(params.get("encodedDataLength", 0))
+            finished += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            resource_type = params.get("type") or requests_by_id.get(params["requestId"], "Other")
+            blocked[resource_type] = blocked.get(resource_type, 0) + 1
+
+    saved = sum(count * settings.LEAN_TYPICAL_BYTES.get(t, settings.LEAN_TYPICAL_BYTES["Other"])
+                for t, count in blocked.items())
+    return {
+        "requests": finished,
+        "transferred_bytes": transferred,
+        "blocked_requests": dict(sorted(blocked.items())),
+        "estimated_saved_bytes": saved,
+    }
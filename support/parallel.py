@@ -0,0 +1,267 @@
+"""
+Параллельный запуск тестов в нескольких процессах pytest (плагин, подключается в conftest.py)
+
+    pytest tests/test_ui.py --workers 4
+    pytest tests/test_ui.py --workers auto
+
+Главный процесс собирает тесты, делит их на шарды по истории длительностей
+(самые долгие - первыми, в наименее загруженный шард), запускает по процессу
+на шард и сливает результаты в config.stats для итоговой статистики.
+У каждого процесса свой браузер и свои каталоги профиля и загрузок.
+"""
+import heapq
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config import settings
+
+WORKER_ENV = "PYTEST_WORKER_ID"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("parallel", "Параллельный запуск")
+    group.addoption("--workers", default=None, type=_workers_option,
+                    help="Число процессов (или auto - по числу ядер)")
+    group.addoption("--worker-id", default=None, help="(служебное) номер процесса-исполнителя")
+    group.addoption("--worker-shard", default=None, help="(служебное) файл со списком тестов шарда")
+    group.addoption("--worker-results", default=None, help="(служебное) файл для результатов шарда")
+
+
+def worker_id():
+    """Номер текущего процесса-исполнителя или None в обычном запуске"""
+    return os.environ.get(WORKER_ENV)
+
+
+def worker_dir(name):
+    """Личный каталог процесса-исполнителя (профиль браузера, загрузки)"""
+    path = os.path.abspath(os.path.join(settings.WORKERS_DIR, f"worker-{worker_id() or 0}", name))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _workers_option(value):
+    """Проверка --workers при разборе командной строки"""
+    if value != "auto" and not value.isdigit():
+        raise pytest.UsageError(f"--workers: ожидается число процессов или auto, получено {value!r}")
+    return value
+
+
+def worker_count(value):
+    """Значение --workers -> число процессов (1 - обычный запуск)"""
+    if value in (None, "", "0", "1"):
+        return 1
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+# ---------- Длительности ----------
+def load_durations(path=settings.DURATIONS_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(durations, path=settings.DURATIONS_FILE):
+    merged = load_durations(path)
+    merged.update(durations)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def _default_duration(nodeids, durations):
+    known = sorted(durations[n] for n in nodeids if n in durations)
+    return known[len(known) // 2] if known else settings.DEFAULT_TEST_DURATION
+
+
+def estimate_duration(nodeids, workers=None, durations=None):
+    """Ожидаемая длительность прогона, сек: самый долгий шард при таком --workers"""
+    durations = load_durations() if durations is None else durations
+    default = _default_duration(nodeids, durations)
+    shards = balance(nodeids, durations, worker_count(workers))
+    return max((sum(durations.get(n, default) for n in shard) for shard in shards), default=0.0)
+
+
+def balance(nodeids, durations, shards):
+    """Жадное LPT-разбиение: самые долгие тесты - в наименее загруженный шард
+
+    Тесты без истории получают медиану известных длительностей.
+    Внутри шарда сохраняется исходный порядок тестов.
+    """
+    default = _default_duration(nodeids, durations)
+    order = {nodeid: i for i, nodeid in enumerate(nodeids)}
+
+    heap = [(0.0, i) for i in range(shards)]
+    result = [[] for _ in range(shards)]
+    for nodeid in sorted(nodeids, key=lambda n: -durations.get(n, default)):
+        load, i = heapq.heappop(heap)
+        result[i].append(nodeid)
+        heapq.heappush(heap, (load + durations.get(nodeid, default), i))
+
+    return [sorted(shard, key=order.get) for shard in result if shard]
+
+
+# ---------- Запись результатов ----------
+class _DurationRecorder:
+    """Копит длительности тестов (setup + call + teardown) для будущего разбиения"""
+
+    def __init__(self):
+        self.results = {"passed": [], "failed": [], "skipped": [], "durations": {}}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_runtest_logreport(self, report):
+        durations = self.results["durations"]
+        durations[report.nodeid] = durations.get(report.nodeid, 0.0) + report.duration
+        if report.when == "call" or (report.when == "setup" and not report.passed):
+            outcome = "passed" if report.passed else "failed" if report.failed else "skipped"
+            self.results[outcome].append(report.nodeid)
+
+    def pytest_sessionfinish(self, session):
+        if self.results["durations"]:
+            save_durations(self.results["durations"])
+
+
+class _WorkerRecorder(_DurationRecorder):
+    """В процессе-исполнителе: результаты шарда отдаём главному процессу"""
+
+    def __init__(self, results_path):
+        super().__init__()
+        self.results_path = results_path
+
+    def pytest_sessionfinish(self, session):
+        with open(self.results_path, "w", encoding="utf-8") as f:
+            json.dump(self.results, f, ensure_ascii=False)
+
+
+# ---------- Главный процесс ----------
+def _shard_report(nodeid, outcome, worker, log_path):
+    """Результат теста из шарда -> TestReport для терминала главного процесса"""
+    path = nodeid.split("::")[0]
+    longrepr = None
+    if outcome == "failed":
+        longrepr = f"Подробности - в логе процесса {worker}: {log_path}"
+    elif outcome == "skipped":
+        longrepr = (path, None, f"Пропущен в процессе {worker}")
+    return pytest.TestReport(nodeid=nodeid, location=(path, None, nodeid), keywords={},
+                             outcome=outcome, longrepr=longrepr, when="call")
+
+
+class _Controller:
+    """Запускает шарды в отдельных процессах вместо обычного цикла тестов"""
+
+    def __init__(self, config, workers):
+        self.config = config
+        self.workers = workers
+
+    def _worker_args(self):
+        """Аргументы исходного запуска без --workers"""
+        args = list(self.config.invocation_params.args)
+        cleaned = []
+        skip_next = False
+        for arg in args:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg == "--workers":
+                skip_next = True
+                continue
+            if arg.startswith("--workers="):
+                continue
+            cleaned.append(arg)
+        return cleaned
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.config.option.collectonly or not session.items:
+            return None
+
+        nodeids = [item.nodeid for item in session.items]
+        shards = balance(nodeids, load_durations(), self.workers)
+        os.makedirs(settings.WORKERS_DIR, exist_ok=True)
+        print(f"\n⚡ Параллельный запуск: {len(nodeids)} тестов в {len(shards)} процессах")
+
+        processes = []
+        for i, shard in enumerate(shards):
+            base = os.path.abspath(os.path.join(settings.WORKERS_DIR, f"worker-{i}"))
+            os.makedirs(base, exist_ok=True)
+            shard_path = os.path.join(base, "shard.json")
+            results_path = os.path.join(base, "results.json")
+            log_path = os.path.join(base, "output.log")
+            with open(shard_path, "w", encoding="utf-8") as f:
+                json.dump(shard, f, ensure_ascii=False)
+            if os.path.exists(results_path):
+                os.remove(results_path)
+
+            command = [sys.executable, "-m", "pytest", *self._worker_args(),
+                       "--worker-id", str(i), "--worker-shard", shard_path,
+                       "--worker-results", results_path, "-p", "no:cacheprovider"]
+            log = open(log_path, "w", encoding="utf-8")
+            process = subprocess.Popen(
+                command, cwd=str(self.config.invocation_params.dir),
+                env={**os.environ, WORKER_ENV: str(i)}, stdout=log, stderr=subprocess.STDOUT,
+            )
+            processes.append((i, shard, process, log, results_path, log_path))
+
+        reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+        stats = {"passed": [], "failed": [], "skipped": []}
+        durations = {}
+        reports = []
+        for i, shard, process, log, results_path, log_path in processes:
+            process.wait()
+            log.close()
+            try:
+                with open(results_path, encoding="utf-8") as f:
+                    results = json.load(f)
+            except (OSError, ValueError):
+                # Процесс упал до конца сессии - весь шард считаем проваленным
+                results = {"failed": shard, "durations": {}}
+            for outcome in stats:
+                stats[outcome].extend(results.get(outcome, []))
+            durations.update(results.get("durations", {}))
+
+            status = "✅" if process.returncode in (0, 5) else "❌"
+            print(f"   {status} Процесс {i}: {len(shard)} тестов, лог: {log_path}")
+            reports.extend(_shard_report(nodeid, outcome, i, log_path)
+                           for outcome in stats for nodeid in results.get(outcome, []))
+
+        if reporter is not None:
+            # Итоговая строка pytest ("5 passed, 1 failed") и список провалов - по всем шардам
+            for report in reports:
+                reporter.pytest_runtest_logreport(report)
+        session.config.stats = stats
+        session.testsfailed = len(stats["failed"])
+        save_durations(durations)
+        return True
+
+
+def pytest_configure(config):
+    results_path = config.getoption("--worker-results")
+    if results_path:
+        config.pluginmanager.register(_WorkerRecorder(results_path), "parallel-worker")
+        return
+
+    workers = worker_count(config.getoption("--workers"))
+    if workers > 1:
+        config.pluginmanager.register(_Controller(config, workers), "parallel-controller")
+    else:
+        config.pluginmanager.register(_DurationRecorder(), "parallel-durations")
+
+
+def pytest_collection_modifyitems(config, items):
+    """В процессе-исполнителе оставляем только тесты своего шарда"""
+    shard_path = config.getoption("--worker-shard")
+    if not shard_path:
+        return
+    with open(shard_path, encoding="utf-8") as f:
+        shard = set(json.load(f))
+    selected = [item for item in items if item.nodeid in shard]
+    deselected = [item for item in items if item.nodeid not in shard]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
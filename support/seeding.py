@@ -0,0 +1,55 @@
+"""
+Подготовка состояния UI через API: авторизация cookie и корзина без кликов
+"""
+import logging
+from urllib.parse import quote
+
+from api.auth import token_manager
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def cookie_token(token):
+    """'Bearer eyJ...' / 'Bearer%20eyJ...' / 'eyJ...' -> значение cookie 'Bearer%20eyJ...'"""
+    token = token.replace("Bearer%20", "").replace("Bearer ", "").strip()
+    return quote(f"Bearer {token}", safe="")
+
+
+def inject_auth_cookie(driver, token=None):
+    """Кладёт токен в cookie сайта - браузер сразу авторизован (по умолчанию токен прогона)"""
+    token = token or token_manager.token()
+    cookie = {
+        "name": settings.AUTH_COOKIE_NAME,
+        "value": cookie_token(token),
+        "domain": settings.AUTH_COOKIE_DOMAIN,
+        "path": "/",
+        "secure": True,
+    }
+    try:
+        # Chrome: без захода на сайт
+        driver.execute_cdp_cmd("Network.setCookie", cookie)
+    except AttributeError:
+        # Selenium ставит cookie только для открытого домена
+        driver.get(settings.BASE_URL + "/404")
+        driver.add_cookie(cookie)
+    logger.info("🔐 Токен добавлен в cookie браузера")
+
+
+def find_product_id(client, phrase):
+    """id первой доступной к покупке книги по фразе"""
+    result = client.search_products(phrase)
+    for book in result.get("books", []):
+        if book.get("available"):
+            return book["id"]
+    raise LookupError(f"Нет доступных товаров по запросу '{phrase}': {result.get('status') or result.get('error')}")
+
+
+def seed_cart(client, product_ids):
+    """Очищает корзину и кладёт в неё товары через API"""
+    client.clear_cart()
+    for product_id in product_ids:
+        result = client.add_to_cart(product_id)
+        if not result.get("ok"):
+            raise RuntimeError(f"Не удалось положить товар {product_id} в корзину: {result.get('status')}")
+    logger.info(f"🛒 Корзина подготовлена через API: {len(product_ids)} товар(ов)")
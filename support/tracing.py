@@ -0,0 +1,197 @@
+"""
+Трассировка времени UI тестов: тест -> шаг allure -> метод page object -> команда WebDriver
+
+    pytest tests/test_ui.py --trace-steps                # traces/trace.json
+    pytest tests/test_ui.py --trace-steps --trace-file my.json
+
+Формат - Chrome trace events (открывается в https://ui.perfetto.dev или chrome://tracing).
+К каждому тесту в allure прикладывается таблица самых долгих шагов.
+Выключенная трассировка стоит одной проверки флага на вызов.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from config import settings
+
+try:
+    import allure
+    import allure_commons
+except ImportError:  # трассировка работает и без allure
+    allure = allure_commons = None
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer:
+    """Сборщик событий трассировки (общий на процесс: tracing.tracer)"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.pid = os.getpid()
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def _add(self, name, cat, start, args):
+        event = {
+            "name": name, "cat": cat, "ph": "X", "ts": start, "dur": _now_us() - start,
+            "pid": self.pid, "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, cat="step", **args):
+        if not self.enabled:
+            yield
+            return
+        start = _now_us()
+        try:
+            yield
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self._add(name, cat, start, args)
+
+    def begin(self, key, name, cat="step"):
+        """Начало интервала, закрываемого end(key) (для хуков allure)"""
+        if self.enabled:
+            self._open[key] = (name, cat, _now_us())
+
+    def end(self, key, **args):
+        opened = self._open.pop(key, None)
+        if opened is not None:
+            name, cat, start = opened
+            self._add(name, cat, start, args)
+
+    def summary(self, since=0, top=15):
+        """Самые долгие интервалы: [(категория, имя, суммарно мс, вызовов)]"""
+        totals = {}
+        for event in self.events[since:]:
+            key = (event["cat"], event["name"])
+            total, count = totals.get(key, (0, 0))
+            totals[key] = (total + event["dur"], count + 1)
+        rows = [(cat, name, total / 1000, count) for (cat, name), (total, count) in totals.items()]
+        return sorted(rows, key=lambda row: -row[2])[:top]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid,
+                     "args": {"name": f"pytest {os.environ.get('PYTEST_WORKER_ID', '')}".strip()}}]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+tracer = Tracer()
+
+
+def traced(name, cat="page"):
+    """Декоратор: вызов функции - интервал трассировки"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name, cat):
+                return func(*args, **kwargs)
+        wrapper.__traced__ = True
+        return wrapper
+    return decorator
+
+
+def instrument_class(cls, cat="page"):
+    """Оборачивает публичные методы, объявленные в самом классе"""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(value) or getattr(value, "__traced__", False):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}", cat)(value))
+    return cls
+
+
+def instrument_driver(driver):
+    """Каждая команда WebDriver (в том числе у элементов) - интервал 'webdriver'"""
+    if getattr(driver, "__traced__", False):
+        return driver
+    execute = driver.execute
+
+    def traced_execute(driver_command, params=None):
+        if not tracer.enabled:
+            return execute(driver_command, params)
+        with tracer.span(driver_command, "webdriver"):
+            return execute(driver_command, params)
+
+    driver.execute = traced_execute
+    driver.__traced__ = True
+    return driver
+
+
+if allure_commons is not None:
+    class _AllureStepHooks:
+        """Шаги allure (@allure.step и with allure.step) - интервалы 'allure'"""
+
+        @allure_commons.hookimpl
+        def start_step(self, uuid, title, params):
+            tracer.begin(uuid, title, "allure")
+
+        @allure_commons.hookimpl
+        def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+            tracer.end(uuid, **({"error": exc_type.__name__} if exc_type else {}))
+
+
+# ---------- Плагин pytest ----------
+def pytest_addoption(parser):
+    group = parser.getgroup("trace", "Трассировка времени")
+    group.addoption("--trace-steps", action="store_true", default=False,
+                    help="Записать трассировку шагов (Chrome trace events)")
+    group.addoption("--trace-file", default=None, help="Куда сохранить трассировку")
+
+
+def pytest_configure(config):
+    if not config.getoption("--trace-steps"):
+        return
+    tracer.enabled = True
+    if allure_commons is not None:
+        allure_commons.plugin_manager.register(_AllureStepHooks(), "trace-allure-steps")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    with tracer.span(item.nodeid, "test"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    since = len(tracer.events)
+    yield
+    if not tracer.enabled:
+        return
+    rows = tracer.summary(since)
+    if not rows:
+        return
+    table = "\n".join(f"{total:10.1f} мс  {count:4d}x  [{cat}] {name}" for cat, name, total, count in rows)
+    if allure is not None:
+        allure.attach(table, name="Время шагов", attachment_type=allure.attachment_type.TEXT)
+
+
+def pytest_sessionfinish(session):
+    if not tracer.enabled:
+        return
+    path = session.config.getoption("--trace-file") or settings.TRACE_FILE
+    worker = os.environ.get("PYTEST_WORKER_ID")
+    if worker is not None:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.worker-{worker}{ext}"
+    tracer.save(path)
+    print(f"\n🧭 Трассировка: {path} (открыть в https://ui.perfetto.dev)")
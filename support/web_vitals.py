@@ -0,0 +1,223 @@
+"""
+Производительность страниц: Navigation/Resource/Paint Timing, LCP и CLS из браузера
+
+    pytest tests/test_ui.py --perf-budget=warn    # превышение бюджета - предупреждение
+    pytest tests/test_ui.py --perf-budget=fail    # превышение бюджета - тест падает
+
+Замер снимается после каждого wait_for_page_load (один раз на документ),
+тип страницы определяется по URL (settings.PAGE_TYPES). Бюджеты - в
+config/perf_budget.json, итоги по типам страниц - в settings.PERF_RESULTS_FILE.
+Размер чужих ресурсов без Timing-Allow-Origin браузер отдаёт нулём,
+поэтому transfer_bytes - нижняя оценка.
+"""
+import json
+import os
+import re
+import statistics
+import threading
+
+import pytest
+
+from config import settings
+
+try:
+    import allure
+except ImportError:
+    allure = None
+
+# Один вызов execute_script: буферизованные записи LCP/CLS забираем через takeRecords
+VITALS_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+
+var observed = function (type) {
+    try {
+        var observer = new PerformanceObserver(function () {});
+        observer.observe({type: type, buffered: true});
+        var records = observer.takeRecords();
+        observer.disconnect();
+        return records;
+    } catch (e) {
+        return [];
+    }
+};
+
+var lcp = observed('largest-contentful-paint');
+var cls = 0;
+observed('layout-shift').forEach(function (e) { if (!e.hadRecentInput) { cls += e.value; } });
+
+var fcp = null;
+performance.getEntriesByType('paint').forEach(function (e) {
+    if (e.name === 'first-contentful-paint') { fcp = e.startTime; }
+});
+
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0;
+var byType = {};
+resources.forEach(function (r) {
+    bytes += r.transferSize || 0;
+    byType[r.initiatorType] = (byType[r.initiatorType] || 0) + 1;
+});
+
+return {
+    document: performance.timeOrigin,
+    url: location.href,
+    ttfb_ms: nav.responseStart,
+    fcp_ms: fcp,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd,
+    load_ms: nav.loadEventEnd || null,
+    lcp_ms: lcp.length ? lcp[lcp.length - 1].startTime : null,
+    cls: cls,
+    transfer_bytes: bytes,
+    resources: resources.length,
+    resources_by_type: byType
+};
+"""
+
+METRICS = ("ttfb_ms", "fcp_ms", "dom_content_loaded_ms", "load_ms", "lcp_ms", "cls", "transfer_bytes", "resources")
+
+
+def page_type(url, page_types=settings.PAGE_TYPES):
+    """Тип страницы по первому подходящему шаблону пути"""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?")[0] or "/"
+    for name, pattern in page_types.items():
+        if re.search(pattern, path):
+            return name
+    return "other"
+
+
+def load_budget(path=settings.PERF_BUDGET_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_budget(sample, budget):
+    """Превышения бюджета: [(метрика, значение, лимит)]
+
+    Лимиты страницы берутся из budget["pages"][тип], недостающие - из "default".
+    """
+    pages = budget.get("pages", {})
+    limits = {**pages.get("default", {}), **pages.get(sample["page_type"], {})}
+    violations = []
+    for metric, limit in limits.items():
+        value = sample.get(metric)
+        if value is not None and value > limit:
+            violations.append((metric, value, limit))
+    return violations
+
+
+class VitalsCollector:
+    """Замеры по типам страниц (общий на процесс: web_vitals.collector)"""
+
+    def __init__(self):
+        self.enabled = False
+        self.budget = {}
+        self.samples = {}
+        self.violations = []
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def collect(self, driver):
+        """Снимает замер текущего документа; повторный вызов на том же документе - None"""
+        if not self.enabled:
+            return None
+        data = driver.execute_script(VITALS_SCRIPT)
+        if not data:
+            return None
+        key = (driver.session_id, data.pop("document"))
+        with self._lock:
+            if key in self._seen:
+                return None
+            self._seen.add(key)
+            sample = {"page_type": page_type(data["url"]), **data}
+            self.samples.setdefault(sample["page_type"], []).append(sample)
+            self.violations += [(sample, *v) for v in check_budget(sample, self.budget)]
+        return sample
+
+    def summary(self):
+        """Медианы метрик по типам страниц"""
+        result = {}
+        for kind, samples in sorted(self.samples.items()):
+            medians = {}
+            for metric in METRICS:
+                values = [s[metric] for s in samples if s.get(metric) is not None]
+                if values:
+                    medians[metric] = round(statistics.median(values), 3)
+            result[kind] = {"count": len(samples), "median": medians}
+        return result
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            "budget_version": self.budget.get("version"),
+            "summary": self.summary(),
+            "samples": self.samples,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+collector = VitalsCollector()
+
+
+# ---------- Плагин pytest ----------
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "Производительность страниц")
+    group.addoption("--perf-budget", default="off", choices=("off", "warn", "fail"),
+                    help="Замерять страницы и сверять с config/perf_budget.json")
+    group.addoption("--perf-budget-file", default=settings.PERF_BUDGET_FILE, help="Файл бюджетов")
+
+
+def pytest_configure(config):
+    if config.getoption("--perf-budget") == "off":
+        return
+    collector.enabled = True
+    collector.budget = load_budget(config.getoption("--perf-budget-file"))
+
+
+def _format(violations):
+    return "\n".join(
+        f"{sample['page_type']} {metric}: {value:g} > {limit:g} ({sample['url']})"
+        for sample, metric, value, limit in violations
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Страницы открываются и в фикстурах, поэтому отсчёт - с начала setup
+    item._perf_since = len(collector.violations)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if not collector.enabled or call.when != "call":
+        return
+    violations = collector.violations[getattr(item, "_perf_since", 0):]
+    if not violations:
+        return
+    text = _format(violations)
+    if allure is not None:
+        allure.attach(text, name="Превышения бюджета", attachment_type=allure.attachment_type.TEXT)
+    report = outcome.get_result()
+    if item.config.getoption("--perf-budget") == "fail" and report.passed:
+        report.outcome = "failed"
+        report.longrepr = f"Превышен бюджет производительности (v{collector.budget.get('version')}):\n{text}"
+    else:
+        item.warn(pytest.PytestWarning(f"Превышен бюджет производительности:\n{text}"))
+
+
+def pytest_sessionfinish(session):
+    if not collector.enabled or not collector.samples:
+        return
+    path = settings.PERF_RESULTS_FILE
+    worker = os.environ.get("PYTEST_WORKER_ID")
+    if worker is not None:
+        root, ext = os.path.splitext(path)
+        path = f"{root}.worker-{worker}{ext}"
+    collector.save(path)
+    print(f"\n⏱️ Замеры страниц: {path}")
+    for kind, data in collector.summary().items():
+        median = data["median"]
+        print(f"   {kind}: {data['count']} шт., TTFB {median.get('ttfb_ms', '-')} мс, "
+              f"LCP {median.get('lcp_ms', '-')} мс, {median.get('transfer_bytes', '-')} байт")
@@ -0,0 +1,56 @@
+"""
+Оффлайн тесты асинхронного API клиента (против локального эмулятора API)
+"""
+import asyncio
+import time
+
+import allure
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.base_client import ChitaiGorodAPIClient
+from api.mock_server import AUTHORS
+from api.transport import Transport
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Асинхронный клиент")
+class TestAsyncClient:
+
+    @allure.title("Асинхронный поиск совпадает с синхронным")
+    def test_same_result_as_sync(self, mock_api_server):
+        sync_result = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) \
+            .search_products("книга")
+
+        async def run():
+            async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) as client:
+                return await client.search_products("книга")
+
+        assert asyncio.run(run()) == sync_result
+        assert sync_result["ok"] and sync_result["found"] == 20
+
+    @allure.title("search_many идёт параллельно и сохраняет порядок")
+    def test_search_many_concurrent(self, mock_api_server):
+        mock_api_server.latency = 0.2
+        phrases = [last_name for last_name, _, _ in AUTHORS]
+
+        async def run():
+            async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) as client:
+                return await client.search_many(phrases, concurrency=10)
+
+        start = time.time()
+        results = asyncio.run(run())
+        elapsed = time.time() - start
+
+        assert [r["books"][0]["author"].split()[0] for r in results] == phrases
+        assert elapsed < 1.0, f"Запросы шли последовательно: {elapsed:.2f} сек"
+
+    @allure.title("Ошибка сети не обрывает пакет")
+    def test_search_many_network_error(self):
+        async def run():
+            async with AsyncChitaiGorodAPIClient(use_auth=False, base_url="http://127.0.0.1:9",
+                                                 transport=Transport(retries=0)) as client:
+                return await client.search_many(["а", "б"], concurrency=2)
+
+        results = asyncio.run(run())
+        assert [r["ok"] for r in results] == [False, False]
+        assert all("error" in r for r in results)
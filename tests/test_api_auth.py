@@ -0,0 +1,159 @@
+"""
+Оффлайн тесты менеджера токена: источники, срок из JWT, общий кэш прогона, проверка до первого теста
+"""
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+
+import allure
+import pytest
+
+from api.auth import TokenError, TokenManager, bare_token, decode_claims
+from api.base_client import ChitaiGorodAPIClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_jwt(**claims):
+    """Неподписанный JWT с заданными полями - подпись менеджер не проверяет"""
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{part({'typ': 'JWT', 'alg': 'HS256'})}.{part(claims)}.signature"
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Менеджер с источниками во временном каталоге и без run_id прогона"""
+    monkeypatch.delenv("TEST_TOKEN", raising=False)
+    monkeypatch.delenv("TEST_TOKEN_RUN", raising=False)
+
+    def factory(fallback=""):
+        return TokenManager(env="TEST_TOKEN", path=str(tmp_path / "token.txt"),
+                            cache_path=str(tmp_path / "cache.json"), run_env="TEST_TOKEN_RUN",
+                            fallback=fallback)
+    return factory
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Токен авторизации")
+class TestTokenManager:
+
+    @allure.title("Любой вид токена приводится к голому JWT, exp читается без сети")
+    def test_decode(self):
+        token = make_jwt(sub=1, exp=1765276596)
+
+        assert bare_token(f"Bearer {token}") == bare_token(f"Bearer%20{token}") == bare_token(token) == token
+        assert decode_claims(f"Bearer%20{token}")["exp"] == 1765276596
+        with pytest.raises(TokenError):
+            decode_claims("not-a-jwt")
+
+    @allure.title("Окружение важнее файла, файл важнее config/tokens.py")
+    def test_source_priority(self, manager, tmp_path, monkeypatch):
+        from_fallback, from_file, from_env = make_jwt(n=1), make_jwt(n=2), make_jwt(n=3)
+
+        assert manager(f"Bearer {from_fallback}").resolve()["source"] == "config/tokens.py"
+        (tmp_path / "token.txt").write_text(f"Bearer%20{from_file}\n", encoding="utf-8")
+        assert manager(from_fallback).resolve()["token"] == from_file
+        monkeypatch.setenv("TEST_TOKEN", from_env)
+        assert manager(from_fallback).resolve() == {"token": from_env, "exp": None,
+                                                    "source": "$TEST_TOKEN", "error": None}
+        assert manager("").resolve()["token"] == from_env
+        monkeypatch.delenv("TEST_TOKEN")
+        (tmp_path / "token.txt").unlink()
+        assert manager("").resolve() is None
+
+    @allure.title("check: истёкший и истекающий посреди прогона токен - TokenError")
+    def test_check(self, manager):
+        now = time.time()
+
+        assert manager(make_jwt(exp=now + 3600)).check(min_valid_for=1800, now=now)["exp"] == int(now + 3600)
+        with pytest.raises(TokenError, match="истёк"):
+            manager(make_jwt(exp=now - 60)).check(now=now)
+        with pytest.raises(TokenError, match="посреди прогона"):
+            manager(make_jwt(exp=now + 600)).check(min_valid_for=1800, now=now)
+        with pytest.raises(TokenError, match="Нет токена"):
+            manager("").check()
+        with pytest.raises(TokenError, match="JWT"):
+            manager("garbage").check()
+
+    @allure.title("Внутри прогона токен выбирается один раз и берётся из общего кэша")
+    def test_shared_run_cache(self, manager, tmp_path, monkeypatch):
+        first, second = make_jwt(n=1), make_jwt(n=2)
+        monkeypatch.setenv("TEST_TOKEN_RUN", "run-1")
+
+        assert manager(first).token() == first
+        # Источник поменяли посреди прогона - другие процессы всё равно видят первый токен
+        assert manager(second).token() == first
+        assert manager(second).current(refresh=True)["token"] == second
+        # Новый прогон - токен выбирается заново
+        monkeypatch.setenv("TEST_TOKEN_RUN", "run-2")
+        assert manager(first).token() == first
+        if os.name == "posix":
+            assert os.stat(tmp_path / "cache.json").st_mode & 0o777 == 0o600
+
+    @allure.title("Без run_id (запуск без --workers) токен на диск не пишется")
+    def test_no_cache_without_workers(self, manager, tmp_path):
+        token = make_jwt(n=1)
+
+        assert manager(token).token() == token
+        assert not (tmp_path / "cache.json").exists()
+
+    @allure.title("Процессы одного прогона получают один и тот же токен")
+    def test_shared_across_processes(self, tmp_path):
+        script = (
+            "import sys; from api.auth import TokenManager\n"
+            "m = TokenManager(env='TEST_TOKEN', path='token.txt', cache_path='cache.json',"
+            " run_env='TEST_TOKEN_RUN', fallback=sys.argv[1])\n"
+            "print(m.token())\n"
+        )
+        env = {**os.environ, "PYTHONPATH": ROOT, "TEST_TOKEN_RUN": "run-1"}
+        env.pop("TEST_TOKEN", None)
+        processes = [
+            subprocess.Popen([sys.executable, "-c", script, make_jwt(worker=i)], cwd=tmp_path, env=env,
+                             stdout=subprocess.PIPE, text=True)
+            for i in range(4)
+        ]
+        tokens = {process.communicate(timeout=60)[0].strip() for process in processes}
+
+        assert len(tokens) == 1
+        assert tokens == {json.loads((tmp_path / "cache.json").read_text())["entry"]["token"]}
+
+    @allure.title("Клиент шлёт токен менеджера в заголовке Authorization")
+    def test_client_header(self, manager, monkeypatch):
+        import api.base_client
+
+        token = make_jwt(sub=1)
+        monkeypatch.setattr(api.base_client, "token_manager", manager(f"Bearer%20{token}"))
+
+        assert ChitaiGorodAPIClient().session.headers["Authorization"] == f"Bearer {token}"
+        assert "Authorization" not in ChitaiGorodAPIClient(use_auth=False).session.headers
+
+    @allure.title("Истёкший токен останавливает прогон тестов с авторизацией до первого теста")
+    def test_preflight_aborts_run(self):
+        result = _run_pytest("tests/test_ui.py::TestSeededCart")
+
+        assert result.returncode == pytest.ExitCode.USAGE_ERROR, result.stdout
+        assert "Токен истёк" in result.stdout + result.stderr
+        assert "passed" not in result.stdout and "failed" not in result.stdout
+
+    @allure.title("Replay кассет публичных эндпоинтов не требует живого токена")
+    def test_preflight_skips_replay(self):
+        result = _run_pytest("tests/test_api.py", "--cassette-mode=replay", "-k", "popular")
+
+        assert result.returncode != pytest.ExitCode.USAGE_ERROR, result.stdout
+        assert "Токен истёк" not in result.stdout + result.stderr
+        # Прогон дошёл до теста (кассеты нет - ошибка кассеты, а не токена)
+        assert "test_popular_searches" in result.stdout
+
+
+def _run_pytest(*args):
+    """Прогон pytest в отдельном процессе с истёкшим токеном в окружении"""
+    env = {**os.environ, "CHITAI_GOROD_TOKEN": make_jwt(exp=int(time.time()) - 60)}
+    env.pop("AUTH_TOKEN_RUN", None)
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", *args, "-p", "no:cacheprovider", "--api-latency=none", "-q"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
@@ -0,0 +1,72 @@
+"""
+Оффлайн тесты компактного представления книг
+"""
+import tracemalloc
+
+import allure
+
+from api.base_client import ChitaiGorodAPIClient
+from api.books import Book, BookBatch
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Компактные книги")
+class TestBookBatch:
+
+    @allure.title("compact=True даёт те же книги, что и словари")
+    def test_compact_matches_dicts(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        plain = client.search_products("книга")
+        compact = client.search_products("книга", compact=True)
+
+        assert isinstance(compact["books"], BookBatch)
+        assert (compact["found"], compact["total"]) == (plain["found"], plain["total"])
+        assert list(compact["books"]) == plain["books"]
+        assert compact["books"][0].get("title") == plain["books"][0]["title"]
+
+    @allure.title("Агрегаты по цене и скидке")
+    def test_aggregates(self):
+        batch = BookBatch([
+            {"id": "1", "price": 100, "discount": "10%", "available": True},
+            {"id": "2", "price": 300, "discount": None, "available": False},
+            Book("3", "", "", 200, 250, "10%", True, "", "", 4.5),
+        ])
+
+        assert batch.price_stats() == {"count": 3, "min": 100.0, "max": 300.0, "mean": 200.0}
+        assert batch.discount_distribution() == {0: 1, 10: 2}
+        assert batch.available_count() == 2
+        assert batch[-1].old_price == 250 and batch[1].old_price is None
+
+    @allure.title("Срез - новый BookBatch с теми же книгами")
+    def test_slice(self):
+        batch = BookBatch({"id": str(i), "price": 100 + i, "discount": "5%" if i % 2 else None}
+                          for i in range(5))
+
+        part = batch[1:4]
+        assert isinstance(part, BookBatch)
+        assert list(part) == list(batch)[1:4]
+        assert [book.id for book in batch[::-2]] == ["4", "2", "0"]
+        assert len(batch[10:]) == 0
+
+    @allure.title("Колоночный формат легче списка словарей")
+    def test_memory(self):
+        books = [
+            {"id": str(i), "title": f"Книга {i}", "author": "Толстой Лев Николаевич",
+             "price": 100 + i, "old_price": None, "discount": "10%", "available": True,
+             "category": "Классика", "publisher": "АСТ", "rating": 4.5}
+            for i in range(5000)
+        ]
+
+        tracemalloc.start()
+        as_dicts = [dict(book) for book in books]
+        dicts_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        batch = BookBatch(books)
+        batch_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        assert len(batch) == len(as_dicts)
+        assert batch_size * 3 < dicts_size
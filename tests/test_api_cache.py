@@ -0,0 +1,94 @@
+"""
+Оффлайн тесты кэша ответов API (против локального эмулятора API)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+
+from api.base_client import ChitaiGorodAPIClient
+from api.cache import ResponseCache, MemoryCacheBackend, DiskCacheBackend
+from config import settings
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Кэш ответов")
+class TestResponseCache:
+
+    @allure.title("Повторный запрос отдаётся из кэша")
+    def test_repeat_is_served_from_cache(self, mock_api_server):
+        cache = ResponseCache()
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cache=cache)
+
+        first = client.search_products("Лев Толстой")
+        second = client.search_products("Лев Толстой")
+        client.get_popular_searches()
+        client.get_popular_searches()
+
+        assert first == second
+        assert mock_api_server.requests == 2
+        assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+    @allure.title("Счётчики не теряются, когда клиент общий для потоков")
+    def test_stats_threads(self, mock_api_server):
+        cache = ResponseCache()
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cache=cache)
+        client.search_products("роман")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: client.search_products("роман"), range(400)))
+
+        assert cache.stats.as_dict()["hits"] == 400 and cache.stats.misses == 1
+
+    @allure.title("Город и страница входят в ключ")
+    def test_key_includes_params(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cache=ResponseCache())
+
+        client.search_products("роман", page=1)
+        client.search_products("роман", page=2)
+        client.city_id = 2
+        client.search_products("роман", page=1)
+
+        assert mock_api_server.requests == 3
+
+    @allure.title("Истёкший TTL и эндпоинты без TTL идут в сеть")
+    def test_ttl(self, mock_api_server):
+        cache = ResponseCache(ttls={"SEARCH_PRODUCT": -1})
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cache=cache)
+
+        client.search_products("роман")
+        client.search_products("роман")
+        client.get_popular_searches()
+        client.get_popular_searches()
+
+        assert mock_api_server.requests == 4
+        assert cache.stats.expired == 1
+
+    @allure.title("LRU вытесняет самую старую запись")
+    def test_lru_eviction(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", 1, float("inf"), 1)
+        backend.set("b", 2, float("inf"), 1)
+        backend.get("a")
+        evicted = backend.set("c", 3, float("inf"), 1)
+
+        assert evicted == 1
+        assert backend.get("b") is None
+        assert backend.get("a") is not None
+
+    @allure.title("Дисковый кэш переживает новый клиент")
+    def test_disk_backend_survives(self, mock_api_server, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        endpoint = settings.PUBLIC_API_ENDPOINTS["POPULAR_SEARCHES"]
+
+        backend = DiskCacheBackend(path)
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                      cache=ResponseCache(backend=backend))
+        first = client.get_popular_searches()
+        backend.close()
+
+        cache = ResponseCache(backend=DiskCacheBackend(path))
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cache=cache)
+
+        assert client.get_popular_searches() == first
+        assert mock_api_server.requests == 1
+        assert cache.ttl_for(endpoint) == settings.CACHE_TTLS["POPULAR_SEARCHES"]
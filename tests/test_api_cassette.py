@@ -0,0 +1,77 @@
+"""
+Оффлайн тесты кассет API (запись против эмулятора API, воспроизведение без сети)
+"""
+import allure
+import pytest
+
+from api.base_client import ChitaiGorodAPIClient
+from api.cache import ResponseCache
+from api.cassette import Cassette, CassetteMissError, RECORD, REPLAY, cassette_path
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Кассеты")
+class TestCassette:
+
+    @allure.title("Записанная кассета воспроизводится без сервера")
+    def test_record_then_replay(self, mock_api_server, tmp_path):
+        path = str(tmp_path / "search.json.gz")
+        base_url = mock_api_server.base_url
+
+        recorder = Cassette(path, mode=RECORD)
+        client = ChitaiGorodAPIClient(use_auth=True, base_url=base_url, cassette=recorder)
+        recorded_search = client.search_products("Лев Толстой")
+        recorded_popular = client.get_popular_searches()
+        recorder.save()
+        mock_api_server.stop()
+
+        player = Cassette(path, mode=REPLAY)
+        client = ChitaiGorodAPIClient(use_auth=True, base_url=base_url, cassette=player)
+
+        assert client.search_products("Лев Толстой") == recorded_search
+        assert client.get_popular_searches() == recorded_popular
+        with open(path, "rb") as f:
+            assert b"Bearer" not in f.read()
+
+    @allure.title("Незаписанный запрос - понятная ошибка")
+    def test_replay_miss(self, mock_api_server, tmp_path):
+        path = str(tmp_path / "search.json.gz")
+        recorder = Cassette(path, mode=RECORD)
+        ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, cassette=recorder) \
+            .search_products("роман")
+        recorder.save()
+
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                      cassette=Cassette(path, mode=REPLAY))
+        with pytest.raises(CassetteMissError):
+            client.search_products("детектив")
+
+        with pytest.raises(CassetteMissError):
+            Cassette(str(tmp_path / "missing.json.gz"), mode=REPLAY)
+
+    @allure.title("POST с разными телами - разные записи кассеты")
+    def test_body_in_key(self, mock_api_server, tmp_path):
+        path = str(tmp_path / "cart.json.gz")
+        recorder = Cassette(path, mode=RECORD)
+        client = ChitaiGorodAPIClient(use_auth=True, base_url=mock_api_server.base_url, cassette=recorder)
+        assert client.add_to_cart(7)["ok"]
+        assert client.add_to_cart(10 ** 6) == {"ok": False, "status": 404}
+        recorder.save()
+        mock_api_server.stop()
+
+        client = ChitaiGorodAPIClient(use_auth=True, base_url=mock_api_server.base_url,
+                                      cassette=Cassette(path, mode=REPLAY))
+        # Порядок воспроизведения другой - ответ всё равно свой для каждого товара
+        assert client.add_to_cart(10 ** 6) == {"ok": False, "status": 404}
+        assert client.add_to_cart(7)["ok"]
+        with pytest.raises(CassetteMissError):
+            client.add_to_cart(8)
+        assert Cassette.make_key("POST", "/x", body={"id": 1, "n": 2}) == \
+            Cassette.make_key("POST", "/x", body={"n": 2, "id": 1})
+        # GET и запрос без тела - тот же ключ, что и в кэше ответов
+        assert Cassette.make_key("GET", "/x", {"a": 1}, body={"id": 1}) == ResponseCache.make_key("GET", "/x", {"a": 1})
+
+    @allure.title("Путь кассеты по nodeid теста")
+    def test_cassette_path(self):
+        path = cassette_path("tests/test_api.py::TestChitaiGorodAPI::test_search_tolstoy", "cassettes")
+        assert path.replace("\\", "/") == "cassettes/test_api/TestChitaiGorodAPI.test_search_tolstoy.json.gz"
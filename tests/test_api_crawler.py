@@ -0,0 +1,92 @@
+"""
+Оффлайн тесты инкрементального обхода каталога (против локального эмулятора API)
+"""
+import asyncio
+
+import allure
+import pytest
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.crawler import CatalogueStore, crawl
+from api.mock_server import MockApiServer
+
+
+class FailingPages:
+    """Клиент, у которого страницы из fail отвечают 503 (имитация прерванного обхода)"""
+
+    def __init__(self, client, fail):
+        self.client = client
+        self.fail = set(fail)
+        self.concurrency = client.concurrency
+        self.city_id = client.city_id
+
+    async def search_products(self, phrase, page=1, **kwargs):
+        if (phrase, page) in self.fail:
+            return {"ok": False, "status": 503}
+        return await self.client.search_products(phrase, page=page, **kwargs)
+
+
+@pytest.fixture
+def server():
+    server = MockApiServer(catalogue_size=200).start()
+    yield server
+    server.stop()
+
+
+def _crawl(server, store, phrases, fail=(), **kwargs):
+    async def run():
+        async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=server.base_url) as client:
+            return await crawl(FailingPages(client, fail), store, phrases, **kwargs)
+
+    return asyncio.run(run())
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Снимок каталога")
+class TestCrawler:
+
+    @allure.title("Все страницы фраз сохраняются, товары - по одному на id")
+    def test_first_crawl(self, server, tmp_path):
+        store = CatalogueStore(str(tmp_path / "catalogue.sqlite3"))
+
+        stats = _crawl(server, store, ["книга", "Толстой"], per_page=20)
+
+        assert stats.errors == [] and stats.pages_unchanged == 0
+        # 10 страниц "книга" + страницы "Толстой"; товары Толстого - те же id
+        assert stats.pages_fetched == stats.pages_changed > 10
+        assert store.count() == 200 == store.count(stats.crawl_id)
+        product = store.product("7")
+        assert product["id"] == "7" and isinstance(product["available"], bool) and product["price"] > 0
+        assert store.crawls()[-1][2] is not None
+
+    @allure.title("Повторный обход переписывает только изменившиеся страницы")
+    def test_only_changed_pages(self, server, tmp_path):
+        store = CatalogueStore(str(tmp_path / "catalogue.sqlite3"))
+        _crawl(server, store, ["книга"], per_page=20)
+
+        again = _crawl(server, store, ["книга"], per_page=20)
+        assert (again.pages_fetched, again.pages_changed, again.pages_unchanged) == (10, 0, 10)
+        assert store.count(again.crawl_id) == 200
+
+        server.catalogue.product(25)["price"] = 1  # цена одного товара изменилась
+        changed = _crawl(server, store, ["книга"], per_page=20)
+        assert (changed.pages_changed, changed.pages_unchanged) == (1, 9)
+        assert store.product("25")["price"] == 1
+        assert store.count(changed.crawl_id) == 200
+
+    @allure.title("Прерванный обход продолжается с несохранённых страниц")
+    def test_resume(self, server, tmp_path):
+        store = CatalogueStore(str(tmp_path / "catalogue.sqlite3"))
+
+        interrupted = _crawl(server, store, ["книга"], fail=[("книга", 3), ("книга", 7)], per_page=20)
+        assert interrupted.errors == [("книга", 3, 503), ("книга", 7, 503)]
+        assert store.crawls()[-1][2] is None
+
+        resumed = _crawl(server, store, ["книга"], per_page=20)
+        assert resumed.resumed and resumed.crawl_id == interrupted.crawl_id
+        assert (resumed.pages_skipped, resumed.pages_fetched) == (8, 2)
+        assert store.count(resumed.crawl_id) == 200
+        assert store.crawls()[-1][2] is not None
+
+        fresh = _crawl(server, store, ["книга"], per_page=20)
+        assert not fresh.resumed and fresh.pages_fetched == 10
@@ -0,0 +1,83 @@
+"""
+Оффлайн тесты фасетного поиска и обратного индекса (против локального эмулятора API)
+"""
+import asyncio
+import time
+
+import allure
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.base_client import ChitaiGorodAPIClient
+from api.facets import FacetIndex, build_facet_index
+from api.mock_server import MockApiServer
+
+
+def _build(base_url, phrase, **kwargs):
+    async def run():
+        async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=base_url) as client:
+            return await build_facet_index(client, phrase, **kwargs)
+
+    return asyncio.run(run())
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Фасетный поиск")
+class TestFacets:
+
+    @allure.title("Фасеты фразы со счётчиками и фильтр выдачи по значению")
+    def test_client_facets_and_filters(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        facets = client.get_facets("роман")
+        categories = next(f for f in facets["facets"] if f["name"] == "categories")
+        value = categories["values"][0]
+        filtered = client.search_products("роман", per_page=100, filters={"categories": value["id"]})
+
+        assert facets["ok"] and {f["name"] for f in facets["facets"]} == {"categories", "publishers"}
+        assert filtered["total"] == value["count"]
+        assert {b["category"] for b in filtered["books"]} == {value["title"]}
+
+    @allure.title("Индекс совпадает со счётчиками фасетов, страницы грузятся параллельно")
+    def test_index_matches_counts(self):
+        server = MockApiServer(latency=0.05, catalogue_size=200).start()
+        try:
+            started = time.perf_counter()
+            index = _build(server.base_url, "а", per_page=10)
+            elapsed = time.perf_counter() - started
+            requests_made = server.requests
+        finally:
+            server.stop()
+
+        assert index.errors == [] and index.mismatches() == []
+        assert len(index) == 200
+        assert sum(index.counts("categories").values()) == 200
+        # 1 запрос фасетов + все страницы всех значений по 0.05 с: последовательно > 2 с
+        pages = sum(-(-count // 10) for facet in ("categories", "publishers")
+                    for count in index.counts(facet).values())
+        assert requests_made == 1 + pages
+        assert elapsed < requests_made * 0.05 / 2, f"Запросы шли последовательно: {elapsed:.2f} сек"
+
+    @allure.title("Комбинации фильтров считаются по индексу без запросов")
+    def test_query(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+        index = _build(mock_api_server.base_url, "роман", per_page=5)
+        requests_before = mock_api_server.requests
+
+        combined = index.query(categories=4, publishers=["1", 2])
+
+        assert mock_api_server.requests == requests_before
+        expected = set()
+        for publisher in (1, 2):
+            result = client.search_products("роман", per_page=100, filters={"categories": 4, "publishers": publisher})
+            expected |= {b["id"] for b in result["books"]}
+        assert combined == expected
+
+    @allure.title("Расхождение счётчика и выдачи попадает в mismatches")
+    def test_mismatches(self):
+        index = FacetIndex()
+        index.add("categories", 1, ["1", "2"], expected=2)
+        index.add("categories", 2, ["3"], expected=5)
+
+        assert index.mismatches() == [("categories", "2", 5, 1)]
+        assert index.query() == {"1", "2", "3"}
+        assert index.query(categories=[1, 2], publishers=9) == set()
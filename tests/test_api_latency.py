@@ -0,0 +1,96 @@
+"""
+Оффлайн тесты истории задержек API: запись из _request и поиск регрессий
+"""
+import allure
+
+from api.base_client import ChitaiGorodAPIClient
+from api.cache import ResponseCache
+from api.latency import LatencyStore, query_key
+from config import settings
+
+SEARCH = settings.PUBLIC_API_ENDPOINTS["SEARCH_PRODUCT"]
+POPULAR = settings.PUBLIC_API_ENDPOINTS["POPULAR_SEARCHES"]
+
+
+def _fill(store_path, runs):
+    """runs: [{(эндпоинт, фраза): [задержки, мс]}] - по прогону на элемент"""
+    run_ids = []
+    for i, samples in enumerate(runs):
+        store = LatencyStore(store_path, run_id=f"run-{i:02d}")
+        for (endpoint, phrase), values in samples.items():
+            for value in values:
+                store.record("GET", endpoint, {"phrase": phrase}, 200, value / 1000, 1000)
+        store.close()
+        run_ids.append(store.run_id)
+    return run_ids
+
+
+@allure.epic("Читай-город API")
+@allure.feature("История задержек")
+class TestLatencyStore:
+
+    @allure.title("Сетевые запросы пишутся в историю, ответы из кэша - нет")
+    def test_records_network_requests(self, mock_api_server, tmp_path):
+        store = LatencyStore(str(tmp_path / "latency.sqlite3"))
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                      cache=ResponseCache(), latency=store)
+
+        client.search_products("Лев Толстой")
+        client.search_products("Лев Толстой")
+        client.get_popular_searches()
+        store.flush()
+
+        rows = store._conn.execute("SELECT endpoint, query, status, latency_ms, bytes FROM samples").fetchall()
+        store.close()
+        assert sorted(r[0] for r in rows) == sorted([SEARCH, POPULAR])
+        search = next(r for r in rows if r[0] == SEARCH)
+        assert "phrase=" in search[1] and search[2] == 200
+        assert search[3] > 0 and search[4] > 0
+
+    @allure.title("Замедление поиска выше порога MAD - регрессия")
+    def test_detects_regression(self, tmp_path):
+        path = str(tmp_path / "latency.sqlite3")
+        baseline = [{(SEARCH, "роман"): [100 + i, 102 + i, 98 + i], (POPULAR, ""): [50, 52]} for i in range(6)]
+        _fill(path, baseline + [{(SEARCH, "роман"): [180, 190, 185], (POPULAR, ""): [51, 53]}])
+
+        store = LatencyStore(path)
+        regressions = store.compare(metrics=("latency_ms",))
+        store.close()
+
+        assert [(r["endpoint"], r["query"]) for r in regressions] == [(SEARCH, query_key({"phrase": "роман"}))]
+        assert regressions[0]["current"] == 185
+        assert regressions[0]["baseline_runs"] == 6
+
+    @allure.title("Шум в пределах разброса базовой линии - не регрессия")
+    def test_noise_is_not_regression(self, tmp_path):
+        path = str(tmp_path / "latency.sqlite3")
+        noisy = [80, 140, 95, 130, 90, 150, 85]
+        _fill(path, [{(SEARCH, "роман"): [v]} for v in noisy] + [{(SEARCH, "роман"): [155]}])
+
+        store = LatencyStore(path)
+        regressions = store.compare()
+        store.close()
+        assert regressions == []
+
+    @allure.title("Мало истории - ряд не проверяется")
+    def test_needs_baseline(self, tmp_path):
+        path = str(tmp_path / "latency.sqlite3")
+        _fill(path, [{(SEARCH, "роман"): [100]}] * 3 + [{(SEARCH, "роман"): [1000]}])
+
+        store = LatencyStore(path)
+        default, short = store.compare(), store.compare(min_runs=3)
+        store.close()
+        assert default == []
+        assert short
+
+    @allure.title("Сравнение по эндпоинтам целиком")
+    def test_by_endpoint(self, tmp_path):
+        path = str(tmp_path / "latency.sqlite3")
+        _fill(path, [{(SEARCH, "a"): [100], (SEARCH, "b"): [120]}] * 5
+              + [{(SEARCH, "a"): [300], (SEARCH, "b"): [320]}])
+
+        store = LatencyStore(path)
+        regressions = store.compare(per_query=False)
+        store.close()
+
+        assert [(r["endpoint"], r["query"], r["metric"]) for r in regressions] == [(SEARCH, "", "latency_ms")]
@@ -0,0 +1,52 @@
+"""
+Оффлайн тесты нагрузочного прогона (против эмулятора API)
+"""
+import allure
+
+from api.histogram import LatencyHistogram
+from api.load_test import LoadTestRunner, QueryMix
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Нагрузочный прогон")
+class TestLoadTest:
+
+    @allure.title("Перцентили гистограммы с точностью ~1%")
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        assert abs(histogram.percentile(50) - 500) <= 5
+        assert abs(histogram.percentile(99) - 990) <= 10
+        assert histogram.percentile(100) == 1000
+
+        other = LatencyHistogram()
+        other.record(2.0)
+        histogram.merge(other)
+        assert histogram.total == 1001 and histogram.max == 2_000_000
+
+    @allure.title("Фразы с весами из командной строки")
+    def test_query_mix_parse(self):
+        mix = QueryMix.parse(["Лев Толстой:3", "детектив", "10:15:2"])
+        assert list(zip(mix.phrases, mix.weights)) == [("Лев Толстой", 3), ("детектив", 1), ("10:15", 2)]
+
+    @allure.title("Закрытая модель: отчёт и разбивка ошибок")
+    def test_closed_loop_report(self, mock_api_server):
+        mock_api_server.error_rate = 0.3
+        runner = LoadTestRunner(QueryMix([("книга", 1), ("Толстой", 1)], seed=1),
+                                duration=0.5, concurrency=4, base_url=mock_api_server.base_url)
+        report = runner.run()
+
+        assert report["requests"] == report["success"] + sum(report["errors"].values())
+        assert report["success"] > 0 and set(report["errors"]) == {"500"}
+        assert report["latency"]["p50_ms"] <= report["latency"]["p99.9_ms"]
+        assert report["throughput_rps"] > 0
+
+    @allure.title("Открытая модель держит целевой RPS")
+    def test_open_loop_rps(self, mock_api_server):
+        report = LoadTestRunner(QueryMix([("книга", 1)]), duration=1.0, concurrency=4, rps=50,
+                                base_url=mock_api_server.base_url).run()
+
+        assert report["mode"] == "open"
+        assert 40 <= report["requests"] <= 50
@@ -0,0 +1,82 @@
+"""
+Оффлайн тесты эмулятора API
+"""
+import gc
+import weakref
+
+import allure
+import requests
+
+from api.base_client import ChitaiGorodAPIClient
+from api.mock_server import Catalogue
+from api.transport import Transport
+from config import settings
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Эмулятор API")
+class TestMockApiServer:
+
+    @allure.title("Поиск возвращает JSON:API, понятный адаптеру")
+    def test_search_is_adaptable(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+        result = client.search_products("Лев Толстой")
+
+        assert result["ok"]
+        assert result["total"] == 3
+        assert all("Толстой" in book["author"] for book in result["books"])
+        assert client.search_products("абвгдеёжзийклмнопрстуфхцчшщъыьэюя123")["found"] == 0
+
+    @allure.title("Популярные запросы")
+    def test_popular(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+        assert client.get_popular_searches()["count"] > 0
+
+    @allure.title("Защищённые эндпоинты требуют токен")
+    def test_protected_requires_auth(self, mock_api_server):
+        url = mock_api_server.base_url + settings.PROTECTED_API_ENDPOINTS["CART_SHORT"]
+
+        assert requests.get(url).status_code == 401
+        assert requests.get(url, headers={"Authorization": "Bearer x"}).status_code == 200
+
+    @allure.title("Доля ошибок настраивается")
+    def test_error_rate(self, mock_api_server):
+        mock_api_server.error_rate = 1.0
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                      transport=Transport(retries=0))
+
+        assert client.search_products("книга") == {"ok": False, "status": 500}
+
+    @allure.title("Корзина через API: добавить, посмотреть, очистить")
+    def test_cart(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=True, base_url=mock_api_server.base_url)
+
+        assert client.add_to_cart("7")["ok"]
+        assert client.add_to_cart(7)["ok"]
+        assert client.get_cart_short()["quantity"] == 2
+        assert client.clear_cart() == {"ok": True}
+        assert client.get_cart_short()["quantity"] == 0
+        assert client.add_to_cart(10 ** 6) == {"ok": False, "status": 404}
+        assert ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) \
+            .get_cart_short() == {"ok": False, "status": 401}
+
+    @allure.title("Нечисловые параметры - ответ 400 в формате JSON:API, а не обрыв соединения")
+    def test_bad_params(self, mock_api_server):
+        url = mock_api_server.base_url + settings.PUBLIC_API_ENDPOINTS["SEARCH_PRODUCT"]
+
+        response = requests.get(url, params={"phrase": "книга", "products[page]": "abc"})
+        assert response.status_code == 400
+        assert response.json()["title"] == "Bad Request"
+        assert requests.get(url, params={"phrase": "книга", "products[per-page]": "x"}).status_code == 400
+
+    @allure.title("Кэши каталога свои у каждого экземпляра и не держат старые каталоги")
+    def test_catalogue_cache_per_instance(self):
+        first, second = Catalogue(10), Catalogue(10)
+        first.product(1)["price"] = 1
+        assert second.product(1)["price"] != 1
+        assert first.match("книга") == second.match("книга")
+
+        ref = weakref.ref(first)
+        del first
+        gc.collect()
+        assert ref() is None
@@ -0,0 +1,35 @@
+"""
+Оффлайн тесты постраничного обхода выдачи (против локального эмулятора API)
+"""
+import allure
+
+from api.base_client import ChitaiGorodAPIClient
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Постраничный обход")
+class TestIterSearch:
+
+    @allure.title("iter_search отдаёт всю выдачу без дублей")
+    def test_iter_search_walks_all_pages(self, mock_api_server):
+        mock_api_server.catalogue_size = 45
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        ids = [book["id"] for book in client.iter_search("книга", per_page=10)]
+
+        assert ids == [str(i) for i in range(1, 46)]
+        assert mock_api_server.requests == 5
+
+    @allure.title("iter_search ленивый и уважает max_pages")
+    def test_iter_search_is_lazy(self, mock_api_server):
+        mock_api_server.catalogue_size = 1000
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        books = client.iter_search("книга", per_page=10, max_pages=3)
+        first = next(books)
+        books.close()
+
+        assert first["id"] == "1"
+        # Первая страница + не более одной предзагруженной
+        assert mock_api_server.requests <= 2
+        assert len(list(client.iter_search("книга", per_page=10, max_pages=3))) == 30
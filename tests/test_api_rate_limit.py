@@ -0,0 +1,169 @@
+"""
+Оффлайн тесты лимита частоты запросов: token bucket, потоки, asyncio, процессы, 429
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import allure
+
+from api.base_client import ChitaiGorodAPIClient
+from api.latency import LatencyStore
+from api.mock_server import MockApiServer
+from api.rate_limit import RateLimiter
+from api.transport import Transport
+from config import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH = settings.PUBLIC_API_ENDPOINTS["SEARCH_PRODUCT"]
+POPULAR = settings.PUBLIC_API_ENDPOINTS["POPULAR_SEARCHES"]
+
+
+class FakeClock:
+    """Часы и sleep без реального ожидания"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Лимит частоты запросов")
+class TestRateLimiter:
+
+    @allure.title("Burst без ожидания, дальше - строго по rate; общий лимит и лимит эндпоинта")
+    def test_token_bucket(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"*": (10, 5), "SEARCH_PRODUCT": (2, 2)}, sleep=clock.sleep, clock=clock)
+
+        waits = [limiter.reserve(SEARCH) for _ in range(4)]
+        assert waits == [0, 0, 0.5, 1.0]
+        # Популярные запросы упираются только в общий лимит: 1 токен из 5 ещё есть
+        assert limiter.reserve(POPULAR) == 0
+        assert limiter.reserve(POPULAR) > 0
+        assert RateLimiter({"SEARCH_PRODUCT": (1, 1)}).reserve(POPULAR) == 0
+
+        clock.now += 10
+        assert limiter.acquire(SEARCH) == 0
+        assert limiter.summary()["total"]["requests"] == 1
+
+    @allure.title("429 ставит эндпоинт на паузу для всех, а не только для повтора")
+    def test_penalize(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"*": (10, 10), "SEARCH_PRODUCT": (10, 10)}, sleep=clock.sleep, clock=clock)
+
+        assert limiter.penalize(SEARCH, 2.0)
+        assert limiter.reserve(SEARCH) >= 2.0
+        # Общая корзина не на паузе - другие эндпоинты не ждут
+        assert limiter.reserve(POPULAR) == 0.0
+        assert not limiter.penalize(POPULAR, 2.0)
+
+    @allure.title("Потоки и задачи asyncio вместе не превышают лимит")
+    def test_threads_and_asyncio(self):
+        limiter = RateLimiter({"*": (50, 1)})
+        stamps = []
+
+        def worker():
+            for _ in range(5):
+                limiter.acquire(SEARCH)
+                stamps.append(time.monotonic())
+
+        async def tasks():
+            # Как AsyncChitaiGorodAPIClient: запрос с лимитом уходит в поток
+            async def one():
+                await asyncio.to_thread(limiter.acquire, SEARCH)
+                stamps.append(time.monotonic())
+            await asyncio.gather(*(one() for _ in range(10)))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        asyncio.run(tasks())
+        for thread in threads:
+            thread.join()
+
+        # 30 разрешений при 50/с и burst 1: не быстрее 29 / 50 с
+        assert len(stamps) == 30
+        assert max(stamps) - started >= 29 / 50 * 0.95
+        summary = limiter.summary()[SEARCH]
+        assert summary["requests"] == 30 and summary["delayed"] >= 25
+        assert summary["wait"]["max_ms"] > 0
+
+    @allure.title("Процессы с общим файлом состояния делят один лимит")
+    def test_processes_share_file_backend(self, tmp_path):
+        script = (
+            "import sys; from api.rate_limit import FileBackend, RateLimiter\n"
+            "limiter = RateLimiter({'*': (40, 1)}, backend=FileBackend(sys.argv[1]))\n"
+            "for _ in range(10): limiter.acquire('/x')\n"
+        )
+        state = str(tmp_path / "rate_limit.json")
+        started = time.monotonic()
+        processes = [subprocess.Popen([sys.executable, "-c", script, state],
+                                      env={**os.environ, "PYTHONPATH": ROOT}) for _ in range(3)]
+        for process in processes:
+            assert process.wait(timeout=60) == 0
+        elapsed = time.monotonic() - started
+
+        # 30 разрешений при 40/с на всех: каждый процесс в одиночку уложился бы в 0.25 с
+        assert elapsed >= 29 / 40 * 0.95, f"Процессы не делили лимит: {elapsed:.2f} сек"
+
+    @allure.title("Transport берёт разрешение перед каждым запросом клиента")
+    def test_transport(self, mock_api_server):
+        limiter = RateLimiter({"SEARCH_PRODUCT": (20, 1)})
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                      transport=Transport(rate_limiter=limiter))
+
+        started = time.monotonic()
+        for _ in range(6):
+            assert client.search_products("книга")["ok"]
+        client.get_popular_searches()
+        elapsed = time.monotonic() - started
+
+        assert elapsed >= 5 / 20 * 0.95
+        summary = limiter.summary()
+        assert summary[SEARCH]["requests"] == 6 and summary[SEARCH]["delayed"] == 5
+        assert summary[POPULAR]["delayed"] == 0 and summary["total"]["requests"] == 7
+
+    @allure.title("Ожидание лимита не попадает в историю задержек API")
+    def test_latency_excludes_wait(self, mock_api_server, tmp_path):
+        store = LatencyStore(str(tmp_path / "latency.sqlite3"))
+        limiter = RateLimiter({"SEARCH_PRODUCT": (5, 1)})
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, latency=store,
+                                      transport=Transport(rate_limiter=limiter))
+
+        for _ in range(3):
+            client.search_products("книга")
+        store.flush()
+        latencies = [row[0] for row in store._conn.execute("SELECT latency_ms FROM samples")]
+        store.close()
+
+        # Запросы 2 и 3 ждали лимита по ~200 мс, а локальный сервер отвечает за единицы мс
+        assert limiter.summary()[SEARCH]["wait_total_s"] >= 0.3
+        assert len(latencies) == 3 and max(latencies) < 150
+
+    @allure.title("Повтор после 429 ждёт паузу из Retry-After в корзине")
+    def test_retry_after_429(self):
+        server = MockApiServer(error_rate=1.0, error_status=429, retry_after=1).start()
+        clock = FakeClock()
+        limiter = RateLimiter({"SEARCH_PRODUCT": (100, 100)}, sleep=clock.sleep, clock=clock)
+        transport = Transport(retries=1, failure_threshold=None, rate_limiter=limiter,
+                              sleep=lambda seconds: None)
+        try:
+            client = ChitaiGorodAPIClient(use_auth=False, base_url=server.base_url, transport=transport)
+            result = client.search_products("книга")
+        finally:
+            server.stop()
+
+        assert result == {"ok": False, "status": 429}
+        # Повтор дождался паузы в acquire, а следующий запрос любого потока тоже будет ждать
+        assert limiter.summary()[SEARCH]["wait_total_s"] >= 1.0
+        assert limiter.reserve(SEARCH) > 0.9
@@ -0,0 +1,99 @@
+"""
+Оффлайн тесты сравнения выдачи по городам (против локального эмулятора API)
+"""
+import asyncio
+import time
+
+import allure
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.base_client import ChitaiGorodAPIClient
+from api.mock_server import MockApiServer
+from api.regions import CityMatrix, compare_cities
+from config import settings
+
+CITIES = settings.TEST_DATA["CITIES"]
+
+
+def _compare(base_url, phrases, **kwargs):
+    async def run():
+        async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=base_url) as client:
+            return await compare_cities(client, phrases, **kwargs)
+
+    return asyncio.run(run())
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Регионы")
+class TestCityMatrix:
+
+    @allure.title("Город запроса передаётся в customerCityId, общий city_id не меняется")
+    def test_city_per_request(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        moscow = client.search_products("книга", per_page=30)
+        novosibirsk = client.search_products("книга", per_page=30, city_id=CITIES["Новосибирск"])
+
+        assert client.city_id == settings.DEFAULT_CITY_ID
+        assert [b["id"] for b in moscow["books"]] == [b["id"] for b in novosibirsk["books"]]
+        assert [(b["available"], b["price"]) for b in moscow["books"]] \
+            != [(b["available"], b["price"]) for b in novosibirsk["books"]]
+
+    @allure.title("Матрица по всем городам совпадает с последовательными запросами")
+    def test_matrix_matches_serial(self, mock_api_server):
+        matrix = _compare(mock_api_server.base_url, ["книга", "роман"], per_page=30)
+
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+        for column, (name, city_id) in enumerate(matrix.cities):
+            for phrase in ("книга", "роман"):
+                result = client.search_products(phrase, per_page=30, city_id=city_id)
+                assert matrix.totals[phrase][column] == result["total"]
+                for book in result["books"]:
+                    assert matrix.products[book["id"]][column] == (book["available"], book["price"])
+
+        assert [name for name, _ in matrix.cities] == list(CITIES)
+        assert matrix.errors == []
+        differences = matrix.differences()
+        assert differences and all("product_id" in d for d in differences)
+        assert {field for d in differences for field in d["fields"]} <= {"available", "price"}
+        assert "≠" in matrix.format_table()
+
+    @allure.title("Различия: наличие, цена, отсутствие в выдаче и total")
+    def test_differences(self):
+        matrix = CityMatrix([("A", 1), ("B", 2)])
+        book = {"id": "1", "title": "Книга", "available": True, "price": 100}
+        matrix.add("x", 0, {"ok": True, "total": 3, "books": [book, {**book, "id": "2"}, {**book, "id": "3"}]})
+        matrix.add("x", 1, {"ok": True, "total": 2, "books": [book, {**book, "id": "2", "price": 110}]})
+
+        differences = {d.get("product_id", d.get("phrase")): d["fields"] for d in matrix.differences()}
+
+        assert differences == {"2": ["price"], "3": ["missing"], "x": ["total"]}
+        assert matrix.as_dict()["products"]["3"] == [[True, 100], None]
+
+    @allure.title("Город с ошибкой и неполная выдача не дают ложного 'missing'")
+    def test_no_false_missing(self):
+        matrix = CityMatrix([("A", 1), ("B", 2)])
+        book = {"id": "1", "title": "Книга", "available": True, "price": 100}
+        # Выдача B не влезла в страницу - "2" могла оказаться на второй странице
+        matrix.add("x", 0, {"ok": True, "total": 5, "books": [book, {**book, "id": "2"}]})
+        matrix.add("x", 1, {"ok": True, "total": 5, "books": [book, {**book, "id": "3"}]})
+        matrix.add("y", 0, {"ok": True, "total": 1, "books": [{**book, "id": "4"}]})
+        matrix.add("y", 1, {"ok": False, "status": 503})
+
+        assert matrix.differences() == []
+        assert matrix.errors == [("y", "B", 503)]
+        assert matrix.windows == {"x": ["partial", "partial"], "y": ["full", "error"]}
+        assert "?" in matrix.format_table(only_differences=False)
+
+    @allure.title("Города запрашиваются параллельно, а не по очереди")
+    def test_concurrent(self):
+        server = MockApiServer(latency=0.1, catalogue_size=30).start()
+        try:
+            started = time.perf_counter()
+            matrix = _compare(server.base_url, ["книга", "роман", "детектив"])
+            elapsed = time.perf_counter() - started
+        finally:
+            server.stop()
+
+        assert server.requests == 9 and matrix.errors == []
+        assert elapsed < 9 * 0.1 / 2, f"Запросы шли последовательно: {elapsed:.2f} сек"
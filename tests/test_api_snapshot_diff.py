@@ -0,0 +1,123 @@
+"""
+Оффлайн тесты сравнения снимков каталога: слияние, внешняя сортировка, снимок из базы обхода
+"""
+import asyncio
+import io
+import json
+import random
+import tracemalloc
+
+import allure
+import pytest
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.crawler import CatalogueStore, crawl
+from api.snapshot_diff import (DEFAULT_KINDS, KINDS, diff, normalize, read_snapshot, read_store,
+                               sort_snapshot, write_report, write_snapshot)
+
+
+def book(product_id, price=100, discount=None, available=True, old_price=None):
+    return normalize({"id": product_id, "title": f"Книга {product_id}", "author": "Автор", "price": price,
+                      "old_price": old_price, "discount": discount, "available": available,
+                      "category": "Роман", "publisher": "АСТ", "rating": 4.5})
+
+
+def catalogue(size, seed=0):
+    """Поток строк снимка без списка в памяти: id по возрастанию, поля зависят от seed"""
+    rnd = random.Random(seed)
+    for i in range(size):
+        yield book(f"{i:08d}", price=rnd.randrange(100, 1000), discount=rnd.choice([None, 10]),
+                   available=rnd.random() < 0.8)
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Изменения каталога")
+class TestSnapshotDiff:
+
+    @allure.title("Снижение цены, новая скидка, смена наличия, появился и пропал")
+    def test_kinds(self):
+        old = [book("1", price=500), book("2", discount="10%"), book("3", available=False),
+               book("4", price=100), book("5")]
+        new = [book("1", price=400), book("2", discount="15%"), book("3", discount="5%"),
+               book("4", price=120, available=False), book("6")]
+
+        changes = list(diff(old, new, kinds=KINDS))
+
+        assert [(c["kind"], c["id"]) for c in changes] == [
+            ("price_drop", "1"), ("new_discount", "3"), ("became_available", "3"),
+            ("became_unavailable", "4"), ("removed", "5"), ("added", "6"),
+        ]
+        assert changes[0]["percent"] == 20.0
+        assert [c["kind"] for c in diff(old, new)] == [c["kind"] for c in changes if c["kind"] in DEFAULT_KINDS]
+        assert list(diff(old, new, kinds=["price_drop"], min_drop=25)) == []
+
+    @allure.title("CSV-снимок: запись, чтение и проверка порядка id")
+    def test_snapshot_roundtrip(self, tmp_path):
+        rows = [book("1", discount="15%", old_price=118), book("2", available=False)]
+        path = str(tmp_path / "snapshot.csv")
+
+        assert write_snapshot(rows, path) == 2
+        assert list(read_snapshot(path)) == rows
+
+        write_snapshot(reversed(rows), path)
+        with pytest.raises(ValueError, match="sort"):
+            list(read_snapshot(path))
+
+    @allure.title("Внешняя сортировка кусками: порядок по id, при повторе - последняя строка")
+    def test_external_sort(self, tmp_path):
+        rows = [book(str(i), price=i) for i in random.Random(1).sample(range(1000, 2000), 1000)]
+        src, dst = str(tmp_path / "unsorted.csv"), str(tmp_path / "sorted.csv")
+        write_snapshot(rows + [book("1500", price=1)], src)
+
+        assert sort_snapshot(src, dst, chunk_rows=64) == 1000
+        result = list(read_snapshot(dst))
+        assert [r[0] for r in result] == sorted(r[0] for r in rows)
+        assert next(r for r in result if r[0] == "1500")[3] == 1
+
+    @allure.title("Большие снимки сравниваются в ограниченной памяти")
+    def test_bounded_memory(self, tmp_path):
+        old_path, new_path = str(tmp_path / "old.csv"), str(tmp_path / "new.csv")
+        write_snapshot(catalogue(30_000, seed=1), old_path)
+        write_snapshot(catalogue(30_000, seed=2), new_path)
+
+        out = io.StringIO()
+        tracemalloc.start()
+        try:
+            counts = write_report(diff(read_snapshot(old_path), read_snapshot(new_path)), _Discard(out))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert sum(counts.values()) > 3_000
+        # Пик не зависит от размера снимков: только текущие строки и буферы файлов
+        assert peak < 2 * 1024 * 1024, f"Пик памяти {peak / 1024 / 1024:.1f} МБ"
+        first = json.loads(out.getvalue().splitlines()[0])
+        assert first["kind"] in DEFAULT_KINDS and first["id"] < "00001000"
+
+    @allure.title("Снимок из базы обхода сравнивается с CSV-снимком")
+    def test_store_snapshot(self, mock_api_server, tmp_path):
+        db, old_path = str(tmp_path / "catalogue.sqlite3"), str(tmp_path / "old.csv")
+
+        async def run():
+            async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) as client:
+                await crawl(client, CatalogueStore(db), ["книга"], per_page=10)
+
+        asyncio.run(run())
+        assert write_snapshot(read_store(db), old_path) == 30
+
+        mock_api_server.catalogue.product(7)["price"] = 1
+        asyncio.run(run())
+
+        changes = list(diff(read_snapshot(old_path), read_store(db)))
+        assert [(c["kind"], c["id"], c["new"]) for c in changes] == [("price_drop", "7", 1)]
+
+
+class _Discard:
+    """Пишет в out только первую строку отчёта - сам отчёт в памяти не копится"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, text):
+        if not self.out.tell():
+            self.out.write(text)
@@ -0,0 +1,92 @@
+"""
+Оффлайн тесты транспорта: повторы, Retry-After, circuit breaker
+"""
+import allure
+import pytest
+
+from api.base_client import ChitaiGorodAPIClient
+from api.transport import (CircuitBreaker, CircuitOpenError, RequestCancelled, SendGuard, Transport,
+                           parse_retry_after, send_guard)
+from config import settings
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Транспорт")
+class TestTransport:
+
+    @allure.title("GET повторяется на 5xx с растущей задержкой")
+    def test_retries_with_backoff(self, mock_api_server):
+        mock_api_server.error_rate = 1.0
+        delays = []
+        transport = Transport(retries=3, backoff=0.1, failure_threshold=None, sleep=delays.append)
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, transport=transport)
+
+        assert client.search_products("книга") == {"ok": False, "status": 500}
+        assert mock_api_server.requests == 4
+        assert [d <= 0.1 * 2 ** i for i, d in enumerate(delays)] == [True, True, True]
+
+    @allure.title("Retry-After важнее backoff")
+    def test_retry_after(self, mock_api_server):
+        mock_api_server.error_rate = 1.0
+        mock_api_server.error_status = 429
+        mock_api_server.retry_after = 2
+        delays = []
+        transport = Transport(retries=1, sleep=delays.append)
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, transport=transport)
+
+        assert client.search_products("книга")["status"] == 429
+        assert delays == [2.0]
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("мусор") is None
+
+    @allure.title("Circuit breaker отсекает запросы к упавшему эндпоинту")
+    def test_circuit_opens(self, mock_api_server):
+        mock_api_server.error_rate = 1.0
+        transport = Transport(retries=0, failure_threshold=3, reset_timeout=60)
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, transport=transport)
+
+        for _ in range(3):
+            client.search_products("книга")
+        with pytest.raises(CircuitOpenError):
+            client.search_products("книга")
+
+        assert mock_api_server.requests == 3
+        # Другой эндпоинт не затронут
+        mock_api_server.error_rate = 0.0
+        assert client.get_popular_searches()["ok"]
+
+    @allure.title("Half-open: один пробный запрос замыкает цепь")
+    def test_half_open(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert not breaker.allow()
+        now[0] = 10.0
+        assert breaker.allow() and not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    @allure.title("Размер пула соединений настраивается")
+    def test_pool_size(self):
+        client = ChitaiGorodAPIClient(use_auth=False, transport=Transport(pool_size=32))
+        assert client.session.get_adapter("https://x").poolmanager.connection_pool_kw["maxsize"] == 32
+
+    @allure.title("Отменённый до отправки запрос не уходит в сеть и не занимает пробу half-open")
+    def test_send_guard(self, mock_api_server):
+        transport = Transport(retries=0, failure_threshold=1, reset_timeout=0)
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url, transport=transport)
+        breaker = transport.breaker(settings.PUBLIC_API_ENDPOINTS["POPULAR_SEARCHES"])
+        breaker.record_failure()  # разомкнут, следующий запрос - проба half-open
+        guard = SendGuard()
+        assert guard.cancel()  # ещё не отправлен
+
+        token = send_guard.set(guard)
+        try:
+            with pytest.raises(RequestCancelled):
+                client.get_popular_searches()
+        finally:
+            send_guard.reset(token)
+
+        assert mock_api_server.requests == 0 and not guard.sent
+        assert breaker.allow()
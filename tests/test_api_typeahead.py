@@ -0,0 +1,105 @@
+"""
+Оффлайн тесты подсказок поиска при наборе (против локального эмулятора API)
+"""
+import asyncio
+
+import allure
+
+from api.async_client import AsyncChitaiGorodAPIClient
+from api.base_client import ChitaiGorodAPIClient
+from api.mock_server import MockApiServer
+from api.rate_limit import RateLimiter
+from api.transport import Transport
+from api.typeahead import Typeahead, benchmark
+
+
+def _type(base_url, phrase, interval, **kwargs):
+    async def run():
+        async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=base_url) as client:
+            typeahead = Typeahead(client, **kwargs)
+            return await typeahead.type(phrase, interval=interval), typeahead.stats
+
+    return asyncio.run(run())
+
+
+@allure.epic("Читай-город API")
+@allure.feature("Подсказки поиска")
+class TestTypeahead:
+
+    @allure.title("get_search_suggests возвращает фразы")
+    def test_client_suggests(self, mock_api_server):
+        client = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url)
+
+        result = client.get_search_suggests("толс")
+
+        assert result["ok"]
+        assert result["phrases"] and all("толс" in p.lower() for p in result["phrases"])
+
+    @allure.title("Быстрый набор: debounce оставляет один запрос")
+    def test_debounce(self, mock_api_server):
+        records, stats = _type(mock_api_server.base_url, "толстой", interval=0.0, debounce=0.1)
+
+        assert stats.requests == 1
+        assert [r["status"] for r in records[1:-1]] == ["debounced"] * 5
+        assert records[-1]["status"] == "network"
+
+    @allure.title("Полный список подсказок короткого префикса отвечает на длинные локально")
+    def test_prefix_reuse(self, mock_api_server):
+        expected = ChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url) \
+            .get_search_suggests("толстой")["phrases"]
+
+        records, stats = _type(mock_api_server.base_url, "толстой", interval=0.05, debounce=0.01)
+        _, no_reuse = _type(mock_api_server.base_url, "толстой", interval=0.05, debounce=0.01,
+                            reuse_prefixes=False)
+
+        assert records[-1]["suggests"] == expected
+        assert stats.prefix_hits > 0
+        assert stats.requests + stats.prefix_hits == no_reuse.requests
+        assert stats.as_dict()["requests_saved_by_prefix"] == stats.prefix_hits
+
+    @allure.title("Обрезанный список (limit подсказок) не переиспользуется")
+    def test_truncated_not_reused(self, mock_api_server):
+        records, stats = _type(mock_api_server.base_url, "толстой", interval=0.05, debounce=0.01, limit=1)
+
+        assert stats.prefix_hits == 0
+        assert stats.requests == len([r for r in records if r["status"] != "skipped"])
+
+    @allure.title("Новое нажатие отменяет устаревший запрос")
+    def test_cancel_stale(self):
+        server = MockApiServer(latency=0.2, catalogue_size=30).start()
+        try:
+            records, stats = _type(server.base_url, "толстой", interval=0.05, debounce=0.0,
+                                   reuse_prefixes=False)
+        finally:
+            server.stop()
+
+        assert stats.cancelled > 0
+        assert records[-1]["status"] == "network"
+        assert records[-1]["latency_ms"] >= 200
+
+    @allure.title("Устаревший запрос, не успевший уйти в сеть (ждал лимита), не отправляется")
+    def test_drop_unsent(self, mock_api_server):
+        limiter = RateLimiter({"SEARCH_SUGGESTS": (2, 1)})
+
+        async def run():
+            async with AsyncChitaiGorodAPIClient(use_auth=False, base_url=mock_api_server.base_url,
+                                                 transport=Transport(rate_limiter=limiter)) as client:
+                typeahead = Typeahead(client, debounce=0.0, reuse_prefixes=False)
+                return await typeahead.type("толстой", interval=0.1), typeahead.stats
+
+        records, stats = asyncio.run(run())
+
+        dropped = [r for r in records if r["status"] == "cancelled" and not r["sent"]]
+        assert dropped and stats.dropped_unsent == len(dropped)
+        assert records[-1]["status"] == "network"
+        assert stats.requests == mock_api_server.requests
+
+    @allure.title("Бенчмарк отчитывается задержкой по нажатиям и сэкономленными запросами")
+    def test_benchmark_report(self, mock_api_server):
+        report = asyncio.run(benchmark(["Толстой", "роман"], base_url=mock_api_server.base_url,
+                                       interval=0.02, debounce=0.01))
+
+        assert report["keystrokes"] == len("Толстой") + len("роман")
+        assert report["latency"]["count"] > 0
+        assert report["requests_saved_by_prefix"] > 0
+        assert report["requests"] == mock_api_server.requests
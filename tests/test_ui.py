@@ -2,7 +2,7 @@ import pytest
 import allure
 import time
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from pages import checks
 from pages.search_page import SearchPage
 from pages.product_page import ProductPage
 from pages.cart_page import CartPage
@@ -37,24 +37,21 @@ class TestCompletePurchaseFlow:
             # ВЫПОЛНЯЕМ поиск
             search_page.search_product("Лев Толстой Война и мир")
 
-            # ПРОВЕРКА 1: Поиск нашёл результаты с Толстым
-            page_text = driver.page_source
-            assert "Толстой" in page_text, "❌ Поиск не нашёл Толстого"
-            assert "Война" in page_text or "война" in page_text, "❌ Поиск не нашёл 'Война и мир'"
+            # ПРОВЕРКА 1: Поиск нашёл результаты с Толстым (в браузере, без page_source)
+            search_page.assert_in_page(
+                checks.text("Толстой", case=True, message="❌ Поиск не нашёл Толстого"),
+                checks.text("Война", "война", case=True, message="❌ Поиск не нашёл 'Война и мир'"),
+            )
 
-            # ПРОВЕРКА 2: Есть результаты поиска
-            try:
-                results = driver.find_elements(By.CSS_SELECTOR, ".product-card, .catalog-product")
-                assert len(results) > 0, "❌ Нет результатов поиска"
-                print(f"   ✅ Найдено результатов: {len(results)}")
-            except:
-                pass
+            # ПРОВЕРКА 2: Есть результаты поиска (как и раньше, не роняет тест)
+            results, = search_page.check(checks.count(SearchPage.SEARCH_RESULTS))
+            if results["ok"]:
+                print(f"   ✅ Найдено результатов: {results['count']}")
 
             print("   ✅ Поиск выполнен: 'Лев Толстой Война и мир'")
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            search_page.wait_for_settled()
 
         # ========== ШАГ 2: ВЫБОР КНИГИ ==========
         with allure.step("2. Выбор книги 'Война и мир'"):
@@ -70,10 +67,10 @@ class TestCompletePurchaseFlow:
             assert "/product/" in driver.current_url, "❌ Не на странице товара"
 
             # ПРОВЕРКА 2: Это нужная книга
+            keywords = ["война", "мир", "толстой"]
             product_title = driver.title.lower()
-            page_text = driver.page_source.lower()
-            assert any(keyword in product_title or keyword in page_text
-                       for keyword in ["война", "мир", "толстой"]), "❌ Не та книга выбрана"
+            assert any(keyword in product_title for keyword in keywords) \
+                or search_page.check(checks.text(*keywords))[0]["ok"], "❌ Не та книга выбрана"
 
             # ПРОВЕРКА 3: Страница изменилась (не та же самая)
             assert driver.title != search_title, "❌ Страница не изменилась после клика"
@@ -81,9 +78,8 @@ class TestCompletePurchaseFlow:
             print(f"   ✅ Карточка товара открыта")
             print(f"   📖 Заголовок: {driver.title[:50]}...")
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            search_page.wait_for_settled()
 
         # ========== ШАГ 3: ДОБАВЛЕНИЕ В КОРЗИНУ ==========
         with allure.step("3. Добавление товара в корзину"):
@@ -97,36 +93,28 @@ class TestCompletePurchaseFlow:
             # ДОБАВЛЯЕМ в корзину
             product_page.click_buy_button()
 
-            # ПРОВЕРКА 1: Кнопка изменилась (товар добавился)
-            try:
-                # Ищем кнопку с текстом "Оформить", "В корзине" и т.д.
-                buttons = driver.find_elements(By.TAG_NAME, "button")
-                button_texts = [btn.text.lower() for btn in buttons]
-
-                add_keywords = ["оформить", "корзин", "добавлен", "в корзине"]
-                added = any(any(keyword in text for keyword in add_keywords)
-                            for text in button_texts if text)
-
-                assert added, "❌ Кнопка не изменилась, товар не добавился"
+            # ПРОВЕРКА 1: Кнопка изменилась (товар добавился) - текст ищем только в кнопках
+            added, = product_page.check(
+                checks.text("оформить", "корзин", "добавлен", "в корзине"),
+                within=(By.TAG_NAME, "button"),
+            )
+            if added["ok"]:
                 print("   ✅ Товар добавлен в корзину (кнопка изменилась)")
-
-            except:
+            else:
                 # Альтернативная проверка: иконка корзины с количеством
-                try:
-                    cart_icons = driver.find_elements(By.CSS_SELECTOR, "[class*='cart'], [class*='basket']")
-                    if cart_icons:
-                        print("   ✅ Товар добавлен в корзину (иконка найдена)")
-                    else:
-                        print("   ⚠️ Не удалось проверить добавление")
-                except:
+                cart_icons, = product_page.check(
+                    checks.count((By.CSS_SELECTOR, "[class*='cart'], [class*='basket']"))
+                )
+                if cart_icons["ok"]:
+                    print("   ✅ Товар добавлен в корзину (иконка найдена)")
+                else:
                     print("   ⚠️ Не удалось проверить добавление")
 
             # ПРОВЕРКА 2: Страница не перезагрузилась с ошибкой
             assert driver.current_url == url_before, "❌ Страница перезагрузилась с ошибкой"
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            product_page.wait_for_settled()
 
         # ========== ШАГ 4: ПЕРЕХОД В КОРЗИНУ ==========
         with allure.step("4. Переход в корзину"):
@@ -142,9 +130,8 @@ class TestCompletePurchaseFlow:
             assert "cart" in driver.current_url.lower(), "❌ Не перешли в корзину"
 
             # ПРОВЕРКА 2: В корзине наш товар
-            page_text = driver.page_source.lower()
-            assert any(keyword in page_text for keyword in ["война", "толстой", "лев"]), \
-                "❌ В корзине не наш товар"
+            cart_page = CartPage(driver)
+            cart_page.assert_in_page(checks.text("война", "толстой", "лев", message="❌ В корзине не наш товар"))
 
             # ПРОВЕРКА 3: Мы ушли со страницы товара
             assert driver.current_url != product_url, "❌ Остались на странице товара"
@@ -152,50 +139,34 @@ class TestCompletePurchaseFlow:
             print("   ✅ Переход в корзину выполнен")
             print(f"   🛒 URL корзины: {driver.current_url}")
 
-            cart_page = CartPage(driver)
             cart_page.wait_for_page_load()
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            cart_page.wait_for_settled()
 
         # ========== ШАГ 5: УВЕЛИЧЕНИЕ КОЛИЧЕСТВА ==========
         with allure.step("5. Увеличение количества товара (+1)"):
             print("\n▶️ ШАГ 5: Увеличение количества (+1)")
 
             # ПРОВЕРКА 1: Получаем начальное количество
-            try:
-                # Ищем поле количества
-                quantity_inputs = driver.find_elements(
-                    By.CSS_SELECTOR, "input[type='number'], [class*='quantity'], [class*='input-number']"
-                )
-                if quantity_inputs:
-                    initial_quantity = quantity_inputs[0].get_attribute("value") or "1"
-                    print(f"   📊 Начальное количество: {initial_quantity}")
-            except:
-                pass
+            quantity, = cart_page.check(checks.attribute(CartPage.QUANTITY_INPUT, "value"))
+            if quantity["count"]:
+                initial_quantity = quantity["values"][0] or "1"
+                print(f"   📊 Начальное количество: {initial_quantity}")
 
             # УВЕЛИЧИВАЕМ количество
             cart_page.increase_quantity()
 
             # ПРОВЕРКА 2: Проверяем что кнопка сработала
             # (Если есть возможность проверить изменение количества)
-            try:
-                # Пробуем найти обновленное количество
-                time.sleep(0.5)
-                quantity_elements = driver.find_elements(
-                    By.XPATH, "//*[contains(text(), '2') or contains(@value, '2')]"
-                )
-                if quantity_elements:
-                    print("   ✅ Количество изменилось на 2")
-                else:
-                    print("   ✅ Кнопка '+' сработала")
-            except:
-                print("   ✅ Количество увеличено на +1")
+            quantity, = cart_page.check(checks.attribute(CartPage.QUANTITY_INPUT, "value", equals="2"))
+            if quantity["ok"]:
+                print("   ✅ Количество изменилось на 2")
+            else:
+                print("   ✅ Кнопка '+' сработала")
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            cart_page.wait_for_settled()
 
         # ========== ШАГ 6: УМЕНЬШЕНИЕ КОЛИЧЕСТВА ==========
         with allure.step("6. Уменьшение количества товара (-1)"):
@@ -206,21 +177,14 @@ class TestCompletePurchaseFlow:
 
             # ПРОВЕРКА: Кнопка сработала
             # (Проверяем что вернулось к 1)
-            try:
-                time.sleep(0.5)
-                quantity_elements = driver.find_elements(
-                    By.XPATH, "//*[contains(text(), '1') or contains(@value, '1')]"
-                )
-                if quantity_elements:
-                    print("   ✅ Количество вернулось к 1")
-                else:
-                    print("   ✅ Кнопка '-' сработала")
-            except:
-                print("   ✅ Количество уменьшено на -1")
+            quantity, = cart_page.check(checks.attribute(CartPage.QUANTITY_INPUT, "value", equals="1"))
+            if quantity["ok"]:
+                print("   ✅ Количество вернулось к 1")
+            else:
+                print("   ✅ Кнопка '-' сработала")
 
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            cart_page.wait_for_settled()
 
         # ========== ШАГ 7: ОЧИСТКА КОРЗИНЫ ==========
         with allure.step("7. Очистка корзины"):
@@ -233,15 +197,13 @@ class TestCompletePurchaseFlow:
             cart_page.clear_cart()
 
             # ПРОВЕРКА 1: Страница изменилась или есть сообщение
-            page_text = driver.page_source.lower()
-            cart_empty_indicators = [
-                "корзина пуста",
-                "ваша корзина пуста",
-                "пока здесь пусто",
-                "добавить товары"
-            ]
+            # (и сразу число оставшихся товаров - всё одним запросом в браузер)
+            cleared_message, cart_items = cart_page.check(
+                checks.text("корзина пуста", "ваша корзина пуста", "пока здесь пусто", "добавить товары"),
+                checks.count((By.CSS_SELECTOR, ".cart-item, [class*='item'], .product-row"), min=0, max=0),
+            )
 
-            cart_cleared = any(indicator in page_text for indicator in cart_empty_indicators)
+            cart_cleared = cleared_message["ok"]
 
             # ПРОВЕРКА 2: Или URL изменился (вернулись в каталог)
             url_changed = driver.current_url != cart_url
@@ -253,20 +215,13 @@ class TestCompletePurchaseFlow:
                     print("   ✅ Корзина очищена (URL изменился)")
             else:
                 # Проверяем отсутствие товаров
-                try:
-                    cart_items = driver.find_elements(
-                        By.CSS_SELECTOR, ".cart-item, [class*='item'], .product-row"
-                    )
-                    if len(cart_items) == 0:
-                        print("   ✅ Корзина очищена (нет товаров)")
-                    else:
-                        print("   ⚠️ Корзина может быть не очищена")
-                except:
-                    print("   ✅ Кнопка очистки нажата")
-
-            # Пауза
-            start = time.time()
-            WebDriverWait(driver, 2).until(lambda d: time.time() - start >= 1)
+                if cart_items["ok"]:
+                    print("   ✅ Корзина очищена (нет товаров)")
+                else:
+                    print("   ⚠️ Корзина может быть не очищена")
+
+            # Ждём, пока страница успокоится (без фиксированной паузы)
+            cart_page.wait_for_settled()
 
         # ========== ФИНАЛЬНАЯ СТАТИСТИКА ==========
         execution_time = time.time() - start_time
@@ -280,4 +235,36 @@ class TestCompletePurchaseFlow:
 
         # Финальная проверка: сайт всё ещё работает
         assert "chitai-gorod.ru" in driver.current_url, "❌ Сайт недоступен"
-        assert driver.execute_script("return document.readyState") == "complete", "❌ Страница не загружена"
\ No newline at end of file
+        assert driver.execute_script("return document.readyState") == "complete", "❌ Страница не загружена"
+
+
+@allure.epic("Читай-город")
+@allure.feature("Корзина")
+class TestSeededCart:
+    """Корзина, подготовленная через API - без поиска и кликов 'Купить'"""
+
+    @allure.story("Корзина из API")
+    @allure.title("Товар в корзине через API → +1 → -1 → Очистка")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_seeded_cart_quantity_and_clear(self, seeded_cart):
+        """Управление количеством и очистка на заранее заполненной корзине"""
+        with allure.step("1. Корзина с товаром (через API)"):
+            print("\n▶️ ШАГ 1: Корзина с товаром через API")
+            cart_page = seeded_cart()
+            assert "cart" in cart_page.driver.current_url.lower(), "❌ Не открылась корзина"
+            print("   ✅ Корзина открыта с товаром")
+
+        with allure.step("2. Увеличение количества (+1)"):
+            print("\n▶️ ШАГ 2: Увеличение количества (+1)")
+            assert cart_page.increase_quantity(), "❌ Кнопка '+' не сработала"
+            print("   ✅ Количество увеличено")
+
+        with allure.step("3. Уменьшение количества (-1)"):
+            print("\n▶️ ШАГ 3: Уменьшение количества (-1)")
+            assert cart_page.decrease_quantity(), "❌ Кнопка '-' не сработала"
+            print("   ✅ Количество уменьшено")
+
+        with allure.step("4. Очистка корзины"):
+            print("\n▶️ ШАГ 4: Очистка корзины")
+            assert cart_page.clear_cart(), "❌ Корзина не очищена"
+            print("   ✅ Корзина очищена")
@@ -0,0 +1,76 @@
+"""
+Тесты проверок страницы в браузере: аргументы скрипта, контейнер, сообщения
+"""
+import allure
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages import checks
+from pages.base_page import BasePage
+
+
+class FakeDriver:
+    """Возвращает заданный результат CHECK_SCRIPT и запоминает аргументы"""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        self.calls.append(args)
+        return self.results
+
+
+class DemoPage(BasePage):
+    pass
+
+
+@allure.epic("Читай-город")
+@allure.feature("Проверки в браузере")
+class TestChecks:
+
+    @allure.title("Все проверки уходят в браузер одним вызовом")
+    def test_single_call(self):
+        driver = FakeDriver([{"ok": True, "matched": ["война"]}, {"ok": True, "count": 3}])
+
+        results = DemoPage(driver).check(
+            checks.text("Война", "мир"),
+            checks.count((By.CSS_SELECTOR, ".product-card")),
+            within=(By.XPATH, "//main"),
+        )
+
+        assert [r["ok"] for r in results] == [True, True]
+        (script_checks, scope), = driver.calls
+        assert scope == ["xpath", "//main"]
+        assert script_checks[0] == {"kind": "text", "needles": ["Война", "мир"], "all": False, "case": False}
+        assert script_checks[1]["locator"] == ["css", ".product-card"]
+        assert all("message" not in c for c in script_checks)
+
+    @allure.title("Контейнер не найден - все проверки не прошли")
+    def test_missing_scope(self):
+        results = DemoPage(FakeDriver(None)).check(checks.text("a"), checks.text("b"),
+                                                   within=(By.CSS_SELECTOR, ".cart-page"))
+        assert [r["ok"] for r in results] == [False, False]
+        assert ".cart-page" in results[0]["error"]
+
+    @allure.title("assert_in_page собирает сообщения всех непрошедших проверок")
+    def test_assert_messages(self):
+        driver = FakeDriver([{"ok": False, "matched": []}, {"ok": True, "count": 1},
+                             {"ok": False, "count": 0, "values": []}])
+
+        with pytest.raises(AssertionError) as error:
+            DemoPage(driver).assert_in_page(
+                checks.text("Толстой", message="❌ Нет Толстого"),
+                checks.count((By.TAG_NAME, "button")),
+                checks.attribute((By.CSS_SELECTOR, "input"), "value", equals="2"),
+            )
+
+        message = str(error.value)
+        assert "❌ Нет Толстого" in message
+        assert "input с value=2" in message
+        assert "button" not in message
+
+    @allure.title("Поддерживаются только CSS, XPath и тег")
+    def test_unsupported_locator(self):
+        with pytest.raises(ValueError):
+            DemoPage(FakeDriver([])).check(checks.count((By.ID, "cart")))
@@ -0,0 +1,72 @@
+"""
+Тесты пула браузеров на заглушках WebDriver (без Chrome)
+"""
+import allure
+
+from support.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.resets = 0
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def fake_reset(driver):
+    driver.resets += 1
+
+
+@allure.epic("Читай-город")
+@allure.feature("Пул браузеров")
+class TestDriverPool:
+
+    @allure.title("Браузер переиспользуется между тестами")
+    def test_reuse(self):
+        pool = DriverPool(size=1, factory=FakeDriver, reset=fake_reset)
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+
+        assert second is first
+        assert first.resets == 1 and pool.launches == 1
+
+    @allure.title("Упавший браузер заменяется")
+    def test_crashed_replaced(self):
+        pool = DriverPool(size=1, factory=FakeDriver, reset=fake_reset)
+
+        first = pool.acquire()
+        pool.release(first)
+        first.alive = False
+        second = pool.acquire()
+
+        assert second is not first and first.quit_called
+        assert pool.launches == 2
+
+    @allure.title("Ошибка сброса - браузер не возвращается в пул")
+    def test_failed_reset(self):
+        pool = DriverPool(size=1, factory=FakeDriver, reset=fake_reset)
+        pool.reset_hooks.append(lambda d: 1 / 0)
+
+        first = pool.acquire()
+        pool.release(first)
+
+        assert first.quit_called
+        assert pool.acquire() is not first
+
+    @allure.title("Закрытие пула завершает все браузеры")
+    def test_close(self):
+        pool = DriverPool(size=2, factory=FakeDriver, reset=fake_reset)
+        drivers = [pool.acquire(), pool.acquire()]
+        pool.close()
+
+        assert all(d.quit_called for d in drivers)
@@ -0,0 +1,55 @@
+"""
+Тесты облегчённого профиля браузера на заглушках (без Chrome)
+"""
+import json
+
+import allure
+import pytest
+
+from support.lean_browser import LeanProfile, traffic_report
+
+
+class FakeLogDriver:
+    def __init__(self, events):
+        self.events = events
+
+    def get_log(self, kind):
+        events, self.events = self.events, []
+        return [{"message": json.dumps({"message": e})} for e in events]
+
+
+@allure.epic("Читай-город")
+@allure.feature("Облегчённый браузер")
+class TestLeanBrowser:
+
+    @allure.title("Шаблоны блокировки: типы и домены, allow-list важнее")
+    def test_patterns(self):
+        profile = LeanProfile(blocked_types=["Font"],
+                              blocked_domains=["mc.yandex.ru", "cdn.chitai-gorod.ru"],
+                              allowed_domains=["chitai-gorod.ru"])
+        patterns = profile.patterns()
+
+        assert "*.woff*" in patterns and "*.png*" not in patterns
+        assert "*://mc.yandex.ru/*" in patterns
+        assert not any("chitai-gorod" in p for p in patterns)
+
+        with pytest.raises(ValueError):
+            LeanProfile(blocked_types=["Картинки"])
+
+    @allure.title("Отчёт о трафике по performance-логу")
+    def test_traffic_report(self):
+        driver = FakeLogDriver([
+            {"method": "Network.requestWillBeSent", "params": {"requestId": "1", "type": "Document"}},
+            {"method": "Network.loadingFinished", "params": {"requestId": "1", "encodedDataLength": 2048}},
+            {"method": "Network.requestWillBeSent", "params": {"requestId": "2", "type": "Image"}},
+            {"method": "Network.loadingFailed", "params": {"requestId": "2", "blockedReason": "inspector"}},
+            {"method": "Network.loadingFailed", "params": {"requestId": "3", "type": "Font",
+                                                           "blockedReason": "inspector"}},
+        ])
+
+        report = traffic_report(driver)
+
+        assert report["transferred_bytes"] == 2048 and report["requests"] == 1
+        assert report["blocked_requests"] == {"Font": 1, "Image": 1}
+        assert report["estimated_saved_bytes"] == 100_000
+        assert traffic_report(driver)["requests"] == 0
@@ -0,0 +1,107 @@
+"""
+Тесты поиска по запасным селекторам: один вызов скрипта, порядок приоритета, отчёт
+"""
+import allure
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from pages import base_page
+from pages.base_page import BasePage
+from pages.locators import LocatorReport, first_located
+
+CANDIDATES = [
+    (By.CSS_SELECTOR, "button.missing"),
+    (By.XPATH, "//button[contains(., 'Купить')]"),
+    (By.XPATH, "//button[contains(., 'В корзину')]"),
+]
+
+
+class FakeElement:
+    def __init__(self):
+        self.clicks = 0
+
+    def click(self):
+        self.clicks += 1
+
+
+class FakeDriver:
+    """Страница, на которой есть только элементы по селекторам из present"""
+
+    def __init__(self, present):
+        self.present = set(present)
+        self.element = FakeElement()
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        if "candidates" not in script:  # проверка успокоения страницы
+            return {"readyState": "complete", "hydrated": True, "inflight": 0,
+                    "networkQuietMs": 10_000, "domQuietMs": 10_000}
+        candidates, _clickable = args
+        self.scripts.append([value for _, value in candidates])
+        for i, (_, value) in enumerate(candidates):
+            if value in self.present:
+                return [i, self.element]
+        return None
+
+
+class DemoPage(BasePage):
+    pass
+
+
+@pytest.fixture
+def report(tmp_path, monkeypatch):
+    report = LocatorReport(str(tmp_path / "locators.json"))
+    monkeypatch.setattr(base_page, "locator_report", report)
+    return report
+
+
+@allure.epic("Читай-город")
+@allure.feature("Запасные селекторы")
+class TestLocators:
+
+    @allure.title("Все кандидаты проверяются за один вызов скрипта")
+    def test_single_round_trip(self, report):
+        driver = FakeDriver(present=[CANDIDATES[2][1]])
+
+        locator, element = DemoPage(driver).click_first("buy", CANDIDATES, description="Купить")
+
+        assert locator == CANDIDATES[2]
+        assert element.clicks == 1
+        assert len(driver.scripts) == 1
+
+    @allure.title("Порядок приоритета не меняется: сработавший селектор только пишется в отчёт")
+    def test_declared_order(self, report):
+        DemoPage(FakeDriver(present=[CANDIDATES[2][1]])).find_first("buy", CANDIDATES)
+        assert LocatorReport(report.path).winner("DemoPage.buy") == "xpath=//button[contains(., 'В корзину')]"
+
+        # Запасной селектор сработал раньше, но основной снова есть на странице - выбирается он
+        driver = FakeDriver(present=[CANDIDATES[1][1], CANDIDATES[2][1]])
+        locator, _ = DemoPage(driver).find_first("buy", CANDIDATES)
+        assert locator == CANDIDATES[1]
+        assert driver.scripts[0] == [value for _, value in CANDIDATES]
+        assert report.winner("DemoPage.buy") == "xpath=//button[contains(., 'Купить')]"
+
+    @allure.title("Запись отчёта не затирает записи других процессов")
+    def test_merge_on_write(self, tmp_path):
+        path = str(tmp_path / "locators.json")
+        first, second = LocatorReport(path), LocatorReport(path)
+
+        first.remember("SearchPage.first_book", CANDIDATES[0])
+        second.remember("CartPage.clear_button", CANDIDATES[1])
+
+        winners = LocatorReport(path)._winners
+        assert set(winners) == {"SearchPage.first_book", "CartPage.clear_button"}
+
+    @allure.title("Не найден ни один кандидат - один общий таймаут")
+    def test_timeout(self, report):
+        driver = FakeDriver(present=[])
+        with pytest.raises(TimeoutException):
+            DemoPage(driver).find_first("buy", CANDIDATES, timeout=0.3)
+        assert len(driver.scripts) >= 2
+        assert report._winners == {}
+
+    @allure.title("Только CSS и XPath")
+    def test_unsupported_locator(self):
+        with pytest.raises(ValueError):
+            first_located([(By.ID, "buy")])
@@ -0,0 +1,72 @@
+"""
+Тесты параллельного запуска: разбиение на шарды и прогон в процессах
+"""
+import os
+import subprocess
+import sys
+import time
+
+import allure
+
+from support.parallel import balance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@allure.epic("Читай-город")
+@allure.feature("Параллельный запуск")
+class TestParallel:
+
+    @allure.title("Шарды выравниваются по истории длительностей")
+    def test_balance(self):
+        nodeids = ["a", "b", "c", "d", "e"]
+        durations = {"a": 10, "b": 7, "c": 5, "d": 4, "e": 2}
+
+        shards = balance(nodeids, durations, 2)
+
+        loads = sorted(sum(durations[n] for n in shard) for shard in shards)
+        assert loads == [14, 14]
+        assert sorted(n for shard in shards for n in shard) == nodeids
+        assert all(shard == sorted(shard) for shard in shards)
+
+    @allure.title("Тесты без истории и шардов больше, чем тестов")
+    def test_balance_unknown(self):
+        assert len(balance(["a", "b"], {}, 4)) == 2
+
+    @allure.title("--workers делит прогон между процессами и сливает статистику")
+    def test_workers_end_to_end(self, tmp_path):
+        (tmp_path / "test_sleepy.py").write_text(
+            "import time, pytest\n"
+            "@pytest.mark.parametrize('n', range(4))\n"
+            "def test_sleep(n):\n"
+            "    time.sleep(2)\n"
+            "    assert n != 3\n",
+            encoding="utf-8",
+        )
+        env = {**os.environ, "PYTHONPATH": ROOT}
+
+        start = time.time()
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "test_sleepy.py", "-p", "support.parallel", "--workers", "4"],
+            cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120,
+        )
+        elapsed = time.time() - start
+
+        assert result.returncode == 1, result.stdout
+        assert "4 тестов в 4 процессах" in result.stdout
+        assert elapsed < 6, f"Процессы шли последовательно: {elapsed:.1f} сек"
+        assert (tmp_path / ".test_durations.json").exists()
+        # Итог pytest - по всем шардам, а не "no tests ran"
+        assert "1 failed, 3 passed" in result.stdout
+        assert "FAILED test_sleepy.py::test_sleep[3]" in result.stdout
+
+    @allure.title("Неверное значение --workers - ошибка использования, а не трассировка")
+    def test_workers_usage_error(self, tmp_path):
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "-p", "support.parallel", "--workers=x"],
+            cwd=tmp_path, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, timeout=60,
+        )
+
+        assert result.returncode == 4, result.stdout
+        assert "ожидается число процессов или auto" in result.stderr
+        assert "Traceback" not in result.stderr
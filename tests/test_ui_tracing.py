@@ -0,0 +1,93 @@
+"""
+Тесты трассировки шагов: вложенность интервалов, команды WebDriver, формат Chrome trace
+"""
+import json
+
+import allure
+import pytest
+
+from pages.base_page import BasePage
+from support.tracing import tracer, instrument_driver
+
+
+class FakeDriver:
+    """Минимальный WebDriver: все команды проходят через execute"""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, driver_command, params=None):
+        self.commands.append(driver_command)
+        return {"value": None}
+
+
+class DemoPage(BasePage):
+    def open(self):
+        self.driver.execute("get", {"url": "about:blank"})
+        self.check()
+
+    def check(self):
+        self.driver.execute("executeScript", {})
+
+
+@pytest.fixture
+def enabled_tracer():
+    saved = tracer.enabled, tracer.events
+    tracer.enabled, tracer.events = True, []
+    yield tracer
+    tracer.enabled, tracer.events = saved
+
+
+def _contains(outer, inner):
+    return outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+@allure.epic("Читай-город")
+@allure.feature("Трассировка шагов")
+class TestTracing:
+
+    @allure.title("Методы page object и команды WebDriver вкладываются друг в друга")
+    def test_nested_spans(self, enabled_tracer):
+        page = DemoPage(instrument_driver(FakeDriver()))
+
+        with tracer.span("шаг", "allure"):
+            page.open()
+
+        by_name = {e["name"]: e for e in tracer.events}
+        assert {"шаг", "DemoPage.open", "DemoPage.check", "get", "executeScript"} <= set(by_name)
+        assert by_name["get"]["cat"] == "webdriver"
+        assert _contains(by_name["шаг"], by_name["DemoPage.open"])
+        assert _contains(by_name["DemoPage.open"], by_name["DemoPage.check"])
+        assert _contains(by_name["DemoPage.check"], by_name["executeScript"])
+
+    @allure.title("Выключенная трассировка ничего не пишет")
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(tracer, "enabled", False)
+        before = len(tracer.events)
+        driver = instrument_driver(FakeDriver())
+        DemoPage(driver).open()
+        assert driver.commands == ["get", "executeScript"]
+        assert len(tracer.events) == before
+
+    @allure.title("Ошибка шага попадает в аргументы интервала")
+    def test_error_recorded(self, enabled_tracer):
+        with pytest.raises(ValueError):
+            with tracer.span("падающий шаг"):
+                raise ValueError
+        assert tracer.events[-1]["args"] == {"error": "ValueError"}
+
+    @allure.title("Сводка и файл в формате Chrome trace events")
+    def test_summary_and_save(self, enabled_tracer, tmp_path):
+        driver = instrument_driver(instrument_driver(FakeDriver()))
+        for _ in range(3):
+            driver.execute("findElement")
+
+        (cat, name, _total, count), = tracer.summary()
+        assert (cat, name, count) == ("webdriver", "findElement", 3)
+
+        path = tmp_path / "trace.json"
+        tracer.save(str(path))
+        data = json.loads(path.read_text(encoding="utf-8"))
+        complete = [e for e in data["traceEvents"] if e["ph"] == "X"]
+        assert len(complete) == 3
+        assert all({"ts", "dur", "pid", "tid"} <= set(e) for e in complete)
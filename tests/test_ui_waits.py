@@ -0,0 +1,86 @@
+"""
+Тесты ожиданий по событиям страницы на заглушках WebDriver (без Chrome)
+"""
+import allure
+from selenium.common.exceptions import WebDriverException
+
+from pages.base_page import BasePage
+from pages.waits import SETTLE_STATE_SCRIPT, WATCHER_SCRIPT, install_watcher, page_settled
+
+SETTLED = {"readyState": "complete", "hydrated": True, "inflight": 0, "networkQuietMs": 500, "domQuietMs": 500}
+
+
+class FakeCdpDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append((command, params))
+
+
+class GridDriver:
+    """Удалённый драйвер, который не пропускает CDP"""
+
+    def execute_cdp_cmd(self, command, params):
+        raise WebDriverException("unknown command: execute_cdp_cmd")
+
+
+class FakeStateDriver:
+    """Отдаёт состояния страницы по очереди, последнее - бесконечно"""
+
+    def __init__(self, *states):
+        self.states = list(states)
+        self.calls = 0
+
+    def execute_script(self, script):
+        assert script == SETTLE_STATE_SCRIPT
+        self.calls += 1
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+
+@allure.epic("Читай-город")
+@allure.feature("Ожидания")
+class TestWaits:
+
+    @allure.title("В Chrome сторож ставится в каждый новый документ до скриптов страницы")
+    def test_install_on_new_document(self):
+        driver = FakeCdpDriver()
+
+        assert install_watcher(driver)
+        assert driver.commands == [("Page.addScriptToEvaluateOnNewDocument", {"source": WATCHER_SCRIPT})]
+        # page_settled ставит того же сторожа, только если его ещё нет в документе
+        assert SETTLE_STATE_SCRIPT.startswith(WATCHER_SCRIPT) and "if (w.__cgWait)" in WATCHER_SCRIPT
+
+    @allure.title("Без CDP (не Chromium, Grid) сторож внедряется лениво")
+    def test_no_cdp(self):
+        assert not install_watcher(object())
+        assert not install_watcher(GridDriver())
+
+    @allure.title("Страница успокоилась: загружена, гидрирована, нет запросов, сеть и DOM затихли")
+    def test_settled(self):
+        condition = page_settled(quiet_ms=300, dom_quiet_ms=300)
+
+        assert condition(FakeStateDriver(SETTLED))
+        assert condition.last_state == SETTLED
+
+    @allure.title("Не успокоилась, пока не выполнены все условия")
+    def test_not_settled(self):
+        condition = page_settled(quiet_ms=300, dom_quiet_ms=300)
+
+        for change in ({"readyState": "interactive"}, {"hydrated": False}, {"inflight": 1},
+                       {"networkQuietMs": 299}, {"domQuietMs": 299}):
+            assert not condition(FakeStateDriver({**SETTLED, **change})), change
+        # dom_quiet_ms=None - DOM не ждём
+        assert page_settled(quiet_ms=300, dom_quiet_ms=None)(FakeStateDriver({**SETTLED, "domQuietMs": 0}))
+
+    @allure.title("wait_for_settled возвращается сразу, как страница успокоилась, иначе - по таймауту")
+    def test_wait_for_settled(self):
+        busy = {**SETTLED, "inflight": 1}
+        driver = FakeStateDriver(busy, busy, SETTLED)
+
+        assert BasePage(driver).wait_for_settled(timeout=5)
+        assert driver.calls == 3
+
+        driver = FakeStateDriver(busy)
+        assert not BasePage(driver).wait_for_settled(timeout=0.3)
+        assert driver.calls > 1
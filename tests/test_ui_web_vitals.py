@@ -0,0 +1,114 @@
+"""
+Тесты замеров производительности страниц: типы страниц, бюджеты, режимы warn/fail
+"""
+import os
+import subprocess
+import sys
+
+import allure
+import pytest
+
+from config import settings
+from support.web_vitals import VitalsCollector, check_budget, load_budget, page_type
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET = {"version": 1, "pages": {"default": {"lcp_ms": 4000, "ttfb_ms": 1000}, "product": {"lcp_ms": 2500}}}
+
+
+class FakeDriver:
+    """Отдаёт заранее заданный результат VITALS_SCRIPT"""
+
+    session_id = "session-1"
+
+    def __init__(self, **vitals):
+        self.vitals = {"document": 1.0, "url": "https://www.chitai-gorod.ru/", "ttfb_ms": 200,
+                       "lcp_ms": 1500, "cls": 0.01, "transfer_bytes": 1000, **vitals}
+
+    def execute_script(self, script, *args):
+        return dict(self.vitals)
+
+
+@pytest.fixture
+def collector():
+    collector = VitalsCollector()
+    collector.enabled = True
+    collector.budget = BUDGET
+    return collector
+
+
+@allure.epic("Читай-город")
+@allure.feature("Производительность страниц")
+class TestWebVitals:
+
+    @allure.title("Тип страницы определяется по пути URL")
+    @pytest.mark.parametrize("url, expected", [
+        ("https://www.chitai-gorod.ru", "home"),
+        ("https://www.chitai-gorod.ru/?utm=1", "home"),
+        ("https://www.chitai-gorod.ru/search?phrase=толстой", "search"),
+        ("https://www.chitai-gorod.ru/product/voyna-i-mir-123", "product"),
+        ("https://www.chitai-gorod.ru/cart/", "cart"),
+        ("https://www.chitai-gorod.ru/promotions", "other"),
+    ])
+    def test_page_type(self, url, expected):
+        assert page_type(url) == expected
+
+    @allure.title("Лимиты типа страницы дополняют default")
+    def test_check_budget(self):
+        sample = {"page_type": "product", "lcp_ms": 3000, "ttfb_ms": 1200, "cls": None}
+        assert check_budget(sample, BUDGET) == [("lcp_ms", 3000, 2500), ("ttfb_ms", 1200, 1000)]
+        assert check_budget({**sample, "page_type": "home"}, BUDGET) == [("ttfb_ms", 1200, 1000)]
+
+    @allure.title("Один документ замеряется один раз, итоги - медианы по типам")
+    def test_collect_once_per_document(self, collector):
+        driver = FakeDriver()
+        assert collector.collect(driver)["page_type"] == "home"
+        assert collector.collect(driver) is None
+
+        collector.collect(FakeDriver(document=2.0, url="https://www.chitai-gorod.ru/product/1", lcp_ms=3000))
+        collector.collect(FakeDriver(document=3.0, url="https://www.chitai-gorod.ru/product/2", lcp_ms=2000))
+
+        summary = collector.summary()
+        assert summary["home"]["count"] == 1
+        assert summary["product"]["median"]["lcp_ms"] == 2500
+        assert [(s["url"], m) for s, m, _, _ in collector.violations] == [
+            ("https://www.chitai-gorod.ru/product/1", "lcp_ms")]
+
+    @allure.title("Выключенный сборщик не трогает браузер")
+    def test_disabled(self):
+        class NoScriptDriver:
+            def execute_script(self, script, *args):
+                raise AssertionError("скрипт не должен выполняться")
+
+        assert VitalsCollector().collect(NoScriptDriver()) is None
+
+    @allure.title("Файл бюджетов проекта версионирован и задаёт лимиты по умолчанию")
+    def test_project_budget(self):
+        budget = load_budget(os.path.join(ROOT, settings.PERF_BUDGET_FILE))
+        assert isinstance(budget["version"], int)
+        assert {"ttfb_ms", "dom_content_loaded_ms", "lcp_ms", "transfer_bytes"} <= set(budget["pages"]["default"])
+
+    @allure.title("--perf-budget=fail роняет тест, warn - только предупреждает")
+    @pytest.mark.parametrize("mode, returncode, marker", [("fail", 1, "1 failed"), ("warn", 0, "1 passed")])
+    def test_modes(self, tmp_path, mode, returncode, marker):
+        (tmp_path / "budget.json").write_text('{"version": 7, "pages": {"default": {"lcp_ms": 100}}}')
+        (tmp_path / "test_slow_page.py").write_text(
+            "from support.web_vitals import collector\n"
+            "class Driver:\n"
+            "    session_id = 's'\n"
+            "    def execute_script(self, script):\n"
+            "        return {'document': 1, 'url': 'https://x/cart/', 'lcp_ms': 900}\n"
+            "def test_page():\n"
+            "    collector.collect(Driver())\n",
+            encoding="utf-8",
+        )
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "test_slow_page.py", "-p", "support.web_vitals",
+             f"--perf-budget={mode}", "--perf-budget-file=budget.json", "-p", "no:cacheprovider"],
+            cwd=tmp_path, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, timeout=60,
+        )
+
+        assert result.returncode == returncode, result.stdout
+        assert marker in result.stdout
+        assert "cart lcp_ms: 900 > 100" in result.stdout
+        assert (tmp_path / settings.PERF_RESULTS_FILE).exists()